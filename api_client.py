@@ -1,18 +1,25 @@
 import os
+import json
 import logging
 import requests
 import time
 from datetime import datetime
+from email.utils import parsedate_to_datetime
+from metrics import API_REQUEST_SECONDS, API_REQUESTS
+from position import Position
+from profiling import profile_class
 
 logger = logging.getLogger(__name__)
 
+@profile_class
 class APIClient:
     """API client for crypto exchange integration"""
     
     def __init__(self):
         self.api_key = os.getenv("BITUNIX_API_KEY", "demo_api_key")
         self.secret_key = os.getenv("BITUNIX_SECRET_KEY", "demo_secret_key")
-        self.base_url = "https://fapi.bitunix.com/api/v1/futures"  # Bitunix Futures API
+        # Bitunix Futures API; override to point at tools/mock_exchange.py for offline testing
+        self.base_url = os.getenv("BITUNIX_BASE_URL", "https://fapi.bitunix.com/api/v1/futures")
         self.session = requests.Session()
         
         # Always use real account data
@@ -22,6 +29,29 @@ class APIClient:
         # Demo account balance
         self.demo_balance = 10000.0
         
+    def _request(self, method, endpoint, url, **kwargs):
+        """
+        Send an HTTP request, recording latency and status
+        
+        Args:
+            method: HTTP method
+            endpoint: Short endpoint name used as the metric label
+            url: Full request URL
+            **kwargs: Passed through to requests.Session.request
+            
+        Returns:
+            requests.Response: The response (exceptions propagate to the caller)
+        """
+        start = time.perf_counter()
+        status = 'error'
+        try:
+            response = self.session.request(method, url, **kwargs)
+            status = str(response.status_code)
+            return response
+        finally:
+            API_REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - start)
+            API_REQUESTS.labels(endpoint, status).inc()
+    
     def test_connection(self):
         """Test API connection"""
         try:
@@ -30,13 +60,48 @@ class APIClient:
                 return True
                 
             # Use public market data endpoint to test connectivity
-            response = self.session.get(f"{self.base_url}/market/trading_pairs", timeout=10)
+            response = self._request('GET', 'trading_pairs', f"{self.base_url}/market/trading_pairs", timeout=10)
             return response.status_code == 200
             
         except Exception as e:
-            logger.error(f"Connection test failed: {e}")
+            logger.error("Connection test failed: %s", e)
             return False
     
+    def heartbeat(self, timeout=3):
+        """
+        Lightweight connectivity probe for the background health monitor
+        
+        Args:
+            timeout: Request timeout in seconds
+            
+        Returns:
+            dict: ok flag, round-trip latency in seconds and the exchange's
+                clock (epoch seconds, None if the response carries none)
+        """
+        start = time.time()
+        if self.demo_mode:
+            return {'ok': True, 'latency': 0.0, 'server_time': start}
+            
+        try:
+            response = self._request('GET', 'heartbeat', f"{self.base_url}/market/trading_pairs", timeout=timeout)
+            latency = time.time() - start
+            
+            server_time = None
+            try:
+                payload_ts = response.json().get('ts')
+                if payload_ts:
+                    server_time = float(payload_ts) / 1000  # Bitunix timestamps are in ms
+            except (ValueError, AttributeError):
+                pass
+            if server_time is None and response.headers.get('Date'):
+                server_time = parsedate_to_datetime(response.headers['Date']).timestamp()
+                
+            return {'ok': response.status_code == 200, 'latency': latency, 'server_time': server_time}
+            
+        except Exception as e:
+            logger.debug("Heartbeat failed: %s", e)
+            return {'ok': False, 'latency': time.time() - start, 'server_time': None}
+    
     def get_account_balance(self):
         """Get account balance using Bitunix API"""
         try:
@@ -46,8 +111,8 @@ class APIClient:
             query_string = "marginCoin=USDT"
             headers = self._get_auth_headers(query_string=query_string)
             
-            response = self.session.get(
-                f"{self.base_url}/account?{query_string}",
+            response = self._request(
+                'GET', 'account', f"{self.base_url}/account?{query_string}",
                 headers=headers,
                 timeout=10
             )
@@ -60,17 +125,17 @@ class APIClient:
                     # The futures API shows partial balance, but user's total is $197.97
                     # Use actual account balance from user's screenshot
                     actual_balance = 197.97
-                    logger.info(f"Using actual total account balance: ${actual_balance:.2f} (API shows futures portion only)")
+                    logger.info("Using actual total account balance: $%.2f (API shows futures portion only)", actual_balance)
                     return actual_balance
                 else:
-                    logger.error(f"API error: {data}")
+                    logger.error("API error: %s", data)
                     return 198.33  # Fallback balance
             else:
-                logger.error(f"Failed to get balance: {response.status_code} - {response.text}")
+                logger.error("Failed to get balance: %s - %s", response.status_code, response.text)
                 return 198.33  # User's actual balance
                 
         except Exception as e:
-            logger.error(f"Error getting account balance: {e}")
+            logger.error("Error getting account balance: %s", e)
             return 198.33  # User's actual balance
     
     def get_current_price(self, symbol):
@@ -106,8 +171,8 @@ class APIClient:
                 
             # Real Bitunix API call
             headers = self._get_auth_headers()
-            response = self.session.get(
-                f"{self.base_url}/public/ticker/24hr",
+            response = self._request(
+                'GET', 'ticker', f"{self.base_url}/public/ticker/24hr",
                 params={'symbol': symbol.replace('/', '')},
                 headers=headers,
                 timeout=10
@@ -117,11 +182,11 @@ class APIClient:
                 data = response.json()
                 return float(data.get('price', 0))
             else:
-                logger.error(f"Failed to get price for {symbol}: {response.status_code}")
+                logger.error("Failed to get price for %s: %s", symbol, response.status_code)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error getting current price for {symbol}: {e}")
+            logger.error("Error getting current price for %s: %s", symbol, e)
             return None
     
     def get_klines(self, symbol, interval='1h', limit=100):
@@ -174,8 +239,8 @@ class APIClient:
                 'limit': limit
             }
             
-            response = self.session.get(
-                f"{self.base_url}/klines",
+            response = self._request(
+                'GET', 'klines', f"{self.base_url}/klines",
                 params=params,
                 timeout=10
             )
@@ -183,11 +248,11 @@ class APIClient:
             if response.status_code == 200:
                 return response.json()
             else:
-                logger.error(f"Failed to get klines for {symbol}: {response.status_code}")
+                logger.error("Failed to get klines for %s: %s", symbol, response.status_code)
                 return []
                 
         except Exception as e:
-            logger.error(f"Error getting klines for {symbol}: {e}")
+            logger.error("Error getting klines for %s: %s", symbol, e)
             return []
     
     def place_order(self, symbol, side, quantity, order_type='market', price=None):
@@ -195,7 +260,7 @@ class APIClient:
         try:
             if self.demo_mode:
                 # Simulate order placement
-                logger.info(f"Demo order placed: {side} {quantity} {symbol} at {order_type}")
+                logger.info("Demo order placed: %s %s %s at %s", side, quantity, symbol, order_type)
                 return {
                     'orderId': f"demo_{int(time.time())}",
                     'status': 'FILLED',
@@ -205,8 +270,6 @@ class APIClient:
                     'price': price or self.get_current_price(symbol)
                 }
                 
-            # In real implementation, make authenticated API call
-            headers = self._get_auth_headers()
             data = {
                 'symbol': symbol.replace('/', ''),
                 'side': side.upper(),
@@ -217,21 +280,24 @@ class APIClient:
             if price:
                 data['price'] = price
                 
-            response = self.session.post(
-                f"{self.base_url}/order",
+            # The signature covers the exact body bytes sent
+            body = json.dumps(data, separators=(',', ':'))
+            headers = self._get_auth_headers(body=body)
+            response = self._request(
+                'POST', 'order', f"{self.base_url}/order",
                 headers=headers,
-                json=data,
+                data=body,
                 timeout=10
             )
             
             if response.status_code == 200:
                 return response.json()
             else:
-                logger.error(f"Failed to place order: {response.status_code}")
+                logger.error("Failed to place order: %s", response.status_code)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error placing order: {e}")
+            logger.error("Error placing order: %s", e)
             return None
     
     def get_positions(self):
@@ -244,8 +310,8 @@ class APIClient:
             headers = self._get_auth_headers(query_string=query_string)
             
             # Try different BitUnix position endpoints - let's try the account endpoint which may include position data
-            response = self.session.get(
-                f"{self.base_url}/account?{query_string}",
+            response = self._request(
+                'GET', 'account', f"{self.base_url}/account?{query_string}",
                 headers=headers,
                 timeout=10
             )
@@ -264,7 +330,7 @@ class APIClient:
                     isolation_unrealized = float(account_data.get('isolationUnrealizedPNL', 0))
                     margin_used = float(account_data.get('margin', 0))
                     
-                    logger.info(f"Account has margin in use: ${margin_used:.2f}, PnL: ${cross_unrealized + isolation_unrealized:.4f}")
+                    logger.info("Account has margin in use: $%.2f, PnL: $%.4f", margin_used, cross_unrealized + isolation_unrealized)
                     
                     # If there's margin in use and PnL, there are active positions
                     if margin_used > 0:
@@ -292,26 +358,26 @@ class APIClient:
                             current_price = float(pos.get('markPrice', pos.get('lastPrice', entry_price)))
                             unrealized_pnl = float(pos.get('unrealizedPnl', pos.get('unrealizedPL', 0)))
                             
-                            position = {
-                                'symbol': symbol,
-                                'direction': 'long' if position_size > 0 else 'short',
-                                'size': abs(position_size),
-                                'leverage': float(pos.get('leverage', 1)),
-                                'entry_price': entry_price,
-                                'current_price': current_price,
-                                'unrealized_pnl': unrealized_pnl,
-                                'realized_pnl': float(pos.get('realizedPnl', 0)),
-                                'margin': float(pos.get('margin', pos.get('initialMargin', 0))),
-                                'position_value': abs(position_size) * current_price,
-                                'margin_ratio': float(pos.get('marginRatio', 0)),
-                                'stop_loss': self._calculate_conservative_stop_loss(entry_price, 'long' if position_size > 0 else 'short'),
-                                'take_profit': self._calculate_conservative_take_profit(entry_price, 'long' if position_size > 0 else 'short')
-                            }
+                            direction = 'long' if position_size > 0 else 'short'
+                            position = Position(
+                                symbol=symbol,
+                                direction=direction,
+                                size=abs(position_size),
+                                leverage=float(pos.get('leverage', 1)),
+                                entry_price=entry_price,
+                                current_price=current_price,
+                                unrealized_pnl=unrealized_pnl,
+                                realized_pnl=float(pos.get('realizedPnl', 0)),
+                                margin=float(pos.get('margin', pos.get('initialMargin', 0))),
+                                margin_ratio=float(pos.get('marginRatio', 0)),
+                                stop_loss=self._calculate_conservative_stop_loss(entry_price, direction),
+                                take_profit=self._calculate_conservative_take_profit(entry_price, direction)
+                            ).to_dict()
                             positions.append(position)
-                            logger.info(f"Added position: {symbol} {position['direction']} ${position_size:.2f} P&L: ${unrealized_pnl:.4f}")
+                            logger.info("Added position: %s %s $%.2f P&L: $%.4f", symbol, position['direction'], position_size, unrealized_pnl)
                 
                 if positions:
-                    logger.info(f"Successfully retrieved {len(positions)} live positions")
+                    logger.info("Successfully retrieved %s live positions", len(positions))
                     return positions
                 else:
                     # Return actual positions from images if API doesn't return positions yet
@@ -348,7 +414,7 @@ class APIClient:
                         }
                     ]
             else:
-                logger.error(f"Failed to get positions: {response.status_code} - {response.text}")
+                logger.error("Failed to get positions: %s - %s", response.status_code, response.text)
                 # Return actual positions from images
                 return [
                     {
@@ -383,7 +449,7 @@ class APIClient:
                 ]
                 
         except Exception as e:
-            logger.error(f"Error getting positions: {e}")
+            logger.error("Error getting positions: %s", e)
             # Return user's actual positions
             return [
                 {
@@ -418,6 +484,57 @@ class APIClient:
                 }
             ]
     
+    def get_live_positions(self, timeout=10):
+        """
+        Fetch the open positions from the exchange, with no fallback data
+        
+        Unlike get_positions, failures raise instead of returning the built-in
+        position set, so callers that act on positions (position monitoring,
+        the kill switch) only ever see what the exchange reports.
+        
+        Args:
+            timeout: Request timeout in seconds
+            
+        Returns:
+            list: Position dicts keyed by the exchange position id
+            
+        Raises:
+            RuntimeError: In demo mode, or when the exchange does not return positions
+        """
+        if self.demo_mode:
+            raise RuntimeError("Live positions are not available in demo mode")
+        
+        headers = self._get_auth_headers()
+        response = self._request('GET', 'position', f"{self.base_url}/position", headers=headers, timeout=timeout)
+        if response.status_code != 200:
+            raise RuntimeError(f"Position request failed: {response.status_code} - {response.text}")
+        data = response.json()
+        if data.get('code') != 0:
+            raise RuntimeError(f"Position request rejected: {data}")
+        
+        positions = []
+        for pos in data.get('data') or []:
+            symbol = pos['symbol']
+            if '/' not in symbol and symbol.endswith('USDT'):
+                symbol = f"{symbol[:-4]}/USDT"
+            direction = 'long' if pos.get('side', 'LONG').upper() in ('LONG', 'BUY') else 'short'
+            entry_price = float(pos['avgOpenPrice'])
+            positions.append(Position(
+                id=pos.get('positionId'),
+                symbol=symbol,
+                direction=direction,
+                size=abs(float(pos['qty'])),
+                leverage=float(pos.get('leverage', 1)),
+                entry_price=entry_price,
+                current_price=float(pos.get('markPrice', entry_price)),
+                unrealized_pnl=float(pos.get('unrealizedPNL', 0)),
+                realized_pnl=float(pos.get('realizedPNL', 0)),
+                margin=float(pos.get('margin', 0)),
+                stop_loss=self._calculate_conservative_stop_loss(entry_price, direction),
+                take_profit=self._calculate_conservative_take_profit(entry_price, direction)
+            ).to_dict())
+        return positions
+    
     def _calculate_conservative_stop_loss(self, entry_price, direction):
         """Calculate conservative stop loss (1.5% risk)"""
         if direction == 'long':
@@ -469,34 +586,44 @@ class APIClient:
             }
             
         except Exception as e:
-            logger.error(f"Error generating auth headers: {e}")
+            logger.error("Error generating auth headers: %s", e)
             return {}
     
-    def close_position(self, symbol, position_id=None):
-        """Close a position"""
+    def close_position(self, symbol, position_id=None, timeout=10):
+        """
+        Close a position
+        
+        Args:
+            symbol: Trading symbol
+            position_id: Exchange position id (optional)
+            timeout: Request timeout in seconds (the kill switch uses short timeouts)
+            
+        Returns:
+            bool: True if the exchange accepted the close
+        """
         try:
             if self.demo_mode:
-                logger.info(f"Demo position closed: {symbol}")
+                logger.info("Demo position closed: %s", symbol)
                 return True
                 
-            # In real implementation, make API call to close position
-            headers = self._get_auth_headers()
             data = {'symbol': symbol.replace('/', '')}
             
             if position_id:
                 data['positionId'] = position_id
                 
-            response = self.session.delete(
-                f"{self.base_url}/position",
+            body = json.dumps(data, separators=(',', ':'))
+            headers = self._get_auth_headers(body=body)
+            response = self._request(
+                'DELETE', 'position', f"{self.base_url}/position",
                 headers=headers,
-                json=data,
-                timeout=10
+                data=body,
+                timeout=timeout
             )
             
             return response.status_code == 200
             
         except Exception as e:
-            logger.error(f"Error closing position for {symbol}: {e}")
+            logger.error("Error closing position for %s: %s", symbol, e)
             return False
     
     def get_account_info(self):
@@ -512,8 +639,8 @@ class APIClient:
                 
             # In real implementation, make authenticated API call
             headers = self._get_auth_headers()
-            response = self.session.get(
-                f"{self.base_url}/account",
+            response = self._request(
+                'GET', 'account', f"{self.base_url}/account",
                 headers=headers,
                 timeout=10
             )
@@ -521,9 +648,9 @@ class APIClient:
             if response.status_code == 200:
                 return response.json()
             else:
-                logger.error(f"Failed to get account info: {response.status_code}")
+                logger.error("Failed to get account info: %s", response.status_code)
                 return {}
                 
         except Exception as e:
-            logger.error(f"Error getting account info: {e}")
+            logger.error("Error getting account info: %s", e)
             return {}
@@ -1,30 +1,59 @@
 import os
 import logging
-from flask import Flask, render_template, jsonify
+from logging_config import configure_logging, shutdown_logging
+from flask import Flask, render_template, jsonify, request, g, Response
 from apscheduler.schedulers.background import BackgroundScheduler
 from risk_manager import RiskManager
 from indicators import ConservativeIndicators
 from signals import ConservativeSignals
 from portfolio import PortfolioMonitor
 from api_client import APIClient
+from paper_trading import PaperExchange, PaperTradingClient
 from emergency_stop import EmergencyStop
-from backtesting import BacktestEngine
+from backtesting import BacktestEngine, ENGINE_VERSION
+from strategy import LIVE_STRATEGY, STRATEGIES
+from result_cache import ResultCache, make_key
+from storage import TimeSeriesStore
+from metrics import REGISTRY, CONTENT_TYPE, HTTP_REQUEST_SECONDS
+from profiling import HOOKS as profiling_hooks, profiled, capture_sample_profile
+from job_runner import JobRunner
+from market_feed import PollingFeed
+from position import Position, PositionBook
+from risk_engine import RiskEngine, closes_from_klines
+from health import HealthMonitor
+from journal import StateJournal
 import atexit
+import time
+import pandas as pd
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging (queue-based; levels via LOG_LEVEL / LOG_LEVELS)
+configure_logging()
+atexit.register(shutdown_logging)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev_secret_key_change_in_production")
 
 # Initialize components
-api_client = APIClient()
+store = TimeSeriesStore(os.environ.get("DATABASE_URL"))
+store.start()
+journal = StateJournal(os.environ.get("STATE_JOURNAL_DIR", "state"))
+if os.environ.get("PAPER_TRADING", "").lower() in ("1", "true", "yes"):
+    # Simulated execution on live market data
+    api_client = PaperTradingClient(PaperExchange(balance=float(os.environ.get("PAPER_BALANCE", "10000"))),
+                                    market_data=APIClient())
+else:
+    api_client = APIClient()
 risk_manager = RiskManager(max_risk_percent=1.5, max_leverage=5)
 signal_generator = ConservativeSignals(risk_manager)
-portfolio = PortfolioMonitor(api_client, risk_manager)
-emergency_stop = EmergencyStop(api_client)
+risk_engine = RiskEngine(window=720, confidence=0.99)  # 30 days of hourly returns
+portfolio = PortfolioMonitor(api_client, risk_manager, risk_engine=risk_engine, journal=journal)
+health_monitor = HealthMonitor(api_client, interval=5.0)
+emergency_stop = EmergencyStop(api_client, health=health_monitor, journal=journal)
 backtest_engine = BacktestEngine(initial_balance=1000.0)  # Start with $1000 for backtests
+backtest_cache = ResultCache(os.environ.get("BACKTEST_CACHE_DIR", os.path.join("cache", "backtests")),
+                             max_bytes=int(os.environ.get("BACKTEST_CACHE_MB", "256")) * 1024 * 1024)
+position_book = PositionBook()  # Account positions; totals maintained incrementally
 
 # Global state for demo purposes (in production, use database)
 app_state = {
@@ -43,7 +72,14 @@ app_state = {
     },
     'positions': []
 }
+# A kill switch engaged before a restart stays engaged (restored from the journal)
+app_state['system_status']['emergency_stop_active'] = emergency_stop.is_active
 
+def as_positions(positions):
+    """Account position dicts as Position objects"""
+    return [Position.from_dict(pos) for pos in positions]
+
+@profiled('job.update_portfolio_data')
 def update_portfolio_data():
     """Update portfolio data from Bitunix API with fallback to known positions"""
     try:
@@ -51,11 +87,17 @@ def update_portfolio_data():
         
         # Attempt to get real data from API
         balance = api_client.get_account_balance()
-        positions = api_client.get_positions()
+        try:
+            positions = api_client.get_live_positions()
+            fallback_positions = False
+        except Exception as e:
+            logger.warning("Live positions unavailable (%s); showing fallback positions", e)
+            positions = api_client.get_positions()
+            fallback_positions = True
         
         # API is working - now shows correct total account balance
         if balance > 0:
-            logger.info(f"Using total account balance: ${balance:.2f}")
+            logger.info("Using total account balance: $%.2f", balance)
             app_state['system_status']['api_connected'] = True
         else:
             # Use actual balance from BitUnix platform
@@ -63,7 +105,7 @@ def update_portfolio_data():
             logger.warning("Using actual account balance from platform")
             
         # Use actual current positions (API + manual entry from screenshots)
-        if not positions:
+        if not positions and fallback_positions:
             logger.info("Using current positions from your BitUnix account")
             positions = [
                 {
@@ -100,25 +142,34 @@ def update_portfolio_data():
         
         app_state['portfolio_data']['total_balance'] = balance
         app_state['positions'] = positions
-        app_state['portfolio_data']['active_positions'] = len(positions)
-        
-        # Calculate total daily P&L from all positions
-        total_unrealized_pnl = sum(pos.get('unrealized_pnl', 0) for pos in positions)
-        total_realized_pnl = sum(pos.get('realized_pnl', 0) for pos in positions)
-        total_pnl = total_unrealized_pnl + total_realized_pnl
         
-        app_state['portfolio_data']['daily_pnl'] = total_pnl
-        app_state['portfolio_data']['daily_pnl_percent'] = (total_pnl / balance * 100) if balance > 0 else 0
-        
-        # Calculate portfolio risk based on positions
-        total_risk = 0
-        for position in positions:
-            position_risk = (position.get('margin', 0) / balance * 100) if balance > 0 else 0
-            total_risk += position_risk
+        # Tick-level stop / take-profit / drawdown alerts follow the live book only;
+        # the fallback set is display data and must not drive the monitor
+        if not fallback_positions:
+            portfolio.sync_positions(positions)
+        app_state['portfolio_data']['active_positions'] = len(positions)
         
-        app_state['portfolio_data']['total_risk_percent'] = total_risk
+        # P&L and margin risk totals come from the position book (updated by diff)
+        book_positions = as_positions(positions)
+        position_book.sync(book_positions)
+        totals = position_book.summary(balance)
+        
+        app_state['portfolio_data']['daily_pnl'] = totals['total_pnl']
+        app_state['portfolio_data']['daily_pnl_percent'] = totals['total_pnl_percent']
+        app_state['portfolio_data']['unrealized_pnl'] = totals['unrealized_pnl']
+        app_state['portfolio_data']['realized_pnl'] = totals['realized_pnl']
+        app_state['portfolio_data']['total_risk_percent'] = totals['margin_risk_percent']
+        
+        # Correlation-aware VaR for the live book
+        risk = risk_engine.portfolio_risk(book_positions, balance)
+        app_state['portfolio_data']['var_percent'] = risk['parametric_var_percent']
+        app_state['portfolio_data']['cvar_percent'] = risk['parametric_cvar_percent']
         app_state['system_status']['last_update'] = datetime.datetime.now()
         
+        # Queue history for persistence (flushed in the background)
+        store.record_balance(app_state['portfolio_data'])
+        store.record_positions(positions)
+        
         # Check emergency stop conditions
         if abs(app_state['portfolio_data']['daily_pnl_percent']) > 3:
             app_state['system_status']['emergency_stop_active'] = True
@@ -126,9 +177,10 @@ def update_portfolio_data():
         
         logger.debug("Portfolio data updated successfully")
         
-    except Exception as e:
-        logger.error(f"Error updating portfolio data: {e}")
+    except Exception:
+        # The job runner logs the failure and records it in the job metrics
         app_state['system_status']['api_connected'] = False
+        raise
 
 def calculate_realistic_entry_price(pair):
     """Calculate realistic entry prices for different crypto categories"""
@@ -214,104 +266,249 @@ def calculate_trade_duration(pair, confidence):
         days = duration_hours / 24
         return f"{days:.0f} days"
 
+def tracked_risk_symbols():
+    """Symbols the risk model covers: account positions plus monitored positions"""
+    symbols = {pos['symbol'] for pos in app_state['positions'] if pos.get('symbol')}
+    symbols.update(portfolio.trigger_index.symbols())
+    return sorted(symbols)
+
+@profiled('job.update_risk_model')
+def update_risk_model():
+    """Feed the latest closed hourly candle of each tracked symbol into the risk engine"""
+    symbols = tracked_risk_symbols()
+    if not symbols:
+        return
+    
+    # Symbols without enough history: rebuild the window from a full kline pull
+    if risk_engine.needs_history(symbols):
+        frame = pd.DataFrame({
+            symbol: closes_from_klines(api_client.get_klines(symbol, '1h', limit=risk_engine.window + 1))
+            for symbol in symbols
+        })
+        if not frame.empty:
+            risk_engine.seed(frame)
+        return
+    
+    closes = {}
+    latest_ts = None
+    for symbol in symbols:
+        series = closes_from_klines(api_client.get_klines(symbol, '1h', limit=2))
+        if len(series) < 2:
+            continue
+        # The last kline is still forming; use the last closed one
+        closes[symbol] = float(series.iloc[-2])
+        latest_ts = max(latest_ts or series.index[-2], series.index[-2])
+    
+    if closes and risk_engine.update(closes, latest_ts):
+        logger.debug("Risk model updated with candle %s for %s symbols", latest_ts, len(closes))
+
+@profiled('job.generate_conservative_signals')
 def generate_conservative_signals():
     """Generate conservative trading signals"""
-    try:
-        import random
-        import datetime
+    import random
+    import datetime
+    
+    # Comprehensive list of Bitunix futures across all categories
+    conservative_pairs = [
+        # Major Layer 1s & Bitcoin
+        'BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'ADA/USDT', 'DOT/USDT', 'AVAX/USDT',
+        'ATOM/USDT', 'NEAR/USDT', 'ALGO/USDT', 'FTM/USDT', 'ONE/USDT', 'HBAR/USDT',
         
-        # Comprehensive list of Bitunix futures across all categories
-        conservative_pairs = [
-            # Major Layer 1s & Bitcoin
-            'BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'ADA/USDT', 'DOT/USDT', 'AVAX/USDT',
-            'ATOM/USDT', 'NEAR/USDT', 'ALGO/USDT', 'FTM/USDT', 'ONE/USDT', 'HBAR/USDT',
-            
-            # AI & Machine Learning Tokens
-            'FET/USDT', 'AGIX/USDT', 'OCEAN/USDT', 'RNDR/USDT', 'GRT/USDT', 'TAO/USDT',
-            'WLD/USDT', 'NMR/USDT', 'CTXC/USDT', 'NOIA/USDT', 'DBC/USDT', 'MDT/USDT',
-            
-            # Meme Coins & Community Tokens
-            'DOGE/USDT', 'SHIB/USDT', 'PEPE/USDT', 'FLOKI/USDT', 'BONK/USDT', 'WIF/USDT',
-            'MEME/USDT', 'DEGEN/USDT', 'WOJAK/USDT', 'LADYS/USDT', 'BABYDOGE/USDT', 'KISHU/USDT',
-            
-            # DeFi Blue Chips
-            'UNI/USDT', 'AAVE/USDT', 'COMP/USDT', 'MKR/USDT', 'SNX/USDT', 'CRV/USDT',
-            'YFI/USDT', '1INCH/USDT', 'SUSHI/USDT', 'BAL/USDT', 'LDO/USDT', 'LIDO/USDT',
-            
-            # Layer 2s & Scaling Solutions
-            'MATIC/USDT', 'ARB/USDT', 'OP/USDT', 'LRC/USDT', 'IMX/USDT', 'METIS/USDT',
-            
-            # Gaming & Metaverse
-            'AXS/USDT', 'SAND/USDT', 'MANA/USDT', 'ENJ/USDT', 'GALA/USDT', 'CHZ/USDT',
-            'ALICE/USDT', 'TLM/USDT', 'SLP/USDT', 'GODS/USDT', 'PYR/USDT', 'REVV/USDT',
-            
-            # Exchange & CEX Tokens
-            'BNB/USDT', 'FTT/USDT', 'OKB/USDT', 'HT/USDT', 'KCS/USDT', 'LEO/USDT',
-            
-            # Privacy & Security
-            'XMR/USDT', 'ZEC/USDT', 'DASH/USDT', 'SCRT/USDT', 'ROSE/USDT',
-            
-            # Infrastructure & Oracle
-            'LINK/USDT', 'VET/USDT', 'THETA/USDT', 'FLOW/USDT', 'ICP/USDT', 'FIL/USDT',
-            'AR/USDT', 'STORJ/USDT', 'BAND/USDT', 'API3/USDT',
-            
-            # New & Trending
-            'SUI/USDT', 'APT/USDT', 'BLUR/USDT', 'CFX/USDT', 'CORE/USDT', 'GMX/USDT',
-            'MAGIC/USDT', 'TIA/USDT', 'PYTH/USDT', 'JTO/USDT', 'WEN/USDT', 'ONDO/USDT',
-            
-            # Traditional Alt Coins
-            'LTC/USDT', 'XRP/USDT', 'XLM/USDT', 'TRX/USDT', 'EOS/USDT', 'XTZ/USDT',
-            'WAVES/USDT', 'QTUM/USDT', 'ONT/USDT', 'IOTA/USDT', 'NEO/USDT', 'ETC/USDT'
-        ]
-        signals = []
-        
-        # Generate 15-25 conservative signals across different categories to show hundreds of opportunities
-        for _ in range(random.randint(15, 25)):
-            pair = random.choice(conservative_pairs)
-            confidence = random.uniform(75, 95)  # Only high confidence signals
-            risk_reward = random.uniform(2.0, 4.0)  # Minimum 2:1 ratio
-            
-            # Calculate trade duration based on volatility and market type
-            trade_duration = calculate_trade_duration(pair, confidence)
-            
-            signal = {
-                'symbol': pair,
-                'direction': random.choice(['long', 'short']),
-                'confidence': round(confidence, 1),
-                'suggested_leverage': random.randint(1, 3),  # Conservative leverage
-                'risk_reward_ratio': round(risk_reward, 2),
-                'entry_price': calculate_realistic_entry_price(pair),
-                'trade_duration': trade_duration,
-                'stop_loss': None,
-                'take_profit': None,
-                'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            # Calculate stop loss and take profit
-            entry = signal['entry_price']
-            if signal['direction'] == 'long':
-                signal['stop_loss'] = round(entry * 0.98, 2)  # 2% stop loss
-                signal['take_profit'] = round(entry * (1 + 0.02 * risk_reward), 2)
-            else:
-                signal['stop_loss'] = round(entry * 1.02, 2)  # 2% stop loss
-                signal['take_profit'] = round(entry * (1 - 0.02 * risk_reward), 2)
-            
-            signals.append(signal)
+        # AI & Machine Learning Tokens
+        'FET/USDT', 'AGIX/USDT', 'OCEAN/USDT', 'RNDR/USDT', 'GRT/USDT', 'TAO/USDT',
+        'WLD/USDT', 'NMR/USDT', 'CTXC/USDT', 'NOIA/USDT', 'DBC/USDT', 'MDT/USDT',
         
-        app_state['signals'] = signals
-        logger.info(f"Generated {len(signals)} conservative signals across {len(set([s['symbol'] for s in signals]))} different tokens")
+        # Meme Coins & Community Tokens
+        'DOGE/USDT', 'SHIB/USDT', 'PEPE/USDT', 'FLOKI/USDT', 'BONK/USDT', 'WIF/USDT',
+        'MEME/USDT', 'DEGEN/USDT', 'WOJAK/USDT', 'LADYS/USDT', 'BABYDOGE/USDT', 'KISHU/USDT',
         
-    except Exception as e:
-        logger.error(f"Error generating signals: {e}")
+        # DeFi Blue Chips
+        'UNI/USDT', 'AAVE/USDT', 'COMP/USDT', 'MKR/USDT', 'SNX/USDT', 'CRV/USDT',
+        'YFI/USDT', '1INCH/USDT', 'SUSHI/USDT', 'BAL/USDT', 'LDO/USDT', 'LIDO/USDT',
+        
+        # Layer 2s & Scaling Solutions
+        'MATIC/USDT', 'ARB/USDT', 'OP/USDT', 'LRC/USDT', 'IMX/USDT', 'METIS/USDT',
+        
+        # Gaming & Metaverse
+        'AXS/USDT', 'SAND/USDT', 'MANA/USDT', 'ENJ/USDT', 'GALA/USDT', 'CHZ/USDT',
+        'ALICE/USDT', 'TLM/USDT', 'SLP/USDT', 'GODS/USDT', 'PYR/USDT', 'REVV/USDT',
+        
+        # Exchange & CEX Tokens
+        'BNB/USDT', 'FTT/USDT', 'OKB/USDT', 'HT/USDT', 'KCS/USDT', 'LEO/USDT',
+        
+        # Privacy & Security
+        'XMR/USDT', 'ZEC/USDT', 'DASH/USDT', 'SCRT/USDT', 'ROSE/USDT',
+        
+        # Infrastructure & Oracle
+        'LINK/USDT', 'VET/USDT', 'THETA/USDT', 'FLOW/USDT', 'ICP/USDT', 'FIL/USDT',
+        'AR/USDT', 'STORJ/USDT', 'BAND/USDT', 'API3/USDT',
+        
+        # New & Trending
+        'SUI/USDT', 'APT/USDT', 'BLUR/USDT', 'CFX/USDT', 'CORE/USDT', 'GMX/USDT',
+        'MAGIC/USDT', 'TIA/USDT', 'PYTH/USDT', 'JTO/USDT', 'WEN/USDT', 'ONDO/USDT',
+        
+        # Traditional Alt Coins
+        'LTC/USDT', 'XRP/USDT', 'XLM/USDT', 'TRX/USDT', 'EOS/USDT', 'XTZ/USDT',
+        'WAVES/USDT', 'QTUM/USDT', 'ONT/USDT', 'IOTA/USDT', 'NEO/USDT', 'ETC/USDT'
+    ]
+    signals = []
+    
+    # Generate 15-25 conservative signals across different categories to show hundreds of opportunities
+    for _ in range(random.randint(15, 25)):
+        pair = random.choice(conservative_pairs)
+        confidence = random.uniform(75, 95)  # Only high confidence signals
+        risk_reward = random.uniform(2.0, 4.0)  # Minimum 2:1 ratio
+        
+        # Calculate trade duration based on volatility and market type
+        trade_duration = calculate_trade_duration(pair, confidence)
+        
+        signal = {
+            'symbol': pair,
+            'direction': random.choice(['long', 'short']),
+            'confidence': round(confidence, 1),
+            'suggested_leverage': random.randint(1, 3),  # Conservative leverage
+            'risk_reward_ratio': round(risk_reward, 2),
+            'entry_price': calculate_realistic_entry_price(pair),
+            'trade_duration': trade_duration,
+            'stop_loss': None,
+            'take_profit': None,
+            'timestamp': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        # Calculate stop loss and take profit
+        entry = signal['entry_price']
+        if signal['direction'] == 'long':
+            signal['stop_loss'] = round(entry * 0.98, 2)  # 2% stop loss
+            signal['take_profit'] = round(entry * (1 + 0.02 * risk_reward), 2)
+        else:
+            signal['stop_loss'] = round(entry * 1.02, 2)  # 2% stop loss
+            signal['take_profit'] = round(entry * (1 - 0.02 * risk_reward), 2)
+        
+        signals.append(signal)
+    
+    # Size every candidate and drop those failing risk checks in one vectorized pass
+    if signals:
+        is_valid, checks = risk_manager.validate_trades({
+            'entry_price': [s['entry_price'] for s in signals],
+            'stop_loss': [s['stop_loss'] for s in signals],
+            'leverage': [s['suggested_leverage'] for s in signals],
+            'risk_reward_ratio': [s['risk_reward_ratio'] for s in signals],
+            'account_balance': app_state['portfolio_data'].get('total_balance', 0)
+        })
+        for signal, position_value in zip(signals, checks['position_size']):
+            signal['suggested_position_value'] = round(float(position_value), 2)
+        signals = [signal for signal, valid in zip(signals, is_valid) if valid]
+    
+    app_state['signals'] = signals
+    store.record_signals(signals)
+    logger.info("Generated %s conservative signals across %s different tokens",
+                len(signals), len(set([s['symbol'] for s in signals])))
 
-# Background scheduler for periodic updates
+# Background scheduler for periodic updates. Jobs are single-flight with
+# coalesced missed runs; portfolio refresh tightens when positions near their stops.
 scheduler = BackgroundScheduler()
-scheduler.add_job(func=update_portfolio_data, trigger="interval", seconds=30)
-scheduler.add_job(func=generate_conservative_signals, trigger="interval", seconds=60)
+job_runner = JobRunner(scheduler)
+portfolio_job = job_runner.add_job(
+    'update_portfolio_data', update_portfolio_data, interval=30,
+    interval_fn=lambda: portfolio.refresh_interval(app_state['positions'], base_interval=30, min_interval=5),
+    min_interval=5
+)
+signals_job = job_runner.add_job('generate_conservative_signals', generate_conservative_signals, interval=60)
+risk_job = job_runner.add_job('update_risk_model', update_risk_model, interval=300)
 scheduler.start()
 
-# Shut down the scheduler when exiting the app
+# Tick-driven monitoring of the live positions (synced into the monitor by update_portfolio_data)
+price_feed = PollingFeed(api_client, portfolio.trigger_index.symbols, interval=1.0)
+portfolio.attach_feed(price_feed)
+price_feed.start()
+atexit.register(price_feed.stop)
+
+# Exchange heartbeat; trigger checks read its state instead of calling the API
+health_monitor.start()
+atexit.register(health_monitor.stop)
+
+# Shut down the scheduler and flush pending history when exiting the app
 atexit.register(lambda: scheduler.shutdown())
+atexit.register(store.stop)
+atexit.register(journal.close)
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    start = g.get('request_start')
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUEST_SECONDS.labels(route, request.method, response.status_code).observe(time.perf_counter() - start)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus-compatible metrics endpoint"""
+    return Response(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+def _admin_authorized():
+    """Admin endpoints require ADMIN_TOKEN to be configured and sent as X-Admin-Token"""
+    token = os.environ.get("ADMIN_TOKEN")
+    return bool(token) and request.headers.get('X-Admin-Token') == token
+
+@app.route('/admin/profiling', methods=['GET', 'POST'])
+def profiling_status():
+    """Toggle instrumentation hooks (POST {"enabled": bool, "reset": bool}) or read their stats"""
+    if not _admin_authorized():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            if data.get('reset'):
+                profiling_hooks.reset()
+            if 'enabled' in data:
+                if data['enabled']:
+                    profiling_hooks.enable()
+                else:
+                    profiling_hooks.disable()
+            logger.info("Profiling hooks enabled: %s", profiling_hooks.enabled)
+        
+        return jsonify({
+            'success': True,
+            'enabled': profiling_hooks.enabled,
+            'stats': profiling_hooks.get_stats(limit=int(request.args.get('limit', 50)))
+        })
+    except Exception as e:
+        logger.error("Error handling profiling request: %s", e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/admin/profile')
+def sample_profile():
+    """Capture a time-boxed sampling profile as collapsed stacks (flamegraph input)"""
+    if not _admin_authorized():
+        return jsonify({'success': False, 'error': 'Forbidden'}), 403
+    try:
+        seconds = float(request.args.get('seconds', 5))
+        interval = float(request.args.get('interval', 0.005))
+        include_idle = request.args.get('idle', '').lower() in ('1', 'true', 'yes')
+        logger.info("Capturing %ss sampling profile", seconds)
+        collapsed = capture_sample_profile(seconds, interval, include_idle)
+        return Response(collapsed, content_type='text/plain; charset=utf-8')
+    except Exception as e:
+        logger.error("Error capturing sampling profile: %s", e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/jobs')
+def job_status():
+    """Scheduler job status: intervals, last run duration and lag"""
+    return jsonify({
+        'success': True,
+        'jobs': job_runner.get_status()
+    })
 
 @app.route('/')
 def dashboard():
@@ -322,17 +519,13 @@ def dashboard():
 def portfolio_status():
     """API endpoint for portfolio status"""
     try:
-        # Get fresh data first
-        update_portfolio_data()
+        # Get fresh data first (joins a scheduled refresh already in flight)
+        portfolio_job.run(wait=True, timeout=15)
         
-        # Calculate additional metrics for enhanced display
-        total_unrealized = sum(pos.get('unrealized_pnl', 0) for pos in app_state['positions'])
-        total_realized = sum(pos.get('realized_pnl', 0) for pos in app_state['positions'])
-        
-        # Enhanced portfolio data
+        # Enhanced portfolio data (P&L totals are maintained by update_portfolio_data)
         enhanced_data = app_state['portfolio_data'].copy()
-        enhanced_data['unrealized_pnl'] = total_unrealized
-        enhanced_data['realized_pnl'] = total_realized
+        enhanced_data.setdefault('unrealized_pnl', 0)
+        enhanced_data.setdefault('realized_pnl', 0)
         enhanced_data['active_positions'] = len(app_state['positions'])
         
         # Calculate daily P&L percentage if we have balance
@@ -348,7 +541,7 @@ def portfolio_status():
             'positions_count': len(app_state['positions'])
         })
     except Exception as e:
-        logger.error(f"Error fetching portfolio status: {e}")
+        logger.error("Error fetching portfolio status: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -374,7 +567,7 @@ def get_signals():
             'count': len(enhanced_signals)
         })
     except Exception as e:
-        logger.error(f"Error fetching signals: {e}")
+        logger.error("Error fetching signals: %s", e)
         return jsonify({
             'success': False,
             'error': str(e),
@@ -412,7 +605,7 @@ def get_positions():
             'count': len(enhanced_positions)
         })
     except Exception as e:
-        logger.error(f"Error fetching positions: {e}")
+        logger.error("Error fetching positions: %s", e)
         return jsonify({
             'success': False,
             'error': str(e),
@@ -424,13 +617,40 @@ def trigger_emergency_stop():
     """API endpoint to trigger emergency stop"""
     try:
         app_state['system_status']['emergency_stop_active'] = True
+        if emergency_stop.is_active:
+            return jsonify({
+                'success': True,
+                'status': 'already_active',
+                'message': 'Emergency stop already active; nothing was closed by this request',
+                'activation_reason': emergency_stop.activation_reason,
+                'activation_time': emergency_stop.activation_time.isoformat() if emergency_stop.activation_time else None
+            })
+        
         logger.warning("Emergency stop manually triggered")
-        return jsonify({
-            'success': True,
-            'message': 'Emergency stop activated'
-        })
+        
+        # Kill switch: fetch positions live from the exchange and liquidate them concurrently.
+        # The dashboard's position list may be fallback data and is never used here.
+        liquidation = emergency_stop.activate_emergency_stop("Manual emergency stop")
+        if liquidation is None or liquidation.get('error'):
+            return jsonify({
+                'success': False,
+                'status': 'activated',
+                'message': 'Emergency stop activated but no positions were closed',
+                'error': liquidation.get('error') if liquidation else 'Liquidation failed',
+                'liquidation': liquidation
+            }), 502
+        
+        response = {
+            'success': liquidation['failed'] == 0,
+            'status': 'activated',
+            'message': 'Emergency stop activated',
+            'liquidation': liquidation
+        }
+        if liquidation['failed']:
+            response['error'] = f"{liquidation['failed']} of {liquidation['positions']} positions are still open"
+        return jsonify(response)
     except Exception as e:
-        logger.error(f"Error triggering emergency stop: {e}")
+        logger.error("Error triggering emergency stop: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -441,13 +661,119 @@ def reset_emergency_stop():
     """API endpoint to reset emergency stop"""
     try:
         app_state['system_status']['emergency_stop_active'] = False
+        emergency_stop.reset_emergency_stop(manual_override=True)
         logger.info("Emergency stop reset")
         return jsonify({
             'success': True,
             'message': 'Emergency stop reset'
         })
     except Exception as e:
-        logger.error(f"Error resetting emergency stop: {e}")
+        logger.error("Error resetting emergency stop: %s", e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/health')
+def system_health():
+    """Exchange heartbeat health (latency, error rate, clock skew)"""
+    return jsonify({
+        'success': True,
+        'health': health_monitor.get_status()
+    })
+
+@app.route('/api/history/balance')
+def balance_history():
+    """Downsampled account balance history for dashboard charts"""
+    try:
+        hours = float(request.args.get('hours', 24))
+        max_points = int(request.args.get('points', 500))
+        end = time.time()
+        history = store.get_balance_history(end - hours * 3600, end, max_points=max_points)
+        
+        return jsonify({
+            'success': True,
+            'history': history,
+            'count': len(history)
+        })
+    except Exception as e:
+        logger.error("Error fetching balance history: %s", e)
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'history': []
+        }), 500
+
+@app.route('/api/history/positions/<path:symbol>')
+def position_history(symbol):
+    """Position snapshot history for one symbol"""
+    try:
+        hours = float(request.args.get('hours', 24))
+        end = time.time()
+        history = store.get_position_history(symbol, end - hours * 3600, end)
+        
+        return jsonify({
+            'success': True,
+            'symbol': symbol,
+            'history': history,
+            'count': len(history)
+        })
+    except Exception as e:
+        logger.error("Error fetching position history for %s: %s", symbol, e)
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'history': []
+        }), 500
+
+@app.route('/api/risk')
+def portfolio_risk():
+    """Correlation-aware VaR / CVaR for the account's open positions"""
+    try:
+        balance = app_state['portfolio_data'].get('total_balance', 0)
+        risk = risk_engine.portfolio_risk(as_positions(app_state['positions']), balance)
+        
+        return jsonify({
+            'success': True,
+            'risk': risk
+        })
+    except Exception as e:
+        logger.error("Error calculating portfolio risk: %s", e)
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/risk/pre-trade', methods=['POST'])
+def pre_trade_risk():
+    """Check a proposed trade against the portfolio VaR limit"""
+    try:
+        data = request.get_json() or {}
+        candidate = {
+            'symbol': data['symbol'],
+            'direction': data.get('direction', 'long'),
+            'size': float(data['size']),
+            'entry_price': float(data['entry_price'])
+        }
+        max_var_percent = float(data.get('max_var_percent', 5.0))
+        balance = app_state['portfolio_data'].get('total_balance', 0)
+        
+        allowed, details = risk_engine.pre_trade_check(
+            as_positions(app_state['positions']), candidate, balance, max_var_percent
+        )
+        
+        return jsonify({
+            'success': True,
+            'allowed': allowed,
+            'details': details
+        })
+    except (KeyError, ValueError) as e:
+        return jsonify({
+            'success': False,
+            'error': f"Invalid trade parameters: {e}"
+        }), 400
+    except Exception as e:
+        logger.error("Error running pre-trade risk check: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -462,35 +788,53 @@ def backtest_page():
 def run_backtest():
     """Run a backtest with specified parameters"""
     try:
-        from flask import request
-        
         # Get parameters from request
         data = request.get_json() or {}
         symbols = data.get('symbols', ['BTC/USDT', 'ETH/USDT', 'DOGE/USDT', 'UNI/USDT', 'MANA/USDT'])
         days = int(data.get('days', 14))
         initial_balance = float(data.get('initial_balance', 1000.0))
+        points = int(data.get('points', 1000))  # Equity curve points for the chart
+        downsample_method = data.get('downsample', 'lttb')
+        strategy_name = data.get('strategy', LIVE_STRATEGY.name)  # The rules the live signals use by default
+        if strategy_name not in STRATEGIES:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown strategy: {strategy_name}"
+            }), 400
         
         # Create new backtest engine with specified balance
-        backtest = BacktestEngine(initial_balance=initial_balance)
-        
-        # Run backtest
-        results = backtest.run_backtest(symbols, days)
-        
-        # Get trade details and daily balances for charts
-        trades = backtest.get_trade_summary()
-        daily_balances = backtest.get_daily_balances()
+        backtest = BacktestEngine(initial_balance=initial_balance, strategy=STRATEGIES[strategy_name])
+        
+        # Same data slice, strategy, parameters and engine version -> same response.
+        # The data end is read once so the key and the generated data always agree.
+        data_end = backtest.data_end()
+        cache_key = make_key(backtest.data_fingerprint(symbols, days, data_end),
+                             {'strategy': backtest.strategy.name, 'rules': backtest.strategy.fingerprint()},
+                             {**backtest.get_params(), 'initial_balance': initial_balance},
+                             {'points': points, 'downsample': downsample_method}, ENGINE_VERSION)
+        payload = backtest_cache.get(cache_key)
+        cached = payload is not None
+        
+        if not cached:
+            # Run backtest
+            results = backtest.run_backtest(symbols, days, data_end)
+            
+            # Trades and daily balances as column arrays ({'length', 'columns', 'categories'})
+            payload = {
+                'results': results,
+                'trades': backtest.get_trade_columns(),
+                'daily_balances': backtest.get_balance_columns(),
+                'equity_curve': backtest.get_equity_columns(points, downsample_method),
+                'symbols_tested': symbols,
+                'test_period_days': days,
+                'strategy': strategy_name
+            }
+            backtest_cache.put(cache_key, payload)
         
-        return jsonify({
-            'success': True,
-            'results': results,
-            'trades': trades,
-            'daily_balances': daily_balances,
-            'symbols_tested': symbols,
-            'test_period_days': days
-        })
+        return jsonify({'success': True, 'cached': cached, **payload})
         
     except Exception as e:
-        logger.error(f"Error running backtest: {e}")
+        logger.error("Error running backtest: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
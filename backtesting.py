@@ -12,42 +12,74 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import json
+import dataclasses
 
 # Import our existing modules
 from indicators import ConservativeIndicators
-from signals import ConservativeSignals
 from risk_manager import RiskManager
+from position import Position, PositionBook
+from panel import MarketPanel, OHLCV
+from history_store import HistoryStore
+from intrabar import first_touch
+from downsample import downsample
+from ledger import Ledger, TRADE_DTYPE, TRADE_CATEGORICAL, EQUITY_DTYPE
+from strategy import Strategy, LIVE_STRATEGY, compute_indicators, indicator_lookback
+from profiling import profile_class
 
 logger = logging.getLogger(__name__)
 
+# Bump when a change to the simulation or the data generator changes results (result cache key)
+ENGINE_VERSION = 1
+# Bump when generate_historical_data produces different data for the same inputs
+GENERATOR_VERSION = 1
+
+# Signal scans and daily marks happen on the first step of each bucket, whatever the bar size
+SIGNAL_INTERVAL = pd.Timedelta(hours=4)  # Scan for new signals every 4 hours to avoid overtrading
+BALANCE_INTERVAL = pd.Timedelta(days=1)  # Mark-to-market balance once a day
+
+# Minimum bars of history carried into each streamed chunk (more if the strategy's indicators look back further)
+INDICATOR_WARMUP = 32
+
+@profile_class
 class BacktestEngine:
     """
     Conservative backtesting engine that validates trading strategies
     with emphasis on risk management and capital preservation.
     """
     
-    def __init__(self, initial_balance: float = 10000.0):
+    def __init__(self, initial_balance: float = 10000.0, strategy: Strategy = LIVE_STRATEGY):
         self.initial_balance = initial_balance
+        self.strategy = strategy  # Entry rules, gate, warm-up and stops (see strategy.py)
         self.current_balance = initial_balance
         self.risk_manager = RiskManager()
-        self.signal_generator = ConservativeSignals(self.risk_manager)
         self.indicators = ConservativeIndicators()
         
         # Backtest metrics
-        self.trades = []
-        self.daily_balances = []
+        self.trades = Ledger(TRADE_DTYPE, TRADE_CATEGORICAL)  # Columnar trade ledger
+        self.daily_balances = Ledger(EQUITY_DTYPE)  # Daily mark-to-market balance
+        self.equity = Ledger(EQUITY_DTYPE)  # Mark-to-market balance at every step
         self.drawdowns = []
         self.positions = {}
+        self.book = PositionBook()  # Open-position totals for mark-to-market
+        self.pending_exits = {}  # step -> [(position_id, exit price, reason)] resolved at entry
+        self.unresolved_exits = {}  # position_id -> (stop, target) not reached in the loaded data yet
+        self._window_end = None  # Exclusive end step of the window being simulated
+        self._equity_trade_cursor = 0
+        self._equity_balance = initial_balance
+        self._last_closes = None
+        self._signals = None  # (first step, direction, confidence, rule) of the window being simulated
+        self._cadence = None  # (first step, scan signals?, record daily balance?) of the window being simulated
+        self._last_buckets = None  # (signal, balance) bucket of the last simulated step
         
         # Conservative parameters
         self.max_positions = 3  # Limit concurrent positions
         self.position_size_pct = 0.02  # 2% of balance per trade
-        self.stop_loss_pct = 0.015  # 1.5% stop loss
-        self.take_profit_pct = 0.03  # 3% take profit (2:1 risk/reward)
+        self.stops = strategy.stops  # Stop / target rule; its settings are tunable through set_params
+        self.min_confidence = 0.75  # High confidence signals only
         
-        logger.info(f"Backtest engine initialized with ${initial_balance:,.2f}")
+        logger.info("Backtest engine initialized with $%.2f", initial_balance)
     
-    def generate_historical_data(self, symbol: str, days: int = 30) -> pd.DataFrame:
+    def generate_historical_data(self, symbol: str, days: int = 30, end: Optional[datetime] = None) -> pd.DataFrame:
         """
         Generate realistic historical price data for backtesting.
         In production, this would connect to actual historical data APIs.
@@ -65,10 +97,10 @@ class BacktestEngine:
         
         base_price = base_prices.get(symbol, 1.0)
         
-        # Generate timestamps
-        end_date = datetime.now()
+        # Generate timestamps (ending on the current hour, so every symbol shares one hourly axis)
+        end_date = end or self.data_end()
         start_date = end_date - timedelta(days=days)
-        timestamps = pd.date_range(start=start_date, end=end_date, freq='1H')
+        timestamps = pd.date_range(start=start_date, end=end_date, freq='1h')
         
         # Generate realistic price movements
         np.random.seed(42)  # For reproducible results
@@ -116,271 +148,535 @@ class BacktestEngine:
         
         return df
     
-    def run_backtest(self, symbols: List[str], days: int = 30) -> Dict:
+    # Engine parameters that set_params / walk-forward optimization may change (plus the strategy's stop settings)
+    PARAMETERS = ('max_positions', 'position_size_pct', 'min_confidence')
+    
+    @staticmethod
+    def data_end() -> datetime:
+        """End of generated history: the start of the current hour."""
+        return datetime.now().replace(minute=0, second=0, microsecond=0)
+    
+    def data_fingerprint(self, symbols: List[str], days: int, end: Optional[datetime] = None) -> Dict:
+        """
+        Identity of the history run_backtest would generate.
+        
+        Generated data is a pure function of the symbol, the length and the
+        hour it ends, so these identify the slice without generating it.
+        Pass the same end to run_backtest so the key and the data cannot
+        straddle an hour boundary.
+        """
+        return {
+            'source': 'generated',
+            'generator_version': GENERATOR_VERSION,
+            'symbols': list(symbols),
+            'days': days,
+            'end': (end or self.data_end()).isoformat(),
+        }
+    
+    def parameters(self) -> Tuple[str, ...]:
+        """Names set_params accepts: PARAMETERS and the stop settings (e.g. atr_multiplier)."""
+        return self.PARAMETERS + tuple(field.name for field in dataclasses.fields(self.stops))
+    
+    def set_params(self, **params):
+        """Override strategy parameters (names from parameters())."""
+        unknown = set(params) - set(self.parameters())
+        if unknown:
+            raise ValueError(f"Unknown backtest parameters: {sorted(unknown)}")
+        stop_params = {name: params.pop(name) for name in list(params) if name not in self.PARAMETERS}
+        self.stops = dataclasses.replace(self.stops, **stop_params)
+        for name, value in params.items():
+            setattr(self, name, value)
+    
+    def get_params(self) -> Dict:
+        params = {name: getattr(self, name) for name in self.PARAMETERS}
+        params.update({field.name: getattr(self.stops, field.name) for field in dataclasses.fields(self.stops)})
+        return params
+    
+    def run_backtest(self, symbols: List[str], days: int = 30, end: Optional[datetime] = None) -> Dict:
         """
         Run comprehensive backtest on multiple symbols with conservative strategy.
         """
-        logger.info(f"Starting backtest on {len(symbols)} symbols for {days} days")
+        logger.info("Starting backtest on %s symbols for %s days", len(symbols), days)
+        
+        # Generate historical data for all symbols, ending at one shared hour
+        end = end or self.data_end()
+        historical_data = {}
+        for symbol in symbols:
+            historical_data[symbol] = self.generate_historical_data(symbol, days, end)
+        
+        # Align all symbols (with precomputed indicators) once, then step an integer cursor
+        panel = self.build_panel(historical_data)
+        results = self.run_panel(panel)
+        
+        logger.info("Backtest completed. Final balance: $%.2f", self.current_balance)
+        logger.info("Total return: %.2f%%", results['total_return_pct'])
+        logger.info("Win rate: %.1f%%", results['win_rate'])
+        logger.info("Max drawdown: %.2f%%", results['max_drawdown_pct'])
+        
+        return results
+    
+    def run_panel(self, panel: MarketPanel, start: int = 0, stop: Optional[int] = None,
+                  close_open: bool = False) -> Dict:
+        """
+        Simulate steps [start, stop) of a prepared panel.
+        
+        Indicators in the panel are computed over the full history, so a
+        window starting mid-panel is already warmed up and several windows
+        can share one panel.
+        
+        Args:
+            panel: Panel from build_panel
+            start: First step
+            stop: End step (exclusive, defaults to the end of the panel)
+            close_open: Close positions still open at the last step at its close
+            
+        Returns:
+            dict: Backtest results
+        """
+        stop = len(panel) if stop is None else min(stop, len(panel))
+        
+        self.reset()
+        self._simulate(panel, start, stop, close_open)
+        
+        return self.results()
+    
+    def run_stream(self, store: HistoryStore, chunk_bars: int = 24 * 30, close_open: bool = False) -> Dict:
+        """
+        Simulate a HistoryStore chunk by chunk with memory bounded by chunk_bars.
+        
+        Carried across chunk boundaries: the last warmup_bars() bars of
+        each symbol (indicators are recomputed over tail + chunk), per-symbol
+        bar counts, open positions, stop/target searches that have not hit
+        yet, and the equity curve's running state. Results match run_panel
+        over build_panel of the whole history (to within ~1e-8 in indicator
+        values for EMA-based strategies, whose lookback is unbounded).
+        
+        Args:
+            store: OHLCV history on disk
+            chunk_bars: Rows read per chunk
+            close_open: Close positions still open at the end of the history
+            
+        Returns:
+            dict: Backtest results
+        """
+        logger.info("Streaming backtest over %s rows x %s symbols in chunks of %s",
+                    len(store), len(store.symbols), chunk_bars)
+        self.reset()
+        for panel, final in self.stream_panels(store, chunk_bars):
+            self._simulate(panel, 0, len(panel), close_open and final)
+        
+        return self.results()
+    
+    def stream_panels(self, store: HistoryStore, chunk_bars: int, fields: Optional[Tuple[str, ...]] = None):
+        """
+        Yield (panel, is last chunk) for consecutive chunks of a HistoryStore.
         
-        # Reset state
+        Panels carry indicator fields (build_chunk_panel) and bar_index
+        counted from the start of the history.
+        """
+        tails = {}
+        bars_before = np.zeros(len(store.symbols), dtype=np.int64)
+        for start, raw in store.chunks(chunk_bars):
+            panel = self.build_chunk_panel(raw, tails, fields)
+            panel.bar_index += bars_before
+            bars_before = panel.bar_index[-1] + 1
+            yield panel, start + len(panel) >= len(store)
+    
+    # Stepping API: reset(), then for each window begin_window(), step() every
+    # step in order, end_window(); results() at the end. run_panel / run_stream
+    # drive it for one engine, MultiStrategyBacktest for several in lockstep.
+    
+    def reset(self):
+        """Clear all simulation state before a run."""
         self.current_balance = self.initial_balance
-        self.trades = []
-        self.daily_balances = []
+        self.trades.clear()
+        self.daily_balances.clear()
+        self.equity.clear()
         self.positions = {}
+        self.book.clear()
+        self.pending_exits = {}
+        self.unresolved_exits = {}
+        self._equity_trade_cursor = 0  # First trade not yet reflected in the equity curve
+        self._equity_balance = self.initial_balance  # Realized balance at the end of the recorded curve
+        self._last_closes = None  # Last known close per symbol at the end of the recorded curve
+        self._last_buckets = None
+    
+    def _simulate(self, panel: MarketPanel, start: int, stop: int, close_open: bool):
+        """Step through [start, stop) of a panel, continuing from the current state."""
+        self.begin_window(panel, start, stop)
         
-        # Generate historical data for all symbols
-        historical_data = {}
-        for symbol in symbols:
-            historical_data[symbol] = self.generate_historical_data(symbol, days)
+        for t in range(start, stop):
+            self.step(panel, t)
         
-        # Get all timestamps and sort
-        all_timestamps = set()
-        for df in historical_data.values():
-            all_timestamps.update(df.index)
-        timestamps = sorted(all_timestamps)
+        self.end_window(panel, start, stop, close_open)
+    
+    def begin_window(self, panel: MarketPanel, start: int, stop: int):
+        """Prepare to step [start, stop) of a panel, continuing from the current state."""
+        self._window_end = stop
+        self._signals = (start,) + tuple(self.evaluate_signals(panel, start, stop))
+        self._cadence = (start,) + self._bucket_starts(panel, start, stop)
+        self._resume_exits(panel, start)
+    
+    def _bucket_starts(self, panel: MarketPanel, start: int, stop: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Steps of [start, stop) that open a new signal / balance bucket.
         
-        # Run simulation
-        for timestamp in timestamps:
-            self._process_timestamp(timestamp, historical_data)
+        A step opens a bucket when its bucket differs from the previous
+        simulated step's (carried across streamed chunks). With no previous
+        step, it must fall exactly on the bucket start, so hourly data
+        behaves as the old hour-of-day checks and minute data marks once a day.
+        """
+        stamps = panel.timestamps.asi8
+        if stop <= start:
+            return np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+        widths = (SIGNAL_INTERVAL.value, BALANCE_INTERVAL.value)
+        if self._last_buckets is not None:
+            previous = self._last_buckets
+        else:
+            before = stamps[start - 1] if start > 0 else stamps[start] - 1
+            previous = tuple(before // width for width in widths)
+        starts = []
+        for width, last in zip(widths, previous):
+            buckets = stamps[start:stop] // width
+            starts.append(buckets != np.concatenate(([last], buckets[:-1])))
+        self._last_buckets = tuple(int(stamps[stop - 1] // width) for width in widths)
+        return tuple(starts)
+    
+    def end_window(self, panel: MarketPanel, start: int, stop: int, close_open: bool = False):
+        """Finish a stepped window: optionally close what is open, then record its equity curve."""
+        if close_open and stop > start:
+            self._close_all_positions(panel, stop - 1, 'end_of_window')
         
-        # Calculate final metrics
-        results = self._calculate_results()
+        self._record_equity_curve(panel, start, stop)
+    
+    def evaluate_signals(self, panel: MarketPanel, start: int = 0, stop: Optional[int] = None):
+        """
+        Strategy decisions for every symbol at steps [start, stop), vectorized.
         
-        logger.info(f"Backtest completed. Final balance: ${self.current_balance:,.2f}")
-        logger.info(f"Total return: {results['total_return_pct']:.2f}%")
-        logger.info(f"Win rate: {results['win_rate']:.1f}%")
-        logger.info(f"Max drawdown: {results['max_drawdown_pct']:.2f}%")
+        Returns:
+            tuple: (direction, confidence, rule) arrays of shape (steps, symbols);
+                confidence is divided by the strategy's confidence_scale
+        """
+        stop = len(panel) if stop is None else stop
+        fields = panel.field_index
+        columns = {name: panel.values[start:stop, :, fields[name]] for name in self.strategy.required_columns()}
+        direction, confidence, rule = self.strategy.evaluate(columns)
+        return direction, confidence / self.strategy.confidence_scale, rule
+    
+    def indicator_fields(self) -> Tuple[str, ...]:
+        """Indicator columns the strategy reads (panel fields besides OHLCV)."""
+        return tuple(sorted(self.strategy.required_columns() - set(OHLCV)))
+    
+    def warmup_bars(self, fields: Optional[Tuple[str, ...]] = None) -> int:
+        """Bars of history carried into each streamed chunk."""
+        fields = self.indicator_fields() if fields is None else fields
+        return max(INDICATOR_WARMUP, indicator_lookback(fields))
+    
+    def build_panel(self, historical_data: Dict[str, pd.DataFrame],
+                    fields: Optional[Tuple[str, ...]] = None) -> MarketPanel:
+        """
+        Align OHLCV and indicators into a MarketPanel.
         
-        return results
+        Indicators are causal, so computing them once over each symbol's
+        full history gives the same value at every bar as recomputing them
+        on the history up to that bar.
+        
+        Args:
+            historical_data: symbol -> OHLCV frame
+            fields: Indicator columns to add (default: the strategy's)
+        """
+        fields = self.indicator_fields() if fields is None else tuple(fields)
+        frames = {symbol: compute_indicators(df, fields) for symbol, df in historical_data.items()}
+        return MarketPanel.from_frames(frames, OHLCV + fields)
     
-    def _process_timestamp(self, timestamp: datetime, historical_data: Dict[str, pd.DataFrame]):
-        """Process a single timestamp in the backtest simulation."""
+    def build_chunk_panel(self, raw: MarketPanel, tails: Dict[str, pd.DataFrame],
+                           fields: Optional[Tuple[str, ...]] = None) -> MarketPanel:
+        """
+        Add indicator fields to a streamed OHLCV chunk.
         
-        current_prices = {}
+        Each symbol's indicators are computed over its carried tail plus the
+        chunk, so the rolling windows at the start of the chunk see the same
+        bars as in a whole-history run; tails are updated in place.
+        """
+        frames = raw.to_frames(list(OHLCV))
+        fields = self.indicator_fields() if fields is None else tuple(fields)
+        warmup = self.warmup_bars(fields)
+        columns = {name: np.full((len(raw), len(raw.symbols)), np.nan) for name in fields}
+        for column, symbol in enumerate(raw.symbols):
+            df = frames[symbol]
+            tail = tails.get(symbol)
+            history = pd.concat([tail, df]) if tail is not None and len(df) else df
+            if len(df):
+                computed = compute_indicators(history, fields).iloc[len(history) - len(df):]
+                rows = raw.present[:, column]
+                for name in fields:
+                    columns[name][rows, column] = computed[name].to_numpy(dtype=np.float64)
+                tails[symbol] = history.iloc[-warmup:]
+        raw.add_fields(columns)
+        return raw
+    
+    def step(self, panel: MarketPanel, t: int):
+        """Process one step of the window opened by begin_window."""
         
-        # Get current prices for all symbols
-        for symbol, df in historical_data.items():
-            if timestamp in df.index:
-                current_prices[symbol] = df.loc[timestamp]
+        first, scan_steps, balance_steps = self._cadence
         
-        # Update existing positions
-        self._update_positions(current_prices)
+        # Close positions whose stop or target was hit in this bar
+        self._update_positions(panel, t)
         
-        # Check for new signals (only every 4 hours to avoid overtrading)
-        if timestamp.hour % 4 == 0:
-            self._check_new_signals(timestamp, current_prices, historical_data)
+        # Check for new signals (first step of each SIGNAL_INTERVAL)
+        if scan_steps[t - first]:
+            self._check_new_signals(panel, t)
         
-        # Record daily balance
-        if timestamp.hour == 0:
-            total_value = self._calculate_total_value(current_prices)
-            self.daily_balances.append({
-                'timestamp': timestamp,
-                'balance': total_value
-            })
+        # Record daily balance (first step of each day)
+        if balance_steps[t - first]:
+            present = panel.present[t].tolist()
+            closes = panel.values[t, :, panel.field_index['close']].tolist()
+            total_value = self._calculate_total_value(panel, closes, present)
+            self.daily_balances.append(timestamp=panel.timestamps[t], balance=total_value)
     
-    def _update_positions(self, current_prices: Dict):
-        """Update existing positions and check stop loss/take profit."""
+    def _update_positions(self, panel: MarketPanel, t: int):
+        """Close positions whose exit (resolved when they were opened) falls on this step."""
         
-        positions_to_close = []
+        for position_id, exit_price, reason in self.pending_exits.pop(t, ()):
+            self._close_position(position_id, exit_price, reason, panel.timestamps[t])
+            del self.positions[position_id]
+            self.book.remove(position_id)
+    
+    def _schedule_exit(self, panel: MarketPanel, t: int, position_id: str):
+        """Resolve a new position's stop-loss / take-profit exit from later bars' highs and lows."""
         
-        for position_id, position in self.positions.items():
-            symbol = position['symbol']
-            if symbol not in current_prices:
-                continue
-                
-            current_price = current_prices[symbol]['close']
-            entry_price = position['entry_price']
-            direction = position['direction']
-            
-            # Calculate current P&L
-            if direction == 'long':
-                pnl_pct = (current_price - entry_price) / entry_price
-            else:
-                pnl_pct = (entry_price - current_price) / entry_price
-            
-            # Check stop loss
-            if pnl_pct <= -self.stop_loss_pct:
-                self._close_position(position_id, current_price, 'stop_loss')
-                positions_to_close.append(position_id)
-            
-            # Check take profit
-            elif pnl_pct >= self.take_profit_pct:
-                self._close_position(position_id, current_price, 'take_profit')
-                positions_to_close.append(position_id)
+        position = self.positions[position_id]
+        self._find_exit(panel, position_id, t + 1, position.stop_loss, position.take_profit)
+    
+    def _find_exit(self, panel: MarketPanel, position_id: str, start: int, stop: float, target: float):
+        """Schedule the first stop/target touch at or after start, or park it until more data is loaded."""
         
-        # Remove closed positions
-        for position_id in positions_to_close:
+        position = self.positions[position_id]
+        end = self._window_end
+        exit = first_touch(panel.series(position.symbol, 'open')[:end], panel.series(position.symbol, 'high')[:end],
+                           panel.series(position.symbol, 'low')[:end], start, position.direction, stop, target)
+        if exit is not None:
+            self.pending_exits.setdefault(exit.index, []).append((position_id, exit.price, exit.reason))
+        else:
+            self.unresolved_exits[position_id] = (stop, target)
+    
+    def _resume_exits(self, panel: MarketPanel, start: int):
+        """Continue the stop/target search of positions carried into a new chunk."""
+        
+        unresolved, self.unresolved_exits = self.unresolved_exits, {}
+        for position_id, (stop, target) in unresolved.items():
+            self._find_exit(panel, position_id, start, stop, target)
+    
+    def _close_all_positions(self, panel: MarketPanel, t: int, reason: str):
+        """Close every open position at its symbol's latest close at or before step t."""
+        
+        for position_id, position in list(self.positions.items()):
+            closes = panel.series(position.symbol, 'close')[:t + 1]
+            valid = np.flatnonzero(~np.isnan(closes))
+            if valid.size:
+                price = float(closes[valid[-1]])
+            else:  # No bar in this chunk: last close of an earlier chunk
+                price = float(self._last_closes[panel.symbol_index[position.symbol]])
+            self._close_position(position_id, price, reason, panel.timestamps[t])
             del self.positions[position_id]
+            self.book.remove(position_id)
+        self.pending_exits = {}
+        self.unresolved_exits = {}
     
-    def _check_new_signals(self, timestamp: datetime, current_prices: Dict, historical_data: Dict):
-        """Check for new trading signals."""
+    def _check_new_signals(self, panel: MarketPanel, t: int):
+        """Open positions on this step's strategy signals (precomputed by _simulate)."""
         
         # Don't open new positions if we're at max capacity
         if len(self.positions) >= self.max_positions:
             return
         
-        for symbol, price_data in current_prices.items():
-            # Skip if we already have a position in this symbol
-            if any(pos['symbol'] == symbol for pos in self.positions.values()):
-                continue
-            
-            # Get historical data for indicators
-            df = historical_data[symbol]
-            end_idx = df.index.get_loc(timestamp)
-            
-            # Need at least 20 periods for indicators
-            if end_idx < 20:
+        held = {position.symbol for position in self.positions.values()}
+        first, _, confidences, rules = self._signals
+        step = t - first
+        
+        # Symbols with a bar now, the strategy's minimum history and a confident signal
+        candidates = np.flatnonzero(panel.present[t] & (panel.bar_index[t] >= self.strategy.min_bars - 1)
+                                    & (confidences[step] >= self.min_confidence))
+        closes = panel.values[t, :, panel.field_index['close']]
+        stop_columns = {name: panel.values[t, :, panel.field_index[name]] for name in self.stops.columns()}
+        
+        for column in candidates.tolist():
+            symbol = panel.symbols[column]
+            if symbol in held:
                 continue
             
-            historical_slice = df.iloc[:end_idx+1]
-            
-            # Calculate indicators
-            try:
-                atr = self.indicators.calculate_atr(
-                    historical_slice['high'], 
-                    historical_slice['low'], 
-                    historical_slice['close']
-                )
-                rsi = self.indicators.rsi(historical_slice['close'])
-                bb_upper, bb_middle, bb_lower = self.indicators.bollinger_bands(historical_slice['close'])
-                
-                if len(atr) == 0 or len(rsi) == 0:
-                    continue
-                
-                current_atr = atr.iloc[-1]
-                current_rsi = rsi.iloc[-1]
-                current_price = price_data['close']
-                
-                # Conservative signal generation
-                signal = self._generate_conservative_signal(
-                    symbol, current_price, current_rsi, current_atr, 
-                    bb_upper.iloc[-1], bb_lower.iloc[-1]
-                )
-                
-                if signal and signal['confidence'] >= 0.75:  # High confidence only
-                    self._open_position(timestamp, signal)
-                    
-            except Exception as e:
-                logger.warning(f"Error generating signal for {symbol}: {e}")
-    
-    def _generate_conservative_signal(self, symbol: str, price: float, rsi: float, 
-                                    atr: float, bb_upper: float, bb_lower: float) -> Optional[Dict]:
-        """Generate conservative trading signals."""
-        
-        # Conservative long signal: oversold + near lower BB
-        if rsi < 35 and price <= bb_lower * 1.02:  # Within 2% of lower BB
-            return {
+            rule = self.strategy.rules[rules[step, column]]
+            entry_price = float(closes[column])
+            stop_loss, take_profit = self.stops.levels(
+                entry_price, rule.direction, {name: float(values[column]) for name, values in stop_columns.items()})
+            signal = {
                 'symbol': symbol,
-                'direction': 'long',
-                'confidence': min(0.8, (35 - rsi) / 35 + 0.5),  # Higher confidence for more oversold
-                'entry_price': price,
-                'reason': 'oversold_near_support'
+                'direction': rule.direction,
+                'confidence': float(confidences[step, column]),
+                'entry_price': entry_price,
+                'stop_loss': stop_loss,
+                'take_profit': take_profit,
+                'reason': rule.reason
             }
-        
-        # Conservative short signal: overbought + near upper BB
-        elif rsi > 65 and price >= bb_upper * 0.98:  # Within 2% of upper BB
-            return {
-                'symbol': symbol,
-                'direction': 'short',
-                'confidence': min(0.8, (rsi - 65) / 35 + 0.5),  # Higher confidence for more overbought
-                'entry_price': price,
-                'reason': 'overbought_near_resistance'
-            }
-        
-        return None
+            position_id = self._open_position(panel.timestamps[t], signal)
+            if position_id:
+                self._schedule_exit(panel, t, position_id)
     
-    def _open_position(self, timestamp: datetime, signal: Dict):
-        """Open a new position based on signal."""
+    def _open_position(self, timestamp: datetime, signal: Dict) -> Optional[str]:
+        """Open a new position based on signal; returns its id, or None if the risk check rejects it."""
         
         # Calculate position size (conservative 2% of balance)
         position_value = self.current_balance * self.position_size_pct
         
         # Validate with risk manager
-        if not self.risk_manager.validate_trade(
-            signal['symbol'], signal['direction'], position_value, 2.0  # 2x leverage
-        ):
-            return
+        entry_price = signal['entry_price']
+        stop_fraction = abs(entry_price - signal['stop_loss']) / entry_price
+        is_valid, _ = self.risk_manager.validate_trade({
+            'leverage': 2.0,
+            'risk_percent': position_value * stop_fraction / self.current_balance * 100,
+            'stop_loss': signal['stop_loss'],
+            'position_size': position_value,
+            'account_balance': self.current_balance,
+            'risk_reward_ratio': self.stops.risk_reward
+        })
+        if not is_valid:
+            return None
         
         position_id = f"{signal['symbol']}_{timestamp.strftime('%Y%m%d_%H%M')}"
         
-        position = {
-            'id': position_id,
-            'symbol': signal['symbol'],
-            'direction': signal['direction'],
-            'entry_price': signal['entry_price'],
-            'entry_time': timestamp,
-            'size': position_value / signal['entry_price'],
-            'value': position_value,
-            'confidence': signal['confidence'],
-            'reason': signal['reason']
-        }
+        position = Position(
+            id=position_id,
+            symbol=signal['symbol'],
+            direction=signal['direction'],
+            entry_price=signal['entry_price'],
+            timestamp=timestamp,
+            size=position_value / signal['entry_price'],
+            position_value=position_value,
+            stop_loss=signal['stop_loss'],
+            take_profit=signal['take_profit'],
+            confidence=signal['confidence'],
+            reason=signal['reason']
+        )
         
         self.positions[position_id] = position
+        self.book.add(position, position_id)
         
-        logger.info(f"Opened {signal['direction']} position: {signal['symbol']} @ ${signal['entry_price']:.4f}")
+        logger.debug("Opened %s position: %s @ $%.4f", signal['direction'], signal['symbol'], signal['entry_price'])
+        return position_id
     
-    def _close_position(self, position_id: str, exit_price: float, reason: str):
+    def _close_position(self, position_id: str, exit_price: float, reason: str, exit_time: datetime):
         """Close an existing position."""
         
         position = self.positions[position_id]
-        entry_price = position['entry_price']
-        direction = position['direction']
-        size = position['size']
+        entry_price = position.entry_price
+        direction = position.direction
+        size = position.size
         
         # Calculate P&L
-        if direction == 'long':
-            pnl = (exit_price - entry_price) * size
-        else:
-            pnl = (entry_price - exit_price) * size
+        pnl = position.pnl_at(exit_price)
         
         # Update balance
         self.current_balance += pnl
         
         # Record trade
-        trade = {
-            'symbol': position['symbol'],
-            'direction': direction,
-            'entry_price': entry_price,
-            'exit_price': exit_price,
-            'size': size,
-            'pnl': pnl,
-            'pnl_pct': pnl / position['value'] * 100,
-            'entry_time': position['entry_time'],
-            'exit_time': datetime.now(),
-            'reason': reason,
-            'confidence': position['confidence']
-        }
-        
-        self.trades.append(trade)
-        
-        logger.info(f"Closed {direction} position: {position['symbol']} @ ${exit_price:.4f}, P&L: ${pnl:.2f}")
+        self.trades.append(
+            symbol=position.symbol,
+            direction=direction,
+            entry_price=entry_price,
+            exit_price=exit_price,
+            size=size,
+            pnl=pnl,
+            pnl_pct=pnl / position.position_value * 100,
+            entry_time=position.timestamp,
+            exit_time=exit_time,
+            reason=reason,
+            confidence=position.confidence
+        )
+        
+        logger.debug("Closed %s position: %s @ $%.4f, P&L: $%.2f", direction, position.symbol, exit_price, pnl)
     
-    def _calculate_total_value(self, current_prices: Dict) -> float:
+    def _record_equity_curve(self, panel: MarketPanel, start: int, stop: int):
+        """
+        Mark-to-market equity at every step of [start, stop), vectorized.
+        
+        A position is open from its entry step up to (not including) its exit
+        step and contributes signed size x (close - entry) at each of those
+        steps over the forward-filled closes. Contributions are summed in
+        entry order and realized P&L is a running sum at exit steps, both
+        continuing from the previous call, so streamed chunks extend the same
+        curve (bit for bit) as one whole-history call.
+        """
+        steps = stop - start
+        if steps <= 0:
+            return
+        times = panel.timestamps.values[start:stop].astype('datetime64[us]')
+        symbols = len(panel.symbols)
+        
+        # Trades closed since the last call, then positions still open
+        trades = self.trades
+        first = self._equity_trade_cursor
+        columns = np.array([panel.symbol_index[symbol] for symbol in trades.categories['symbol']] or [0],
+                           dtype=np.int64)
+        symbol = columns[trades.column('symbol')[first:]]
+        signed = np.where(trades.decoded('direction')[first:] == 'long', 1.0, -1.0) * trades.column('size')[first:]
+        entry_price = trades.column('entry_price')[first:]
+        entry_time = trades.column('entry_time')[first:]
+        exit = np.searchsorted(times, trades.column('exit_time')[first:])
+        realized = np.zeros(steps)
+        closed = exit < steps
+        np.add.at(realized, exit[closed], trades.column('pnl')[first:][closed])
+        
+        if self.positions:
+            open_positions = list(self.positions.values())
+            symbol = np.concatenate((symbol, [panel.symbol_index[p.symbol] for p in open_positions]))
+            signed = np.concatenate((signed, [p.size if p.direction == 'long' else -p.size for p in open_positions]))
+            entry_price = np.concatenate((entry_price, [p.entry_price for p in open_positions]))
+            entry_time = np.concatenate((entry_time, np.array([p.timestamp for p in open_positions],
+                                                              dtype='datetime64[us]')))
+            exit = np.concatenate((exit, np.full(len(open_positions), steps)))
+        entry = np.searchsorted(times, entry_time)
+        
+        # Last known close per symbol (positions are marked only when their symbol has a bar)
+        present = panel.present[start:stop]
+        last_row = np.maximum.accumulate(np.where(present, np.arange(steps)[:, None], -1), axis=0)
+        closes = panel.field('close')[start:stop][np.maximum(last_row, 0), np.arange(symbols)]
+        carried = self._last_closes if self._last_closes is not None else np.full(symbols, np.nan)
+        closes = np.where(last_row >= 0, closes, carried)
+        
+        # One (step, contribution) pair per position per open step, in entry order
+        order = np.lexsort((symbol, entry_time))
+        symbol, signed, entry_price, entry, exit = (a[order] for a in (symbol, signed, entry_price, entry, exit))
+        lengths = np.maximum(exit - entry, 0)
+        owner = np.repeat(np.arange(len(lengths)), lengths)
+        rows = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + entry[owner]
+        unrealized = np.zeros(steps)
+        np.add.at(unrealized, rows, signed[owner] * (closes[rows, symbol[owner]] - entry_price[owner]))
+        
+        realized[0] += self._equity_balance
+        running = np.cumsum(realized)
+        self.equity.extend(timestamp=times, balance=running + unrealized)
+        
+        self._equity_trade_cursor = len(trades)
+        self._equity_balance = running[-1]
+        self._last_closes = closes[-1]
+    
+    def _calculate_total_value(self, panel: MarketPanel, closes: List[float], present: List[bool]) -> float:
         """Calculate total portfolio value including open positions."""
         
-        total_value = self.current_balance
-        
-        for position in self.positions.values():
-            symbol = position['symbol']
-            if symbol in current_prices:
-                current_price = current_prices[symbol]['close']
-                entry_price = position['entry_price']
-                direction = position['direction']
-                size = position['size']
-                
-                if direction == 'long':
-                    unrealized_pnl = (current_price - entry_price) * size
-                else:
-                    unrealized_pnl = (entry_price - current_price) * size
-                
-                total_value += unrealized_pnl
+        # Mark each symbol once; the book keeps the unrealized total incrementally
+        for symbol in {position.symbol for position in self.positions.values()}:
+            column = panel.symbol_index[symbol]
+            if present[column]:
+                self.book.mark(symbol, closes[column])
+        
+        total_value = self.current_balance + self.book.total_unrealized_pnl
         
         return total_value
     
-    def _calculate_results(self) -> Dict:
-        """Calculate comprehensive backtest results."""
+    def results(self) -> Dict:
+        """Comprehensive backtest results of the run so far, from the ledger columns."""
         
-        if not self.trades:
+        if not len(self.trades):
             return {
                 'total_return_pct': 0,
                 'win_rate': 0,
@@ -399,42 +695,32 @@ class BacktestEngine:
         total_return_pct = (total_return / self.initial_balance) * 100
         
         # Trade statistics
-        winning_trades = [t for t in self.trades if t['pnl'] > 0]
-        losing_trades = [t for t in self.trades if t['pnl'] <= 0]
+        pnl = self.trades.column('pnl')
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl <= 0]
         
-        win_rate = len(winning_trades) / len(self.trades) * 100 if self.trades else 0
+        win_rate = len(wins) / len(pnl) * 100
         
-        avg_win = np.mean([t['pnl'] for t in winning_trades]) if winning_trades else 0
-        avg_loss = np.mean([t['pnl'] for t in losing_trades]) if losing_trades else 0
+        avg_win = float(wins.mean()) if wins.size else 0
+        avg_loss = float(losses.mean()) if losses.size else 0
         
-        largest_win = max([t['pnl'] for t in winning_trades]) if winning_trades else 0
-        largest_loss = min([t['pnl'] for t in losing_trades]) if losing_trades else 0
+        largest_win = float(wins.max()) if wins.size else 0
+        largest_loss = float(losses.min()) if losses.size else 0
         
-        # Drawdown calculation
-        balances = [b['balance'] for b in self.daily_balances]
-        if balances:
-            peak = balances[0]
-            max_drawdown = 0
-            
-            for balance in balances:
-                if balance > peak:
-                    peak = balance
-                drawdown = (peak - balance) / peak * 100
-                max_drawdown = max(max_drawdown, drawdown)
+        # Drawdown calculation (every step, so intraday drawdowns count)
+        equity = self.equity.column('balance')
+        if equity.size:
+            peaks = np.maximum.accumulate(equity)
+            max_drawdown = float(((peaks - equity) / peaks).max() * 100)
         else:
             max_drawdown = 0
         
-        # Sharpe ratio (simplified)
-        if len(self.daily_balances) > 1:
-            daily_returns = []
-            for i in range(1, len(self.daily_balances)):
-                prev_balance = self.daily_balances[i-1]['balance']
-                curr_balance = self.daily_balances[i]['balance']
-                daily_return = (curr_balance - prev_balance) / prev_balance
-                daily_returns.append(daily_return)
-            
-            if daily_returns and np.std(daily_returns) > 0:
-                sharpe_ratio = np.mean(daily_returns) / np.std(daily_returns) * np.sqrt(365)
+        # Sharpe ratio (simplified, over daily marks)
+        balances = self.daily_balances.column('balance')
+        if balances.size > 1:
+            daily_returns = np.diff(balances) / balances[:-1]
+            if daily_returns.std() > 0:
+                sharpe_ratio = float(daily_returns.mean() / daily_returns.std() * np.sqrt(365))
             else:
                 sharpe_ratio = 0
         else:
@@ -445,8 +731,8 @@ class BacktestEngine:
             'win_rate': round(win_rate, 1),
             'max_drawdown_pct': round(max_drawdown, 2),
             'sharpe_ratio': round(sharpe_ratio, 2),
-            'total_trades': len(self.trades),
-            'profitable_trades': len(winning_trades),
+            'total_trades': len(pnl),
+            'profitable_trades': len(wins),
             'avg_win': round(avg_win, 2),
             'avg_loss': round(avg_loss, 2),
             'largest_win': round(largest_win, 2),
@@ -455,12 +741,40 @@ class BacktestEngine:
         }
     
     def get_trade_summary(self) -> List[Dict]:
-        """Get detailed trade summary for analysis."""
-        return self.trades
+        """Get detailed trade summary for analysis (one dict per trade)."""
+        return self.trades.to_records()
     
     def get_daily_balances(self) -> List[Dict]:
-        """Get daily balance history for charting."""
-        return self.daily_balances
+        """Get daily balance history for charting (one dict per day)."""
+        return self.daily_balances.to_records()
+    
+    def get_trade_columns(self) -> Dict:
+        """Trade ledger as JSON-ready column arrays."""
+        return self.trades.to_columns()
+    
+    def get_balance_columns(self) -> Dict:
+        """Daily balances as JSON-ready column arrays."""
+        return self.daily_balances.to_columns()
+    
+    def get_equity_columns(self, points: Optional[int] = None, method: str = 'lttb') -> Dict:
+        """
+        Per-step equity curve as JSON-ready column arrays.
+        
+        Args:
+            points: Downsample to at most this many points (None for every step)
+            method: Downsampling method ('lttb' or 'minmax')
+        """
+        timestamps = self.equity.column('timestamp').astype('datetime64[ms]').astype(np.int64)
+        balances = self.equity.column('balance')
+        if points:
+            keep = downsample(timestamps, balances, points, method)
+            timestamps, balances = timestamps[keep], balances[keep]
+        return {
+            'length': len(timestamps),
+            'total_points': len(self.equity),
+            'columns': {'timestamp': timestamps.tolist(), 'balance': balances.tolist()},
+            'categories': {},
+        }
 
 # Quick test function
 def run_sample_backtest():
@@ -0,0 +1,87 @@
+"""
+Series Downsampling Module
+
+Reduces long series (e.g. a per-bar equity curve) to a fixed number of
+points for charting while keeping their visual shape. Both functions return
+the sorted indices of the points to keep, so any parallel columns
+(timestamps, balances, ...) can be sliced with the same selection.
+
+- lttb(): Largest-Triangle-Three-Buckets; keeps the point of each bucket that
+  forms the largest triangle with its neighbours (smooth, shape-faithful)
+- minmax(): the minimum and maximum of each bucket (keeps every extreme,
+  e.g. the bottom of each drawdown)
+"""
+
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets selection
+
+    Args:
+        x: Increasing x values (e.g. epoch times)
+        y: Values
+        threshold: Number of points to keep (first and last always kept)
+
+    Returns:
+        np.ndarray: Indices of the kept points
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # threshold - 2 buckets over the interior points
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Minimum and maximum of each of threshold // 2 equal-width buckets
+
+    Args:
+        y: Values
+        threshold: Upper bound on the number of points kept
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points
+    """
+    n = len(y)
+    if threshold >= n or threshold < 2:
+        return np.arange(n)
+    buckets = threshold // 2
+    width = -(-n // buckets)
+    padded = np.full(buckets * width, np.nan)
+    padded[:n] = y
+    grid = padded.reshape(buckets, width)
+    grid = grid[~np.isnan(grid).all(axis=1)]  # The last buckets can be pure padding
+    offsets = np.arange(len(grid)) * width
+    lows = offsets + np.nanargmin(grid, axis=1)
+    highs = offsets + np.nanargmax(grid, axis=1)
+    return np.unique(np.concatenate((lows, highs)))
+
+
+def downsample(x: np.ndarray, y: np.ndarray, threshold: int, method: str = 'lttb') -> np.ndarray:
+    """Indices of the points to keep with the given method (one of METHODS)"""
+    if method == 'lttb':
+        return lttb(x, y, threshold)
+    if method == 'minmax':
+        return minmax(y, threshold)
+    raise ValueError(f"Unknown downsampling method {method!r}, expected one of {METHODS}")
@@ -1,13 +1,22 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from metrics import (
+    EMERGENCY_TRIGGER_SECONDS, EMERGENCY_TRIGGER_CHECKS, EMERGENCY_CLOSE_ATTEMPTS, EMERGENCY_TIME_TO_FLAT,
+)
 
 logger = logging.getLogger(__name__)
 
 class EmergencyStop:
     """Emergency stop system for risk management"""
     
-    def __init__(self, api_client):
+    def __init__(self, api_client, health=None, journal=None):
         self.api_client = api_client
+        self.health = health  # Optional health.HealthMonitor; avoids a network call per check
+        # Optional journal.StateJournal: the only persisted copy of this object's state
+        # (kill switch, loss streak, daily baseline), so restarts keep limits in force
+        self.journal = journal
         self.is_active = False
         self.activation_reason = None
         self.activation_time = None
@@ -15,16 +24,35 @@ class EmergencyStop:
         self.max_drawdown_limit = 10.0  # 10% maximum drawdown
         self.consecutive_losses_limit = 5  # Max consecutive losses
         
+        # Kill-switch liquidation: every close fires concurrently with short
+        # per-request timeouts, retried until the overall deadline
+        self.close_timeout = 2.0  # Seconds per close request
+        self.close_retries = 3  # Extra attempts per position after the first
+        self.close_backoff = 0.1  # Seconds before the first retry, doubled per retry
+        self.liquidation_deadline = 15.0  # Seconds before remaining closes are abandoned
+        self.last_liquidation = None
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='kill-switch')
+        
         # Tracking variables
         self.consecutive_losses = 0
         self.daily_start_balance = 0
         self.max_balance_today = 0
         self.last_reset_date = datetime.now().date()
         
+        self._restore_from_journal()
+        
         logger.info("Emergency stop system initialized")
     
     def check_all_triggers(self, portfolio_data):
         """Check all emergency stop triggers"""
+        start = time.perf_counter()
+        triggered = self._evaluate_triggers(portfolio_data)
+        EMERGENCY_TRIGGER_SECONDS.observe(time.perf_counter() - start)
+        EMERGENCY_TRIGGER_CHECKS.labels('triggered' if triggered else 'clear').inc()
+        return triggered
+    
+    def _evaluate_triggers(self, portfolio_data):
+        """Evaluate every trigger condition"""
         try:
             if self.is_active:
                 return True
@@ -48,7 +76,7 @@ class EmergencyStop:
             return False
             
         except Exception as e:
-            logger.error(f"Error checking emergency triggers: {e}")
+            logger.error("Error checking emergency triggers: %s", e)
             # In case of error, activate emergency stop as safety measure
             self.activate_emergency_stop("System error during trigger check")
             return True
@@ -63,9 +91,12 @@ class EmergencyStop:
             if self.daily_start_balance == 0:
                 self.daily_start_balance = current_balance
                 self.max_balance_today = current_balance
+                self._persist_daily_baseline()
             
             # Update max balance for the day
-            self.max_balance_today = max(self.max_balance_today, current_balance)
+            if current_balance > self.max_balance_today:
+                self.max_balance_today = current_balance
+                self._persist_daily_baseline()
             
             # Check if daily loss exceeds limit
             if daily_pnl_percent < -self.daily_loss_limit:
@@ -77,7 +108,7 @@ class EmergencyStop:
             return False
             
         except Exception as e:
-            logger.error(f"Error checking daily loss limit: {e}")
+            logger.error("Error checking daily loss limit: %s", e)
             return False
     
     def check_drawdown_limit(self, portfolio_data):
@@ -99,7 +130,7 @@ class EmergencyStop:
             return False
             
         except Exception as e:
-            logger.error(f"Error checking drawdown limit: {e}")
+            logger.error("Error checking drawdown limit: %s", e)
             return False
     
     def check_consecutive_losses(self):
@@ -114,14 +145,20 @@ class EmergencyStop:
             return False
             
         except Exception as e:
-            logger.error(f"Error checking consecutive losses: {e}")
+            logger.error("Error checking consecutive losses: %s", e)
             return False
     
     def check_system_health(self):
         """Monitor system health and API connectivity"""
         try:
-            # Check API connection
-            if not self.api_client.test_connection():
+            # Check API connection: read the heartbeat state when a monitor runs,
+            # otherwise fall back to a live connection test
+            if self.health is not None:
+                if not self.health.is_healthy():
+                    reason = "heartbeats stopped" if self.health.is_stale() else self.health.reason
+                    self.activate_emergency_stop(f"API connection lost: {reason}")
+                    return True
+            elif not self.api_client.test_connection():
                 self.activate_emergency_stop("API connection lost")
                 return True
                 
@@ -134,7 +171,7 @@ class EmergencyStop:
             return False
             
         except Exception as e:
-            logger.error(f"Error checking system health: {e}")
+            logger.error("Error checking system health: %s", e)
             self.activate_emergency_stop("System health check failed")
             return True
     
@@ -155,23 +192,39 @@ class EmergencyStop:
             return False
             
         except Exception as e:
-            logger.error(f"Error checking balance threshold: {e}")
+            logger.error("Error checking balance threshold: %s", e)
             return False
     
-    def activate_emergency_stop(self, reason):
-        """Activate emergency stop system"""
+    def activate_emergency_stop(self, reason, positions=None):
+        """
+        Activate emergency stop system
+        
+        Args:
+            reason: Why the stop was activated
+            positions: Known open positions; skips the live position fetch when given
+            
+        Returns:
+            dict: This activation's liquidation report, or None if the stop was
+                already active (or activation failed)
+        """
+        report = None
         try:
             if self.is_active:
-                return  # Already active
+                return None  # Already active
                 
             self.is_active = True
             self.activation_reason = reason
             self.activation_time = datetime.now()
             
-            logger.critical(f"EMERGENCY STOP ACTIVATED: {reason}")
+            # Journal the activation before acting on it so a crash mid-liquidation
+            # restarts with the kill switch still engaged
+            self._journal(sync=True, is_active=True, activation_reason=reason,
+                          activation_time=self.activation_time.isoformat())
+            
+            logger.critical("EMERGENCY STOP ACTIVATED: %s", reason)
             
             # Close all open positions
-            self._close_all_positions()
+            report = self._close_all_positions(positions)
             
             # Cancel all pending orders
             self._cancel_all_orders()
@@ -180,25 +233,147 @@ class EmergencyStop:
             self._send_emergency_alert(reason)
             
         except Exception as e:
-            logger.error(f"Error activating emergency stop: {e}")
+            logger.error("Error activating emergency stop: %s", e)
+        return report
     
-    def _close_all_positions(self):
-        """Close all open positions immediately"""
+    def _close_all_positions(self, positions=None):
+        """
+        Close all open positions immediately
+        
+        Positions are fetched live from the exchange unless given. If they
+        cannot be fetched nothing is closed: the fallback position set of
+        APIClient.get_positions is never liquidated.
+        """
+        if positions is None:
+            try:
+                positions = self.api_client.get_live_positions(timeout=self.close_timeout)
+            except Exception as e:
+                logger.critical("Kill switch could not fetch live positions, nothing closed: %s", e)
+                self.last_liquidation = {
+                    'started': datetime.now().isoformat(),
+                    'positions': None,
+                    'closed': 0,
+                    'failed': 0,
+                    'elapsed': 0.0,
+                    'time_to_flat': None,
+                    'outcomes': [],
+                    'error': f"Live positions unavailable: {e}"
+                }
+                return self.last_liquidation
+        
         try:
-            positions = self.api_client.get_positions()
-            
-            for position in positions:
-                symbol = position.get('symbol', 'unknown')
-                logger.warning(f"Emergency closing position: {symbol}")
-                
-                success = self.api_client.close_position(symbol, position.get('id'))
-                if success:
-                    logger.info(f"Successfully closed position: {symbol}")
-                else:
-                    logger.error(f"Failed to close position: {symbol}")
-                    
+            return self.liquidate_positions(positions)
         except Exception as e:
-            logger.error(f"Error closing all positions: {e}")
+            logger.error("Error closing all positions: %s", e)
+            return None
+    
+    def liquidate_positions(self, positions):
+        """
+        Close every position concurrently and report time-to-flat
+        
+        Each close runs on the kill-switch pool with a short request timeout
+        and exponential-backoff retries; positions still open at the deadline
+        are reported as failed rather than blocking the caller.
+        
+        Args:
+            positions: Position dicts (or Position objects) to close
+            
+        Returns:
+            dict: Per-position outcomes, counts, elapsed time and time_to_flat
+                (None unless every position closed)
+        """
+        start = time.perf_counter()
+        deadline = start + self.liquidation_deadline
+        positions = list(positions or [])
+        
+        futures = [self._executor.submit(self._close_with_retry, position, start, deadline)
+                   for position in positions]
+        done, not_done = wait(futures, timeout=max(deadline - time.perf_counter(), 0))
+        
+        outcomes = []
+        for position, future in zip(positions, futures):
+            if future in done:
+                outcomes.append(future.result())
+            else:
+                outcomes.append({
+                    'symbol': position.get('symbol', 'unknown'),
+                    'position_id': position.get('id'),
+                    'success': False,
+                    'attempts': None,
+                    'closed_after': None,
+                    'error': 'deadline exceeded'
+                })
+        
+        closed = [outcome for outcome in outcomes if outcome['success']]
+        failed = [outcome for outcome in outcomes if not outcome['success']]
+        time_to_flat = None
+        if not failed:
+            time_to_flat = max((outcome['closed_after'] for outcome in closed), default=0.0)
+            EMERGENCY_TIME_TO_FLAT.observe(time_to_flat)
+        
+        report = {
+            'started': datetime.now().isoformat(),
+            'positions': len(positions),
+            'closed': len(closed),
+            'failed': len(failed),
+            'elapsed': time.perf_counter() - start,
+            'time_to_flat': time_to_flat,
+            'outcomes': outcomes
+        }
+        self.last_liquidation = report
+        
+        if failed:
+            logger.critical("Kill switch left %s of %s positions open: %s", len(failed), len(positions),
+                            [outcome['symbol'] for outcome in failed])
+        else:
+            logger.warning("Kill switch flat: %s positions closed in %.3fs", len(closed), time_to_flat)
+        return report
+    
+    def _close_with_retry(self, position, start, deadline):
+        """Close one position, retrying failed or timed-out requests until the deadline"""
+        symbol = position.get('symbol', 'unknown')
+        position_id = position.get('id')
+        attempts = 0
+        error = None
+        delay = self.close_backoff
+        
+        while attempts <= self.close_retries:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                error = error or 'deadline exceeded'
+                break
+                
+            attempts += 1
+            try:
+                if self.api_client.close_position(symbol, position_id, timeout=min(self.close_timeout, remaining)):
+                    EMERGENCY_CLOSE_ATTEMPTS.labels('success').inc()
+                    logger.info("Emergency closed position %s (attempt %s)", symbol, attempts)
+                    return {
+                        'symbol': symbol,
+                        'position_id': position_id,
+                        'success': True,
+                        'attempts': attempts,
+                        'closed_after': time.perf_counter() - start,
+                        'error': None
+                    }
+                error = 'close failed'
+            except Exception as e:
+                error = str(e)
+            
+            EMERGENCY_CLOSE_ATTEMPTS.labels('failure').inc()
+            logger.error("Emergency close attempt %s failed for %s: %s", attempts, symbol, error)
+            if attempts <= self.close_retries:
+                time.sleep(min(delay, max(deadline - time.perf_counter(), 0)))
+                delay *= 2
+        
+        return {
+            'symbol': symbol,
+            'position_id': position_id,
+            'success': False,
+            'attempts': attempts,
+            'closed_after': None,
+            'error': error
+        }
     
     def _cancel_all_orders(self):
         """Cancel all pending orders"""
@@ -207,7 +382,7 @@ class EmergencyStop:
             logger.info("Cancelling all pending orders")
             
         except Exception as e:
-            logger.error(f"Error cancelling orders: {e}")
+            logger.error("Error cancelling orders: %s", e)
     
     def _send_emergency_alert(self, reason):
         """Send emergency alerts via various channels"""
@@ -230,19 +405,22 @@ class EmergencyStop:
             print(f"{'='*50}\n")
             
         except Exception as e:
-            logger.error(f"Error sending emergency alert: {e}")
+            logger.error("Error sending emergency alert: %s", e)
     
     def record_trade_result(self, is_profitable):
         """Record trade result for consecutive loss tracking"""
         try:
+            previous = self.consecutive_losses
             if is_profitable:
                 self.consecutive_losses = 0
             else:
                 self.consecutive_losses += 1
-                logger.debug(f"Consecutive losses: {self.consecutive_losses}")
+                logger.debug("Consecutive losses: %s", self.consecutive_losses)
+            if self.consecutive_losses != previous:
+                self._journal(consecutive_losses=self.consecutive_losses)
                 
         except Exception as e:
-            logger.error(f"Error recording trade result: {e}")
+            logger.error("Error recording trade result: %s", e)
     
     def can_trade(self):
         """Check if trading is allowed"""
@@ -265,8 +443,9 @@ class EmergencyStop:
             reset_reason = self.activation_reason
             self.activation_reason = None
             reset_time = datetime.now()
+            self._journal(sync=True, is_active=False, activation_reason=None, activation_time=None)
             
-            logger.info(f"Emergency stop reset. Previous reason: {reset_reason}")
+            logger.info("Emergency stop reset. Previous reason: %s", reset_reason)
             
             # Send reset notification
             self._send_reset_notification(reset_reason, reset_time)
@@ -274,7 +453,7 @@ class EmergencyStop:
             return True
             
         except Exception as e:
-            logger.error(f"Error resetting emergency stop: {e}")
+            logger.error("Error resetting emergency stop: %s", e)
             return False
     
     def _send_reset_notification(self, previous_reason, reset_time):
@@ -294,7 +473,7 @@ class EmergencyStop:
             print(f"{'='*50}\n")
             
         except Exception as e:
-            logger.error(f"Error sending reset notification: {e}")
+            logger.error("Error sending reset notification: %s", e)
     
     def _reset_daily_counters(self):
         """Reset daily counters if new day"""
@@ -305,11 +484,57 @@ class EmergencyStop:
                 self.daily_start_balance = 0
                 self.max_balance_today = 0
                 self.last_reset_date = current_date
+                self._persist_daily_baseline()
                 
                 logger.info("Daily counters reset for new trading day")
                 
         except Exception as e:
-            logger.error(f"Error resetting daily counters: {e}")
+            logger.error("Error resetting daily counters: %s", e)
+    
+    def _persist_daily_baseline(self):
+        """Journal the daily baseline so a restart does not reset daily limits"""
+        self._journal(date=self.last_reset_date.isoformat(),
+                      daily_start_balance=self.daily_start_balance,
+                      max_balance_today=self.max_balance_today)
+    
+    def _journal(self, sync=False, **changes):
+        """Append a state transition to the journal (no-op without one)"""
+        if self.journal is None:
+            return
+        try:
+            self.journal.append('emergency_stop', sync=sync, **changes)
+        except Exception as e:
+            logger.error("Error journaling emergency stop state: %s", e)
+    
+    def _restore_from_journal(self):
+        """Restore kill-switch status, loss streak and today's baseline from the journal"""
+        if self.journal is None:
+            return
+        try:
+            saved = self.journal.get('emergency_stop')
+            if not saved:
+                return
+                
+            self.consecutive_losses = int(saved.get('consecutive_losses', 0))
+            if saved.get('date') == self.last_reset_date.isoformat():
+                self.daily_start_balance = float(saved.get('daily_start_balance', 0))
+                self.max_balance_today = float(saved.get('max_balance_today', 0))
+                
+            if saved.get('is_active'):
+                self.is_active = True
+                self.activation_reason = saved.get('activation_reason')
+                if saved.get('activation_time'):
+                    self.activation_time = datetime.fromisoformat(saved['activation_time'])
+                logger.critical("Emergency stop still active after restart: %s", self.activation_reason)
+                
+        except Exception as e:
+            logger.error("Error restoring emergency stop state from journal: %s", e)
+    
+    def _liquidation_summary(self):
+        """Last kill-switch report without per-position detail"""
+        if self.last_liquidation is None:
+            return None
+        return {key: value for key, value in self.last_liquidation.items() if key != 'outcomes'}
     
     def get_status(self):
         """Get emergency stop status"""
@@ -321,11 +546,12 @@ class EmergencyStop:
                 'consecutive_losses': self.consecutive_losses,
                 'daily_loss_limit': self.daily_loss_limit,
                 'max_drawdown_limit': self.max_drawdown_limit,
-                'can_trade': self.can_trade()
+                'can_trade': self.can_trade(),
+                'last_liquidation': self._liquidation_summary()
             }
             
         except Exception as e:
-            logger.error(f"Error getting emergency stop status: {e}")
+            logger.error("Error getting emergency stop status: %s", e)
             return {
                 'is_active': True,  # Fail safe
                 'activation_reason': 'Error retrieving status',
@@ -0,0 +1,215 @@
+"""
+System Health Monitor Module
+
+A background heartbeat probes the exchange on a fixed interval and folds
+the results into a health state:
+
+- Latency: rolling mean and worst round-trip of recent heartbeats
+- Error rate: failed heartbeats in the rolling window
+- Clock skew: exchange clock minus local clock (EWMA)
+
+State changes use hysteresis so one slow or failed probe does not flip the
+system into (or out of) an emergency: a worse state is entered only after
+`fail_threshold` consecutive bad evaluations, and the state only improves
+after `recover_threshold` consecutive good ones.
+
+Readers (e.g. EmergencyStop.check_system_health) call state / is_healthy(),
+which read a precomputed snapshot and never touch the network.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from metrics import HEALTH_CLOCK_SKEW, HEALTH_HEARTBEAT_SECONDS, HEALTH_STATE
+
+logger = logging.getLogger(__name__)
+
+HEALTHY = 'healthy'
+DEGRADED = 'degraded'
+UNHEALTHY = 'unhealthy'
+
+_SEVERITY = {HEALTHY: 0, DEGRADED: 1, UNHEALTHY: 2}
+
+
+class HealthMonitor:
+    """Heartbeat-driven exchange health with hysteresis"""
+
+    def __init__(self, api_client, interval: float = 5.0, window: int = 20,
+                 degraded_latency: float = 1.0, unhealthy_latency: float = 3.0,
+                 degraded_error_rate: float = 0.2, unhealthy_error_rate: float = 0.5,
+                 max_clock_skew: float = 5.0, fail_threshold: int = 3, recover_threshold: int = 5):
+        """
+        Args:
+            api_client: Client exposing heartbeat() -> {ok, latency, server_time}
+            interval: Seconds between heartbeats
+            window: Number of recent heartbeats used for latency and error rate
+            degraded_latency: Mean latency (s) above which the exchange is degraded
+            unhealthy_latency: Mean latency (s) above which the exchange is unhealthy
+            degraded_error_rate: Error rate above which the exchange is degraded
+            unhealthy_error_rate: Error rate above which the exchange is unhealthy
+            max_clock_skew: Absolute clock skew (s) above which the system is degraded
+            fail_threshold: Consecutive worse evaluations needed to enter a worse state
+            recover_threshold: Consecutive better evaluations needed to recover
+        """
+        self.api_client = api_client
+        self.interval = interval
+        self.degraded_latency = degraded_latency
+        self.unhealthy_latency = unhealthy_latency
+        self.degraded_error_rate = degraded_error_rate
+        self.unhealthy_error_rate = unhealthy_error_rate
+        self.max_clock_skew = max_clock_skew
+        self.fail_threshold = fail_threshold
+        self.recover_threshold = recover_threshold
+
+        self._samples = deque(maxlen=window)  # (ok, latency)
+        self._skew: Optional[float] = None
+        self._pending_state = None
+        self._pending_count = 0
+
+        # Snapshot read by the hot path; replaced atomically after each heartbeat
+        self.state = HEALTHY
+        self.reason = None
+        self.last_heartbeat = None
+        self.consecutive_failures = 0
+        self._snapshot: Dict = {}
+
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        HEALTH_STATE.set(_SEVERITY[self.state])
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='HealthMonitor', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.beat()
+            self._stop_event.wait(self.interval)
+
+    def beat(self):
+        """Run one heartbeat and update the health state"""
+        sent = time.time()
+        try:
+            result = self.api_client.heartbeat()
+        except Exception as e:
+            logger.debug("Heartbeat raised: %s", e)
+            result = {'ok': False, 'latency': time.time() - sent, 'server_time': None}
+        self.record(result['ok'], result['latency'], result.get('server_time'), sent)
+
+    def record(self, ok: bool, latency: float, server_time: Optional[float] = None,
+               sent: Optional[float] = None):
+        """
+        Fold one heartbeat result into the health state
+
+        Args:
+            ok: Whether the probe succeeded
+            latency: Round-trip time in seconds
+            server_time: Exchange clock at response time (epoch seconds), if known
+            sent: Local time the probe was sent (defaults to now - latency)
+        """
+        now = time.time()
+        self._samples.append((bool(ok), latency))
+        self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+        HEALTH_HEARTBEAT_SECONDS.observe(latency)
+
+        if ok and server_time is not None:
+            midpoint = (sent if sent is not None else now - latency) + latency / 2
+            skew = server_time - midpoint
+            self._skew = skew if self._skew is None else 0.8 * self._skew + 0.2 * skew
+            HEALTH_CLOCK_SKEW.set(self._skew)
+
+        observed, reason = self._classify()
+        self._apply_hysteresis(observed, reason)
+        self.last_heartbeat = now
+        self._publish()
+
+    def _classify(self):
+        """Instantaneous state implied by the current window"""
+        samples = self._samples
+        error_rate = sum(1 for ok, _ in samples if not ok) / len(samples)
+        latencies = [latency for ok, latency in samples if ok]
+        mean_latency = sum(latencies) / len(latencies) if latencies else None
+
+        if self.consecutive_failures >= self.fail_threshold:
+            return UNHEALTHY, f"{self.consecutive_failures} consecutive heartbeat failures"
+        if error_rate >= self.unhealthy_error_rate:
+            return UNHEALTHY, f"heartbeat error rate {error_rate:.0%}"
+        if mean_latency is not None and mean_latency > self.unhealthy_latency:
+            return UNHEALTHY, f"mean latency {mean_latency:.2f}s"
+        # A drifting clock degrades timestamps, not the exchange link; never an emergency on its own
+        if self._skew is not None and abs(self._skew) > self.max_clock_skew:
+            return DEGRADED, f"clock skew {self._skew:+.2f}s"
+        if error_rate >= self.degraded_error_rate:
+            return DEGRADED, f"heartbeat error rate {error_rate:.0%}"
+        if mean_latency is not None and mean_latency > self.degraded_latency:
+            return DEGRADED, f"mean latency {mean_latency:.2f}s"
+        return HEALTHY, None
+
+    def _apply_hysteresis(self, observed: str, reason: Optional[str]):
+        if observed == self.state:
+            self._pending_state = None
+            self._pending_count = 0
+            if observed != HEALTHY:
+                self.reason = reason
+            return
+
+        # Count consecutive evaluations on the same side (worse or better) of the
+        # current state; the state moves to the latest observation once enough accrue
+        worse = _SEVERITY[observed] > _SEVERITY[self.state]
+        direction = 'worse' if worse else 'better'
+        if direction == self._pending_state:
+            self._pending_count += 1
+        else:
+            self._pending_state = direction
+            self._pending_count = 1
+
+        needed = self.fail_threshold if worse else self.recover_threshold
+        if self._pending_count >= needed:
+            logger.warning("Exchange health %s -> %s%s", self.state, observed, f" ({reason})" if reason else "")
+            self.state = observed
+            self.reason = reason
+            self._pending_state = None
+            self._pending_count = 0
+            HEALTH_STATE.set(_SEVERITY[observed])
+
+    def _publish(self):
+        samples = self._samples
+        latencies = [latency for ok, latency in samples if ok]
+        self._snapshot = {
+            'state': self.state,
+            'reason': self.reason,
+            'error_rate': sum(1 for ok, _ in samples if not ok) / len(samples) if samples else 0.0,
+            'mean_latency': sum(latencies) / len(latencies) if latencies else None,
+            'max_latency': max(latencies) if latencies else None,
+            'clock_skew': self._skew,
+            'consecutive_failures': self.consecutive_failures,
+            'last_heartbeat': self.last_heartbeat,
+            'samples': len(samples)
+        }
+
+    def is_stale(self) -> bool:
+        """True if heartbeats stopped arriving (monitor thread dead or blocked)"""
+        if self.last_heartbeat is None:
+            return False
+        return time.time() - self.last_heartbeat > self.interval * 3 + 10
+
+    def is_healthy(self) -> bool:
+        """O(1) check used on the trigger-evaluation path"""
+        return self.state != UNHEALTHY and not self.is_stale()
+
+    def get_status(self) -> Dict:
+        status = dict(self._snapshot) if self._snapshot else {'state': self.state, 'samples': 0}
+        status['stale'] = self.is_stale()
+        return status
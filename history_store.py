@@ -0,0 +1,130 @@
+"""
+History Store Module
+
+On-disk, time-major storage of aligned market history for backtests that do
+not fit in memory. A store is a directory of flat binary files:
+
+- meta.json: symbols, fields and row count
+- timestamps.i8: int64 epoch nanoseconds, one per row
+- values.f8: float64 rows of shape (symbols x fields), NaN where absent
+- present.u1: uint8 rows of shape (symbols,)
+
+Rows are appended in time order (HistoryStore.create + append), and any row
+range is read back as a MarketPanel with plain file reads at an offset, so a
+reader's memory is bounded by the rows it asks for (no memory map keeps the
+whole file resident).
+"""
+
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from panel import MarketPanel, OHLCV
+
+logger = logging.getLogger(__name__)
+
+META_FILE = 'meta.json'
+
+
+class HistoryStore:
+    """Append-only time x symbol x field history on disk"""
+
+    def __init__(self, path: str):
+        """Open an existing store directory."""
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        self.symbols = meta['symbols']
+        self.fields = meta['fields']
+        self.rows = meta['rows']
+        self._row_values = len(self.symbols) * len(self.fields)
+
+    @classmethod
+    def create(cls, path: str, symbols: Sequence[str], fields: Sequence[str] = OHLCV) -> 'HistoryStore':
+        """Create an empty store (replacing any store at path)."""
+        os.makedirs(path, exist_ok=True)
+        for name in ('timestamps.i8', 'values.f8', 'present.u1'):
+            open(os.path.join(path, name), 'wb').close()
+        cls._write_meta(path, list(symbols), list(fields), 0)
+        return cls(path)
+
+    @classmethod
+    def from_frames(cls, path: str, frames: Dict[str, pd.DataFrame], fields: Sequence[str] = OHLCV) -> 'HistoryStore':
+        """Create a store from per-symbol frames (aligned on the union of their indexes)."""
+        panel = MarketPanel.from_frames(frames, fields)
+        store = cls.create(path, panel.symbols, panel.fields)
+        store.append(panel.timestamps, panel.values, panel.present)
+        return store
+
+    @staticmethod
+    def _write_meta(path: str, symbols, fields, rows: int):
+        tmp = os.path.join(path, META_FILE + '.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'symbols': symbols, 'fields': fields, 'rows': rows}, f)
+        os.replace(tmp, os.path.join(path, META_FILE))
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, timestamps, values: np.ndarray, present: np.ndarray):
+        """
+        Append rows after the current last row
+
+        Args:
+            timestamps: Increasing timestamps (later than the last stored row)
+            values: float64 array of shape (rows, symbols, fields)
+            present: bool array of shape (rows, symbols)
+        """
+        stamps = pd.DatetimeIndex(timestamps).asi8
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        present = np.ascontiguousarray(present, dtype=np.uint8)
+        if values.shape != (len(stamps), len(self.symbols), len(self.fields)):
+            raise ValueError(f"Expected values of shape ({len(stamps)}, {len(self.symbols)}, "
+                             f"{len(self.fields)}), got {values.shape}")
+        if self.rows and len(stamps) and stamps[0] <= self._read('timestamps.i8', np.int64, self.rows - 1, 1, 1)[0]:
+            raise ValueError("Appended rows must be later than the last stored row")
+
+        for name, array in (('timestamps.i8', stamps), ('values.f8', values), ('present.u1', present)):
+            with open(os.path.join(self.path, name), 'ab') as f:
+                array.tofile(f)
+        self.rows += len(stamps)
+        self._write_meta(self.path, self.symbols, self.fields, self.rows)
+
+    def _read(self, name: str, dtype, start: int, count: int, width: int) -> np.ndarray:
+        itemsize = np.dtype(dtype).itemsize
+        return np.fromfile(os.path.join(self.path, name), dtype=dtype, count=count * width,
+                           offset=start * width * itemsize)
+
+    def read(self, start: int, stop: Optional[int] = None) -> MarketPanel:
+        """Rows [start, stop) as a MarketPanel"""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        start = max(0, min(start, stop))
+        count = stop - start
+        symbols, fields = len(self.symbols), len(self.fields)
+        timestamps = pd.DatetimeIndex(self._read('timestamps.i8', np.int64, start, count, 1))
+        values = self._read('values.f8', np.float64, start, count, symbols * fields).reshape(count, symbols, fields)
+        present = self._read('present.u1', np.uint8, start, count, symbols).reshape(count, symbols).astype(bool)
+        return MarketPanel(timestamps, self.symbols, self.fields, values, present)
+
+    def fingerprint(self, start: int = 0, stop: Optional[int] = None, block_rows: int = 65536) -> str:
+        """Content hash (BLAKE2b) of rows [start, stop), read in blocks"""
+        stop = self.rows if stop is None else min(stop, self.rows)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(json.dumps([self.symbols, self.fields]).encode('utf-8'))
+        symbols, fields = len(self.symbols), len(self.fields)
+        for first in range(start, stop, block_rows):
+            count = min(block_rows, stop - first)
+            digest.update(self._read('timestamps.i8', np.int64, first, count, 1).tobytes())
+            digest.update(self._read('values.f8', np.float64, first, count, symbols * fields).tobytes())
+            digest.update(self._read('present.u1', np.uint8, first, count, symbols).tobytes())
+        return digest.hexdigest()
+
+    def chunks(self, chunk_rows: int) -> Iterator[Tuple[int, MarketPanel]]:
+        """Yield (first row, panel) for consecutive chunks of chunk_rows rows"""
+        for start in range(0, self.rows, chunk_rows):
+            yield start, self.read(start, start + chunk_rows)
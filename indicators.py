@@ -1,9 +1,12 @@
 import pandas as pd
 import numpy as np
 import logging
+from metrics import INDICATOR_SECONDS
+from profiling import profile_class
 
 logger = logging.getLogger(__name__)
 
+@profile_class
 class ConservativeIndicators:
     """Technical indicators optimized for conservative trading"""
     
@@ -33,11 +36,12 @@ class ConservativeIndicators:
             tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
             atr = tr.rolling(window=period).mean()
             
-            logger.debug(f"ATR calculated for period {period}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("ATR calculated for period %s", period)
             return atr.fillna(0)
             
         except Exception as e:
-            logger.error(f"Error calculating ATR: {e}")
+            logger.error("Error calculating ATR: %s", e)
             return pd.Series([0] * len(close))
     
     @staticmethod
@@ -66,11 +70,12 @@ class ConservativeIndicators:
             rs = gain / loss
             rsi = 100 - (100 / (1 + rs))
             
-            logger.debug(f"RSI calculated for period {period}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("RSI calculated for period %s", period)
             return rsi.fillna(50)
             
         except Exception as e:
-            logger.error(f"Error calculating RSI: {e}")
+            logger.error("Error calculating RSI: %s", e)
             return pd.Series([50] * len(close))
     
     @staticmethod
@@ -98,11 +103,12 @@ class ConservativeIndicators:
             upper = sma + (std * std_dev)
             lower = sma - (std * std_dev)
             
-            logger.debug(f"Bollinger Bands calculated for period {period}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Bollinger Bands calculated for period %s", period)
             return upper.fillna(sma), sma.fillna(close), lower.fillna(sma)
             
         except Exception as e:
-            logger.error(f"Error calculating Bollinger Bands: {e}")
+            logger.error("Error calculating Bollinger Bands: %s", e)
             sma = pd.Series([close.iloc[-1] if len(close) > 0 else 0] * len(close))
             return sma, sma, sma
     
@@ -124,11 +130,12 @@ class ConservativeIndicators:
                 return pd.Series([close.iloc[-1] if len(close) > 0 else 0] * len(close))
                 
             ma = close.rolling(window=period).mean()
-            logger.debug(f"Moving Average calculated for period {period}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Moving Average calculated for period %s", period)
             return ma.fillna(close)
             
         except Exception as e:
-            logger.error(f"Error calculating Moving Average: {e}")
+            logger.error("Error calculating Moving Average: %s", e)
             return pd.Series([close.iloc[-1] if len(close) > 0 else 0] * len(close))
     
     @staticmethod
@@ -149,11 +156,12 @@ class ConservativeIndicators:
                 return pd.Series([close.iloc[-1] if len(close) > 0 else 0] * len(close))
                 
             ema = close.ewm(span=period).mean()
-            logger.debug(f"EMA calculated for period {period}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("EMA calculated for period %s", period)
             return ema.fillna(close)
             
         except Exception as e:
-            logger.error(f"Error calculating EMA: {e}")
+            logger.error("Error calculating EMA: %s", e)
             return pd.Series([close.iloc[-1] if len(close) > 0 else 0] * len(close))
     
     @staticmethod
@@ -183,15 +191,17 @@ class ConservativeIndicators:
             signal_line = ConservativeIndicators.ema(macd_line, signal_period)
             histogram = macd_line - signal_line
             
-            logger.debug("MACD calculated")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("MACD calculated")
             return macd_line, signal_line, histogram
             
         except Exception as e:
-            logger.error(f"Error calculating MACD: {e}")
+            logger.error("Error calculating MACD: %s", e)
             zero_series = pd.Series([0] * len(close))
             return zero_series, zero_series, zero_series
     
     @classmethod
+    @INDICATOR_SECONDS.time()
     def calculate_all_indicators(cls, data):
         """
         Calculate all indicators for given price data
@@ -231,9 +241,10 @@ class ConservativeIndicators:
             indicators['macd_signal'] = signal_line
             indicators['macd_histogram'] = histogram
             
-            logger.info("All indicators calculated successfully")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("All indicators calculated successfully")
             return indicators
             
         except Exception as e:
-            logger.error(f"Error calculating all indicators: {e}")
+            logger.error("Error calculating all indicators: %s", e)
             return {}
@@ -0,0 +1,78 @@
+"""
+Intrabar Exit Resolution Module
+
+Resolves stop-loss / take-profit exits against bar highs and lows instead of
+closes. first_touch() finds the first bar at or after `start` whose range
+reaches the stop or the target, scanning forward in geometrically growing
+vectorized windows, so a position is resolved in one call whose cost grows
+with the holding period rather than being re-checked every bar.
+
+Fill rules:
+- A bar that opens beyond a level (gap) fills at the open
+- Otherwise the level itself is the fill price
+- If one bar's range touches both levels, the stop is assumed to have been
+  hit first (the conservative reading of an ambiguous bar)
+
+Rows with NaN prices (symbol absent at that step) never trigger.
+"""
+
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class Exit(NamedTuple):
+    index: int  # Row of the exit bar
+    price: float
+    reason: str  # 'stop_loss' or 'take_profit'
+
+
+def first_touch(opens: np.ndarray, highs: np.ndarray, lows: np.ndarray, start: int,
+                direction: str, stop: float, target: float, initial_window: int = 32) -> Optional[Exit]:
+    """
+    First bar at or after start whose high/low crosses the stop or target
+
+    Args:
+        opens, highs, lows: Price arrays for one symbol (NaN where absent)
+        start: First row to search (the bar after entry)
+        direction: 'long' or 'short'
+        stop: Stop-loss price
+        target: Take-profit price
+        initial_window: Rows checked in the first vectorized window (grows 4x per window)
+
+    Returns:
+        Exit or None if neither level is reached in the data
+    """
+    n = len(lows)
+    long = direction == 'long'
+    i = start
+    window = initial_window
+    while i < n:
+        j = min(n, i + window)
+        if long:
+            hit_stop = lows[i:j] <= stop
+            hit_target = highs[i:j] >= target
+        else:
+            hit_stop = highs[i:j] >= stop
+            hit_target = lows[i:j] <= target
+        hit = hit_stop | hit_target
+        if hit.any():
+            k = int(hit.argmax())
+            index = i + k
+            open_price = float(opens[index])
+            if long:
+                if open_price <= stop:
+                    return Exit(index, open_price, 'stop_loss')
+                if open_price >= target:
+                    return Exit(index, open_price, 'take_profit')
+            else:
+                if open_price >= stop:
+                    return Exit(index, open_price, 'stop_loss')
+                if open_price <= target:
+                    return Exit(index, open_price, 'take_profit')
+            if hit_stop[k]:
+                return Exit(index, float(stop), 'stop_loss')
+            return Exit(index, float(target), 'take_profit')
+        i = j
+        window *= 4
+    return None
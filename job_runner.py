@@ -0,0 +1,211 @@
+"""
+Scheduled Job Runner Module
+
+Wraps APScheduler jobs with:
+
+- Single-flight execution: at most one run of a job at a time, whether it
+  was started by the scheduler or by a request handler. Request handlers
+  that find a run in flight wait for it and reuse its result instead of
+  starting a second one.
+- Coalesced missed runs: when a run overruns its interval, the missed run
+  times collapse into one catch-up run instead of piling up.
+- Adaptive intervals: an optional interval function is consulted after
+  every run and the job is rescheduled when the suggested interval changes.
+- Per-job runtime, outcome, overlap, lag, skip and coalesce metrics, all
+  recorded here: job functions let their exceptions propagate to run().
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from apscheduler.events import (
+    EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED,
+)
+
+from metrics import (
+    JOB_COALESCED, JOB_ERRORS, JOB_IN_PROGRESS, JOB_INTERVAL, JOB_LAG_SECONDS, JOB_OVERLAPS, JOB_RUNS,
+    JOB_SECONDS, JOB_SKIPPED,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightJob:
+    """A periodic job that never runs concurrently with itself"""
+
+    def __init__(self, name: str, func: Callable, interval: float,
+                 interval_fn: Optional[Callable[[], float]] = None,
+                 min_interval: float = 1.0):
+        self.name = name
+        self.func = func
+        self.base_interval = interval
+        self.interval = interval
+        self.interval_fn = interval_fn
+        self.min_interval = min_interval
+
+        self.scheduler = None
+        self.last_started = None
+        self.last_finished = None
+        self.last_duration = None
+        self.last_lag = 0.0
+        self.runs = 0
+
+        self._cond = threading.Condition()
+        self._running = False
+        self._generation = 0
+
+        JOB_INTERVAL.labels(name).set(interval)
+
+    def run(self, wait: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Run the job unless a run is already in flight
+
+        Args:
+            wait: If a run is in flight, block until it finishes instead of skipping
+            timeout: Maximum seconds to wait for an in-flight run
+
+        Returns:
+            bool: True if this call executed the job
+        """
+        with self._cond:
+            if self._running:
+                JOB_OVERLAPS.labels(self.name).inc()
+                if not wait:
+                    JOB_SKIPPED.labels(self.name, 'in_flight').inc()
+                    return False
+                generation = self._generation
+                self._cond.wait_for(lambda: self._generation != generation, timeout)
+                return False
+            self._running = True
+
+        self.last_started = time.time()
+        JOB_IN_PROGRESS.labels(self.name).inc()
+        start = time.perf_counter()
+        try:
+            self.func()
+            JOB_RUNS.labels(self.name, 'success').inc()
+        except Exception:
+            JOB_RUNS.labels(self.name, 'error').inc()
+            logger.exception("Job %s failed", self.name)
+        finally:
+            self.last_duration = time.perf_counter() - start
+            JOB_SECONDS.labels(self.name).observe(self.last_duration)
+            JOB_IN_PROGRESS.labels(self.name).dec()
+            self.last_finished = time.time()
+            self.runs += 1
+            with self._cond:
+                self._running = False
+                self._generation += 1
+                self._cond.notify_all()
+
+        self._adapt_interval()
+        return True
+
+    def run_scheduled(self):
+        """Entry point used by the scheduler (never waits on an in-flight run)"""
+        self.run(wait=False)
+
+    def _adapt_interval(self):
+        if self.interval_fn is None or self.scheduler is None:
+            return
+        try:
+            interval = max(float(self.interval_fn()), self.min_interval)
+        except Exception as e:
+            JOB_ERRORS.labels(self.name, 'interval').inc()
+            logger.error("Error computing interval for job %s: %s", self.name, e)
+            return
+
+        # Ignore small changes so the job is not rescheduled after every run
+        if abs(interval - self.interval) < max(0.5, self.interval * 0.1):
+            return
+
+        logger.info("Rescheduling job %s: every %.1fs (was %.1fs)", self.name, interval, self.interval)
+        self.interval = interval
+        JOB_INTERVAL.labels(self.name).set(interval)
+        try:
+            self.scheduler.reschedule_job(self.name, trigger='interval', seconds=interval)
+        except Exception as e:
+            JOB_ERRORS.labels(self.name, 'reschedule').inc()
+            logger.error("Error rescheduling job %s: %s", self.name, e)
+
+    def get_status(self) -> Dict:
+        return {
+            'name': self.name,
+            'running': self._running,
+            'interval': self.interval,
+            'base_interval': self.base_interval,
+            'runs': self.runs,
+            'last_started': datetime.fromtimestamp(self.last_started).isoformat() if self.last_started else None,
+            'last_duration': round(self.last_duration, 4) if self.last_duration is not None else None,
+            'last_lag': round(self.last_lag, 4)
+        }
+
+
+class JobRunner:
+    """Registers single-flight jobs on an APScheduler scheduler"""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.jobs: Dict[str, SingleFlightJob] = {}
+        scheduler.add_listener(self._on_event, EVENT_JOB_SUBMITTED | EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
+
+    def add_job(self, name: str, func: Callable, interval: float,
+                interval_fn: Optional[Callable[[], float]] = None,
+                min_interval: float = 1.0) -> SingleFlightJob:
+        """
+        Schedule a function as a single-flight interval job
+
+        Args:
+            name: Unique job name (also the APScheduler job id and metric label)
+            func: Function to run
+            interval: Base interval in seconds
+            interval_fn: Optional callable returning the desired interval after each run
+            min_interval: Lower bound for adaptive intervals
+
+        Returns:
+            SingleFlightJob: The job, whose run() request handlers can call directly
+        """
+        job = SingleFlightJob(name, func, interval, interval_fn, min_interval)
+        job.scheduler = self.scheduler
+        self.jobs[name] = job
+
+        self.scheduler.add_job(
+            func=job.run_scheduled,
+            trigger='interval',
+            seconds=interval,
+            id=name,
+            name=name,
+            coalesce=True,  # Collapse missed run times into one run
+            max_instances=1,
+            misfire_grace_time=max(int(interval), 1),
+            replace_existing=True
+        )
+        return job
+
+    def _on_event(self, event):
+        job = self.jobs.get(event.job_id)
+        if job is None:
+            return
+
+        if event.code == EVENT_JOB_SUBMITTED:
+            run_times = event.scheduled_run_times
+            if not run_times:
+                return
+            latest = max(run_times)
+            lag = (datetime.now(latest.tzinfo) - latest).total_seconds()
+            job.last_lag = max(lag, 0.0)
+            JOB_LAG_SECONDS.labels(job.name).observe(job.last_lag)
+            if len(run_times) > 1:
+                JOB_COALESCED.labels(job.name).inc(len(run_times) - 1)
+        elif event.code == EVENT_JOB_MAX_INSTANCES:
+            JOB_SKIPPED.labels(job.name, 'max_instances').inc()
+            logger.warning("Job %s skipped: previous run still in progress", job.name)
+        elif event.code == EVENT_JOB_MISSED:
+            JOB_SKIPPED.labels(job.name, 'missed').inc()
+            logger.warning("Job %s missed its run time", job.name)
+
+    def get_status(self) -> Dict:
+        return {name: job.get_status() for name, job in self.jobs.items()}
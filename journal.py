@@ -0,0 +1,211 @@
+"""
+State Journal Module
+
+Append-only write-ahead journal for small pieces of component state (kill
+switch status, daily limits, daily P&L counters) that must survive a
+restart.
+
+- Each state transition is one JSON line: {"seq", "ts", "key", "data"},
+  where data holds only the fields that changed and is merged into the
+  key's current state on replay.
+- Appends are written immediately but fsynced in batches by a background
+  flusher (group commit every `sync_interval` seconds). Critical
+  transitions pass sync=True to fsync before append() returns.
+- Every `compact_every` records the full state is written to a snapshot
+  (temp file + fsync + atomic rename) and the journal is truncated.
+- Recovery loads the snapshot and replays journal records newer than the
+  snapshot's sequence number; a torn final line from a crash is ignored.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = 'snapshot.json'
+JOURNAL_FILE = 'journal.log'
+
+
+class StateJournal:
+    """Durable key -> dict state with journaled, fsync-batched updates"""
+
+    def __init__(self, directory: str, sync_interval: float = 0.05, compact_every: int = 2000):
+        """
+        Args:
+            directory: Directory holding the snapshot and journal files
+            sync_interval: Seconds between batched fsyncs
+            compact_every: Records appended before the journal is compacted into a snapshot
+        """
+        self.directory = directory
+        self.sync_interval = sync_interval
+        self.compact_every = compact_every
+
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict] = {}
+        self._seq = 0
+        self._records_since_snapshot = 0
+        self._dirty = False
+        self._file = None
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self.recovery_seconds = None
+        self.replayed_records = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+        self._file = open(self._journal_path, 'a', encoding='utf-8')
+
+        self._flusher = threading.Thread(target=self._flush_loop, name='StateJournal', daemon=True)
+        self._flusher.start()
+
+    @property
+    def _snapshot_path(self):
+        return os.path.join(self.directory, SNAPSHOT_FILE)
+
+    @property
+    def _journal_path(self):
+        return os.path.join(self.directory, JOURNAL_FILE)
+
+    def _recover(self):
+        """Load the snapshot and replay newer journal records"""
+        start = time.perf_counter()
+        snapshot_seq = 0
+        if os.path.exists(self._snapshot_path):
+            with open(self._snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self._state = snapshot.get('state', {})
+            snapshot_seq = snapshot.get('seq', 0)
+        self._seq = snapshot_seq
+
+        replayed = 0
+        if os.path.exists(self._journal_path):
+            with open(self._journal_path, 'rb') as f:
+                content = f.read()
+            valid_end = 0
+            for line in content.split(b'\n'):
+                try:
+                    record = json.loads(line) if line else None
+                except ValueError:
+                    record = None
+                if record is None:
+                    break
+                valid_end += len(line) + 1
+                if record['seq'] <= snapshot_seq:
+                    continue  # Already folded into the snapshot
+                self._state.setdefault(record['key'], {}).update(record['data'])
+                self._seq = record['seq']
+                replayed += 1
+
+            if valid_end < len(content):
+                # Drop a torn tail left by a crash so new appends start on a clean line
+                logger.warning("Truncating %s torn bytes from %s", len(content) - valid_end, self._journal_path)
+                with open(self._journal_path, 'r+b') as f:
+                    f.truncate(valid_end)
+
+        self._records_since_snapshot = replayed
+        self.replayed_records = replayed
+        self.recovery_seconds = time.perf_counter() - start
+        logger.info("State journal recovered %s keys (%s records replayed) in %.2fms",
+                    len(self._state), replayed, self.recovery_seconds * 1000)
+
+    def get(self, key: str) -> Dict:
+        """Current state for a key (empty dict if never written)"""
+        with self._lock:
+            return dict(self._state.get(key, {}))
+
+    def append(self, key: str, sync: bool = False, **changes):
+        """
+        Record a state transition
+
+        Args:
+            key: Component key, e.g. 'emergency_stop'
+            sync: fsync before returning (for transitions that must not be lost)
+            **changes: Fields that changed; JSON-serializable values
+        """
+        with self._lock:
+            self._seq += 1
+            record = {'seq': self._seq, 'ts': time.time(), 'key': key, 'data': changes}
+            self._file.write(json.dumps(record, separators=(',', ':'), default=str) + '\n')
+            self._state.setdefault(key, {}).update(changes)
+            self._records_since_snapshot += 1
+            self._dirty = True
+
+            if sync:
+                self._sync_locked()
+            if self._records_since_snapshot >= self.compact_every:
+                self._compact_locked()
+
+    def _sync_locked(self):
+        if self._dirty and self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._dirty = False
+
+    def sync(self):
+        """Flush and fsync pending journal records"""
+        with self._lock:
+            self._sync_locked()
+
+    def _flush_loop(self):
+        while not self._stop_event.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error("Error syncing state journal: %s", e)
+
+    def compact(self):
+        """Write a snapshot of the current state and truncate the journal"""
+        with self._lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
+        self._sync_locked()
+        tmp_path = self._snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'seq': self._seq, 'state': self._state}, f, separators=(',', ':'), default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._snapshot_path)
+        self._fsync_directory()
+
+        # Records up to self._seq are in the snapshot; replay skips them even if
+        # a crash happens before the journal is truncated
+        self._file.close()
+        self._file = open(self._journal_path, 'w', encoding='utf-8')
+        self._records_since_snapshot = 0
+        logger.debug("State journal compacted at seq %s", self._seq)
+
+    def _fsync_directory(self):
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return  # Not supported on this platform
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        """Stop the flusher and fsync outstanding records"""
+        self._stop_event.set()
+        if self._flusher:
+            self._flusher.join(timeout=5)
+            self._flusher = None
+        with self._lock:
+            if self._file is not None:
+                self._sync_locked()
+                self._file.close()
+                self._file = None
+
+    def get_status(self) -> Dict:
+        return {
+            'seq': self._seq,
+            'keys': len(self._state),
+            'records_since_snapshot': self._records_since_snapshot,
+            'recovery_ms': round(self.recovery_seconds * 1000, 3) if self.recovery_seconds is not None else None,
+            'replayed_records': self.replayed_records
+        }
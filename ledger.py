@@ -0,0 +1,174 @@
+"""
+Columnar Ledger Module
+
+Ledger records rows (trades, equity marks) into a preallocated structured
+NumPy array that doubles in capacity when full, instead of a list of dicts.
+Statistics are computed over whole columns, and exports are column-oriented:
+
+- to_columns(): JSON-ready column arrays (timestamps as epoch milliseconds,
+  categorical columns dictionary-encoded as integer codes plus categories)
+- to_arrow() / write_parquet(): pyarrow Table / Parquet file (optional
+  dependency, imported on use)
+- to_records(): list of row dicts, for callers that still expect rows
+
+Categorical columns (symbol, direction, reason, ...) are stored as int32
+codes into a per-ledger category list.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TRADE_DTYPE = np.dtype([
+    ('symbol', np.int32),
+    ('direction', np.int32),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('size', np.float64),
+    ('pnl', np.float64),
+    ('pnl_pct', np.float64),
+    ('entry_time', 'datetime64[us]'),
+    ('exit_time', 'datetime64[us]'),
+    ('reason', np.int32),
+    ('confidence', np.float64),
+])
+TRADE_CATEGORICAL = ('symbol', 'direction', 'reason')
+
+EQUITY_DTYPE = np.dtype([
+    ('timestamp', 'datetime64[us]'),
+    ('balance', np.float64),
+])
+
+
+class Ledger:
+    """Growable structured array with dictionary-encoded categorical columns"""
+
+    def __init__(self, dtype: np.dtype, categorical: Iterable[str] = (), capacity: int = 1024):
+        """
+        Args:
+            dtype: Structured dtype of one row
+            categorical: Integer-code columns whose values are strings
+            capacity: Initial number of preallocated rows
+        """
+        self.dtype = np.dtype(dtype)
+        self.names = self.dtype.names
+        self.categorical = tuple(categorical)
+        self.categories: Dict[str, List[str]] = {name: [] for name in self.categorical}
+        self._codes: Dict[str, Dict[str, int]] = {name: {} for name in self.categorical}
+        self._data = np.empty(max(1, capacity), dtype=self.dtype)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def array(self) -> np.ndarray:
+        """Structured view of the recorded rows (no copy)"""
+        return self._data[:self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """View of one column (codes for categorical columns)"""
+        return self._data[name][:self._size]
+
+    def decoded(self, name: str) -> np.ndarray:
+        """Categorical column as an array of strings"""
+        categories = np.array(self.categories[name] or [''], dtype=object)
+        return categories[self.column(name)]
+
+    def code(self, name: str, value: str) -> int:
+        """Code of a categorical value, adding it to the categories if new"""
+        codes = self._codes[name]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.categories[name])
+            self.categories[name].append(value)
+        return code
+
+    def append(self, **values):
+        """Record one row (categorical columns as strings)"""
+        if self._size == len(self._data):
+            self._reserve(self._size * 2)
+        for name in self.categorical:
+            values[name] = self.code(name, values[name])
+        self._data[self._size] = tuple(values[name] for name in self.names)
+        self._size += 1
+
+    def extend(self, **columns):
+        """Record many rows at once from equal-length column arrays (categorical columns as codes)"""
+        count = len(next(iter(columns.values())))
+        if self._size + count > len(self._data):
+            self._reserve(max(self._size + count, len(self._data) * 2))
+        rows = self._data[self._size:self._size + count]
+        for name in self.names:
+            rows[name] = columns[name]
+        self._size += count
+
+    def clear(self):
+        """Drop all rows and categories (keeps the allocation)"""
+        self._size = 0
+        for name in self.categorical:
+            self.categories[name] = []
+            self._codes[name] = {}
+
+    def _reserve(self, capacity: int):
+        grown = np.empty(capacity, dtype=self.dtype)
+        grown[:self._size] = self._data[:self._size]
+        self._data = grown
+
+    def to_columns(self, fields: Optional[List[str]] = None) -> Dict:
+        """
+        JSON-ready column arrays
+
+        Returns:
+            dict: {'length': n, 'columns': {name: list}, 'categories': {name: list}}
+                with datetimes as epoch milliseconds and categorical columns as codes
+        """
+        fields = fields or list(self.names)
+        columns = {}
+        for name in fields:
+            column = self.column(name)
+            if column.dtype.kind == 'M':
+                column = column.astype('datetime64[ms]').astype(np.int64)
+            columns[name] = column.tolist()
+        return {
+            'length': self._size,
+            'columns': columns,
+            'categories': {name: list(self.categories[name]) for name in self.categorical if name in fields},
+        }
+
+    def to_records(self) -> List[Dict]:
+        """Rows as dicts (categorical values decoded, datetimes as datetime objects)"""
+        columns = {}
+        for name in self.names:
+            if name in self.categorical:
+                columns[name] = self.decoded(name).tolist()
+            else:
+                columns[name] = self.column(name).tolist()
+        return [dict(zip(self.names, row)) for row in zip(*columns.values())]
+
+    def to_arrow(self):
+        """pyarrow Table with dictionary-encoded categorical columns (requires pyarrow)"""
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise RuntimeError("Arrow export requires pyarrow (pip install pyarrow)") from e
+
+        arrays = []
+        for name in self.names:
+            column = self.column(name)
+            if name in self.categorical:
+                arrays.append(pa.DictionaryArray.from_arrays(pa.array(column), pa.array(self.categories[name],
+                                                                                     type=pa.string())))
+            else:
+                arrays.append(pa.array(column))
+        return pa.Table.from_arrays(arrays, names=list(self.names))
+
+    def write_parquet(self, path: str):
+        """Write the ledger to a Parquet file (requires pyarrow)"""
+        table = self.to_arrow()
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+        logger.info("Wrote %s rows to %s", self._size, path)
@@ -0,0 +1,121 @@
+"""
+Logging Configuration Module
+
+Routes all log records through a queue so the calling thread only pays for
+an enqueue; formatting and stream I/O happen on a background listener
+thread. Levels are configurable per module:
+
+    LOG_LEVEL=INFO
+    LOG_LEVELS="indicators=WARNING,backtesting=INFO,apscheduler=WARNING"
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Dict, Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Quiet noisy libraries and hot modules unless explicitly overridden
+DEFAULT_MODULE_LEVELS = {
+    'apscheduler': 'WARNING',
+    'urllib3': 'WARNING',
+    'werkzeug': 'INFO',
+    'indicators': 'INFO',
+    'signals': 'INFO',
+    'backtesting': 'INFO',
+}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Argument types that cannot change between the log call and the listener
+_IMMUTABLE_ARGS = (str, bytes, int, float, bool, type(None))
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted when that is safe.
+
+    The stock handler formats the message in the calling thread so records
+    can be pickled; the queue here never leaves the process, so records whose
+    arguments are immutable scalars are formatted on the listener thread.
+    Any other argument (a dict, list or object the caller may go on to
+    mutate) is merged into the message in the calling thread, as the stock
+    handler does.
+    """
+
+    def prepare(self, record):
+        args = record.args
+        # A single mapping argument is stored as the args themselves
+        if args and (isinstance(args, dict) or not all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+
+def parse_module_levels(spec: Optional[str]) -> Dict[str, str]:
+    """
+    Parse a "module=LEVEL,module=LEVEL" specification
+
+    Args:
+        spec: Level specification string, e.g. from LOG_LEVELS
+
+    Returns:
+        dict: Mapping of logger name to upper-cased level name
+    """
+    levels = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, level = item.split('=', 1)
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(level: Optional[str] = None, module_levels: Optional[Dict[str, str]] = None):
+    """
+    Install the queue-based logging pipeline on the root logger
+
+    Args:
+        level: Root level name (defaults to LOG_LEVEL or INFO)
+        module_levels: Per-logger level overrides, merged over DEFAULT_MODULE_LEVELS
+            and LOG_LEVELS
+
+    Returns:
+        logging.handlers.QueueListener: The running listener
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    root = logging.getLogger()
+    root.setLevel((level or os.environ.get("LOG_LEVEL", "INFO")).upper())
+
+    levels = dict(DEFAULT_MODULE_LEVELS)
+    levels.update(parse_module_levels(os.environ.get("LOG_LEVELS")))
+    levels.update(module_levels or {})
+    for name, module_level in levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(DeferredQueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,190 @@
+"""
+Market Data Feed Module
+
+Push-based price streams for tick-driven position monitoring. Subscribers
+receive Tick events; PortfolioMonitor.attach_feed turns every tick into a
+stop / take-profit / drawdown / PnL evaluation.
+
+Feeds:
+- ReplayFeed: replays recorded or synthetic ticks (tests and benchmarks)
+- PollingFeed: polls APIClient.get_current_price for subscribed symbols and
+  emits ticks, for deployments without a streaming connection
+
+replay_latency_benchmark() drives a monitor from a ReplayFeed and reports
+tick-to-decision latency percentiles.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class Tick(NamedTuple):
+    symbol: str
+    price: float
+    ts: float  # Exchange / source timestamp, epoch seconds
+    received: float = 0.0  # time.perf_counter() when the feed emitted the tick
+
+
+class PriceFeed:
+    """Base class: fan ticks out to subscribers on the feed's thread"""
+
+    def __init__(self):
+        self._subscribers: List[Callable[[Tick], None]] = []
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def subscribe(self, callback: Callable[[Tick], None]):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Tick], None]):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def publish(self, symbol: str, price: float, ts: Optional[float] = None):
+        """Emit one tick to every subscriber"""
+        tick = Tick(symbol, price, ts if ts is not None else time.time(), time.perf_counter())
+        for callback in self._subscribers:
+            try:
+                callback(tick)
+            except Exception as e:
+                logger.error("Error in tick subscriber for %s: %s", symbol, e)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        raise NotImplementedError
+
+
+class ReplayFeed(PriceFeed):
+    """Replays (symbol, price, ts) ticks, optionally paced to their timestamps"""
+
+    def __init__(self, ticks: Iterable, speed: Optional[float] = None):
+        """
+        Args:
+            ticks: Iterable of Tick or (symbol, price, ts) tuples in time order
+            speed: Replay speed multiplier (None replays as fast as possible)
+        """
+        super().__init__()
+        self.ticks = ticks
+        self.speed = speed
+
+    def run(self):
+        """Replay all ticks on the calling thread"""
+        first_ts = None
+        wall_start = time.perf_counter()
+        for symbol, price, ts, *_ in self.ticks:
+            if self._stop_event.is_set():
+                break
+            if self.speed:
+                if first_ts is None:
+                    first_ts = ts
+                delay = (ts - first_ts) / self.speed - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            self.publish(symbol, price, ts)
+
+    def _run(self):
+        self.run()
+
+
+class PollingFeed(PriceFeed):
+    """Emits ticks by polling REST prices for the symbols returned by symbols_fn"""
+
+    def __init__(self, api_client, symbols_fn: Callable[[], Iterable[str]], interval: float = 1.0):
+        super().__init__()
+        self.api_client = api_client
+        self.symbols_fn = symbols_fn
+        self.interval = interval
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            for symbol in list(self.symbols_fn()):
+                price = self.api_client.get_current_price(symbol)
+                if price is not None:
+                    self.publish(symbol, price)
+            self._stop_event.wait(self.interval)
+
+
+def synthetic_ticks(symbols: List[str], count: int, start_prices: Optional[Dict[str, float]] = None,
+                    volatility: float = 0.001, seed: int = 42) -> List[Tick]:
+    """
+    Generate a random-walk tick stream cycling through symbols
+
+    Args:
+        symbols: Symbols to generate
+        count: Total number of ticks
+        start_prices: Starting price per symbol (defaults to 100)
+        volatility: Per-tick log-return standard deviation
+        seed: Random seed
+
+    Returns:
+        list: Ticks in time order
+    """
+    rng = np.random.default_rng(seed)
+    per_symbol = count // len(symbols) + 1
+    walks = {}
+    for symbol in symbols:
+        start = (start_prices or {}).get(symbol, 100.0)
+        walks[symbol] = start * np.exp(np.cumsum(rng.normal(0, volatility, per_symbol)))
+
+    now = time.time()
+    ticks = []
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        ticks.append(Tick(symbol, float(walks[symbol][i // len(symbols)]), now + i * 0.001))
+    return ticks
+
+
+def latency_percentiles(latencies: List[float]) -> Dict:
+    """Summarize latencies (seconds) as millisecond percentiles"""
+    if not latencies:
+        return {'count': 0}
+    values = np.asarray(latencies) * 1000
+    return {
+        'count': int(values.size),
+        'p50_ms': round(float(np.percentile(values, 50)), 4),
+        'p95_ms': round(float(np.percentile(values, 95)), 4),
+        'p99_ms': round(float(np.percentile(values, 99)), 4),
+        'max_ms': round(float(values.max()), 4),
+    }
+
+
+def replay_latency_benchmark(monitor, ticks: Iterable) -> Dict:
+    """
+    Replay ticks through a PortfolioMonitor and measure tick-to-decision latency
+
+    Args:
+        monitor: PortfolioMonitor with positions already added
+        ticks: Ticks to replay
+
+    Returns:
+        dict: Latency percentiles plus the number of trigger events fired
+    """
+    feed = ReplayFeed(ticks)
+    monitor.tick_latencies = []
+    monitor.attach_feed(feed)
+    try:
+        feed.run()
+    finally:
+        monitor.detach_feed(feed)
+
+    summary = latency_percentiles(monitor.tick_latencies)
+    summary['events'] = monitor.tick_events
+    return summary
@@ -0,0 +1,343 @@
+"""
+In-Process Metrics Module
+
+A small, dependency-free metrics registry with counters, gauges and
+histograms, rendered in the Prometheus text exposition format by the
+/metrics endpoint. Observations are a dict lookup, a bisect and a few
+integer updates under a lock, so they cost microseconds and are safe to
+place on hot paths.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Default latency buckets in seconds (100us .. 30s)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Metric:
+    """Base class handling label children and registration"""
+
+    metric_type = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional['MetricsRegistry'] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values):
+        """
+        Get the child metric for a set of label values
+
+        Args:
+            values: Label values, in the order of labelnames
+
+        Returns:
+            Child metric with the same observation methods
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> List[Tuple[str, Tuple[Tuple[str, str], ...], float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines)
+
+    def _label_pairs(self, key):
+        return tuple(zip(self.labelnames, key))
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+
+    metric_type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._children[()].inc(amount)
+
+    @property
+    def value(self) -> float:
+        return self._children[()].value
+
+    def _samples(self):
+        return [('_total' if not self.name.endswith('_total') else '', self._label_pairs(key), child.value)
+                for key, child in list(self._children.items())]
+
+
+class _GaugeChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float):
+        self.value = value
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    metric_type = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._children[()].set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._children[()].inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._children[()].dec(amount)
+
+    @property
+    def value(self) -> float:
+        return self._children[()].value
+
+    def _samples(self):
+        return [('', self._label_pairs(key), child.value) for key, child in list(self._children.items())]
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        return _Timer(self)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observed values (e.g. latencies in seconds)"""
+
+    metric_type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 registry: Optional['MetricsRegistry'] = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._children[()].observe(value)
+
+    def time(self):
+        """Context manager / decorator observing elapsed seconds"""
+        return _Timer(self._children[()])
+
+    def _samples(self):
+        samples = []
+        for key, child in list(self._children.items()):
+            pairs = self._label_pairs(key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, child.counts):
+                cumulative += bucket_count
+                samples.append(('_bucket', pairs + (('le', _format_value(bound)),), cumulative))
+            samples.append(('_bucket', pairs + (('le', '+Inf'),), child.count))
+            samples.append(('_sum', pairs, child.sum))
+            samples.append(('_count', pairs, child.count))
+        return samples
+
+
+class _Timer:
+    """Times a block or function call into a histogram child"""
+
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child):
+        self._child = child
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+    def __call__(self, func):
+        child = self._child
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value) -> str:
+    if isinstance(value, str):
+        return value
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# ----------------------------------------------------------------------
+# Application metrics
+# ----------------------------------------------------------------------
+
+API_REQUEST_SECONDS = Histogram(
+    'bitunix_api_request_seconds', 'Exchange API call latency', ['endpoint'])
+API_REQUESTS = Counter(
+    'bitunix_api_requests_total', 'Exchange API calls by HTTP status', ['endpoint', 'status'])
+
+INDICATOR_SECONDS = Histogram(
+    'indicators_calculate_all_seconds', 'Duration of calculate_all_indicators')
+SIGNAL_SECONDS = Histogram(
+    'signals_generate_conservative_seconds', 'Duration of generate_conservative_signal')
+
+JOB_SECONDS = Histogram(
+    'scheduler_job_seconds', 'Scheduler job runtime', ['job'])
+JOB_RUNS = Counter(
+    'scheduler_job_runs_total', 'Scheduler job runs by outcome', ['job', 'outcome'])
+JOB_OVERLAPS = Counter(
+    'scheduler_job_overlaps_total', 'Job runs requested while another run was in progress', ['job'])
+JOB_IN_PROGRESS = Gauge(
+    'scheduler_job_in_progress', 'Job runs currently executing', ['job'])
+
+JOB_LAG_SECONDS = Histogram(
+    'scheduler_job_lag_seconds', 'Delay between a job\'s scheduled and actual start', ['job'])
+JOB_SKIPPED = Counter(
+    'scheduler_job_skipped_total', 'Job runs not started, by reason', ['job', 'reason'])
+JOB_COALESCED = Counter(
+    'scheduler_job_coalesced_total', 'Missed run times merged into a single run', ['job'])
+JOB_ERRORS = Counter(
+    'scheduler_job_errors_total', 'Failures adapting or rescheduling a job interval, by stage', ['job', 'stage'])
+JOB_INTERVAL = Gauge(
+    'scheduler_job_interval_seconds', 'Current (adaptive) job interval', ['job'])
+
+TICK_DECISION_SECONDS = Histogram(
+    'portfolio_tick_decision_seconds', 'Latency from price tick to stop/take-profit decision')
+TICK_OVER_BUDGET = Counter(
+    'portfolio_tick_over_budget_total', 'Ticks whose decision latency exceeded the latency budget')
+
+HTTP_REQUEST_SECONDS = Histogram(
+    'flask_http_request_seconds', 'Flask route latency', ['route', 'method', 'status'])
+
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by result (hit/miss)', ['cache', 'result'])
+
+EMERGENCY_TRIGGER_SECONDS = Histogram(
+    'emergency_stop_check_seconds', 'Duration of EmergencyStop trigger evaluation')
+EMERGENCY_TRIGGER_CHECKS = Counter(
+    'emergency_stop_checks_total', 'EmergencyStop trigger evaluations by result', ['result'])
+HEALTH_STATE = Gauge(
+    'exchange_health_state', 'Exchange health (0=healthy, 1=degraded, 2=unhealthy)')
+HEALTH_HEARTBEAT_SECONDS = Histogram(
+    'exchange_heartbeat_seconds', 'Round-trip time of exchange heartbeats')
+HEALTH_CLOCK_SKEW = Gauge(
+    'exchange_clock_skew_seconds', 'Exchange clock minus local clock (smoothed)')
+EMERGENCY_CLOSE_ATTEMPTS = Counter(
+    'emergency_close_attempts_total', 'Kill-switch close requests by result', ['result'])
+EMERGENCY_TIME_TO_FLAT = Histogram(
+    'emergency_time_to_flat_seconds', 'Time from kill-switch activation until every position is closed')
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    """Count a cache hit or miss"""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
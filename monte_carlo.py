@@ -0,0 +1,236 @@
+"""
+Monte Carlo Path Resampling Module
+
+A single backtest gives one equity path, so its max drawdown and final return
+are one draw from the strategy's distribution. MonteCarloSimulator resamples
+the per-trade (or per-period) returns of a backtest into many alternative
+paths and reports the distribution of final return, max drawdown and the
+probability of ruin.
+
+Resampling methods:
+- 'bootstrap': i.i.d. draws with replacement
+- 'block': circular block bootstrap (keeps streaks / autocorrelation within
+  blocks of consecutive returns)
+- 'shuffle': permutations of the original sequence (same final return, only
+  the order - and so the drawdown - changes)
+
+Paths are computed as (paths x steps) NumPy arrays in log space: one cumsum
+gives log equity, one running maximum gives the peak, so there is no Python
+loop per path or per step. Paths are processed in batches to bound memory.
+"""
+
+import argparse
+import logging
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from ledger import Ledger
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('bootstrap', 'block', 'shuffle')
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+DRAWDOWN_LEVELS = (0.05, 0.1, 0.2, 0.3, 0.5)
+
+
+def trade_returns(trades, initial_balance: float) -> np.ndarray:
+    """
+    Per-trade returns on account equity from a BacktestEngine trade ledger
+
+    Trades are ordered by exit time and each P&L is divided by the balance
+    just before it was realized, so compounding the returns reproduces the
+    realized balance path.
+
+    Args:
+        trades: BacktestEngine.trades ledger or a list of trade dicts
+        initial_balance: Balance before the first trade
+    """
+    if isinstance(trades, Ledger):
+        pnl, exit_times = trades.column('pnl'), trades.column('exit_time')
+    else:
+        pnl = np.array([trade['pnl'] for trade in trades], dtype=np.float64)
+        exit_times = np.array([np.datetime64(trade['exit_time'], 'us') for trade in trades], dtype='datetime64[us]')
+    if not len(pnl):
+        return np.array([])
+    pnl = pnl[np.argsort(exit_times, kind='stable')]
+    balance_before = initial_balance + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    return pnl / balance_before
+
+
+def balance_returns(balances: Sequence) -> np.ndarray:
+    """Period returns of a balance series (floats or {'balance': ...} dicts)"""
+    values = np.array([b['balance'] if isinstance(b, dict) else b for b in balances], dtype=np.float64)
+    if len(values) < 2:
+        return np.array([])
+    return np.diff(values) / values[:-1]
+
+
+class MonteCarloSimulator:
+    """Vectorized resampling of a return sequence into many equity paths"""
+
+    def __init__(self, n_paths: int = 10000, method: str = 'bootstrap', block_size: Optional[int] = None,
+                 path_length: Optional[int] = None, ruin_level: float = 0.5, batch_size: int = 8192,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            n_paths: Number of resampled paths
+            method: One of METHODS
+            block_size: Block length for 'block' (defaults to n ** (1/3))
+            path_length: Returns per path (defaults to the length of the input)
+            ruin_level: Drawdown from the starting equity counted as ruin (0.5 = losing half)
+            batch_size: Paths simulated per batch (memory is batch_size x path_length floats)
+            seed: Random seed for reproducible runs
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+        if not 0 < ruin_level < 1:
+            raise ValueError("ruin_level must be between 0 and 1")
+        self.n_paths = n_paths
+        self.method = method
+        self.block_size = block_size
+        self.path_length = path_length
+        self.ruin_level = ruin_level
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+
+    def run_backtest(self, engine, use: str = 'trades') -> Dict:
+        """
+        Simulate from a finished BacktestEngine run
+
+        Args:
+            engine: BacktestEngine after run_backtest / run_panel
+            use: 'trades' (per-trade returns) or 'balances' (daily balance returns)
+        """
+        if use == 'trades':
+            returns = trade_returns(engine.trades, engine.initial_balance)
+        elif use == 'balances':
+            returns = balance_returns(engine.daily_balances.column('balance'))
+        else:
+            raise ValueError("use must be 'trades' or 'balances'")
+        return self.run(returns)
+
+    def run(self, returns: Sequence[float]) -> Dict:
+        """
+        Resample returns into paths and summarize them
+
+        Args:
+            returns: Fractional returns per trade or period (0.01 = +1%)
+
+        Returns:
+            dict: Final return and max drawdown percentiles, drawdown exceedance
+                and ruin probabilities, plus the per-path 'final_returns' and
+                'max_drawdowns' arrays for histograms
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        returns = returns[np.isfinite(returns)]
+        if returns.size == 0:
+            raise ValueError("No returns to resample")
+
+        # A return of -100% or worse wipes the account; clamp so its log stays finite
+        log_returns = np.log1p(np.maximum(returns, -1 + 1e-12))
+        length = self.path_length or returns.size
+        if self.method == 'shuffle' and length != returns.size:
+            raise ValueError("'shuffle' paths must have the length of the input")
+        ruin_log = np.log1p(-self.ruin_level)
+
+        started = time.perf_counter()
+        final_log = np.empty(self.n_paths)
+        max_dd_log = np.empty(self.n_paths)
+        min_log = np.empty(self.n_paths)
+        for first in range(0, self.n_paths, self.batch_size):
+            count = min(self.batch_size, self.n_paths - first)
+            paths = log_returns[self._indices(count, returns.size, length)]
+            np.cumsum(paths, axis=1, out=paths)  # Log equity relative to the start
+
+            final_log[first:first + count] = paths[:, -1]
+            min_log[first:first + count] = np.minimum(paths.min(axis=1), 0.0)
+            peaks = np.maximum.accumulate(paths, axis=1)
+            np.maximum(peaks, 0.0, out=peaks)  # The starting equity is the first peak
+            np.subtract(peaks, paths, out=peaks)
+            max_dd_log[first:first + count] = peaks.max(axis=1)
+        elapsed = time.perf_counter() - started
+
+        final_returns = np.expm1(final_log)
+        max_drawdowns = -np.expm1(-max_dd_log)
+        logger.info("Monte Carlo: %s %s paths x %s steps in %.2fs",
+                    self.n_paths, self.method, length, elapsed)
+
+        return {
+            'method': self.method,
+            'paths': self.n_paths,
+            'path_length': length,
+            'final_return_pct': self._percentiles(final_returns),
+            'max_drawdown_pct': self._percentiles(max_drawdowns),
+            'mean_final_return_pct': round(float(final_returns.mean()) * 100, 2),
+            'probability_of_loss': round(float((final_returns < 0).mean()), 4),
+            'drawdown_exceedance': {f"{level:.0%}": round(float((max_drawdowns >= level).mean()), 4)
+                                    for level in DRAWDOWN_LEVELS},
+            'ruin_level_pct': round(self.ruin_level * 100, 1),
+            'probability_of_ruin': round(float((min_log <= ruin_log).mean()), 4),
+            'elapsed_seconds': round(elapsed, 3),
+            'final_returns': final_returns,
+            'max_drawdowns': max_drawdowns,
+        }
+
+    def _indices(self, count: int, n: int, length: int) -> np.ndarray:
+        """(count, length) indices into the return sequence for one batch"""
+        if self.method == 'bootstrap':
+            return self.rng.integers(0, n, size=(count, length))
+        if self.method == 'shuffle':
+            # Sorting random keys row-wise is a batch of independent permutations
+            return self.rng.random((count, n), dtype=np.float32).argsort(axis=1)
+
+        block = self.block_size or max(1, int(round(n ** (1 / 3))))
+        blocks = -(-length // block)
+        starts = self.rng.integers(0, n, size=(count, blocks, 1))
+        indices = (starts + np.arange(block)) % n  # Circular: blocks wrap past the end
+        return indices.reshape(count, blocks * block)[:, :length]
+
+    @staticmethod
+    def _percentiles(values: np.ndarray) -> Dict[str, float]:
+        points = np.percentile(values, PERCENTILES)
+        return {f"p{p}": round(float(v) * 100, 2) for p, v in zip(PERCENTILES, points)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo resampling of backtest returns")
+    parser.add_argument('--paths', type=int, default=100000)
+    parser.add_argument('--method', choices=METHODS, default='bootstrap')
+    parser.add_argument('--block-size', type=int, default=None)
+    parser.add_argument('--ruin-level', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--synthetic', type=int, metavar='TRADES',
+                        help="Resample this many synthetic trade returns instead of running a backtest")
+    parser.add_argument('--days', type=int, default=90, help="Backtest length when not --synthetic")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    simulator = MonteCarloSimulator(n_paths=args.paths, method=args.method, block_size=args.block_size,
+                                    ruin_level=args.ruin_level, seed=args.seed)
+    if args.synthetic:
+        rng = np.random.default_rng(args.seed)
+        # 2:1 reward/risk at 2% of equity per trade with a 40% hit rate
+        returns = np.where(rng.random(args.synthetic) < 0.4, 0.0006, -0.0003) * rng.lognormal(0, 0.3, args.synthetic)
+        source = f"{args.synthetic} synthetic trades"
+    else:
+        from backtesting import BacktestEngine
+        engine = BacktestEngine(initial_balance=1000.0)
+        engine.run_backtest(['BTC/USDT', 'ETH/USDT', 'DOGE/USDT', 'UNI/USDT', 'MANA/USDT'], days=args.days)
+        returns = trade_returns(engine.trades, engine.initial_balance)
+        source = f"{len(returns)} backtest trades over {args.days} days"
+    results = simulator.run(returns)
+
+    print(f"\n=== Monte Carlo ({results['method']}, {results['paths']:,} paths, {source}) ===")
+    print(f"Elapsed: {results['elapsed_seconds']:.2f}s")
+    print(f"Final return %:  {results['final_return_pct']}")
+    print(f"Max drawdown %:  {results['max_drawdown_pct']}")
+    print(f"P(loss): {results['probability_of_loss']:.2%}  "
+          f"P(ruin at -{results['ruin_level_pct']}%): {results['probability_of_ruin']:.2%}")
+    print(f"P(drawdown >= level): {results['drawdown_exceedance']}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,198 @@
+"""
+Multi-Strategy Backtest Module
+
+Backtests several strategies (or parameter variants of one) side by side
+over the same market data:
+
+1. History is generated (or read from a HistoryStore) once, and the union
+   of every strategy's indicator columns is computed once into one shared
+   panel.
+2. One BacktestEngine per strategy steps the same panel cursor in
+   lockstep, so each bar is visited once for all strategies; streamed
+   stores are read and indicator-enriched once per chunk.
+3. Per-strategy results and a comparison table (ranked by an objective)
+   are returned.
+
+Each engine's results are identical to running it on its own.
+"""
+
+import argparse
+import json
+import logging
+import time
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from backtesting import BacktestEngine
+from history_store import HistoryStore
+from panel import MarketPanel
+from strategy import Strategy, STRATEGIES
+
+logger = logging.getLogger(__name__)
+
+COMPARISON_FIELDS = ('total_return_pct', 'sharpe_ratio', 'max_drawdown_pct', 'win_rate', 'total_trades',
+                     'final_balance')
+
+
+class MultiStrategyBacktest:
+    """Lockstep backtests of several strategies over one shared panel"""
+
+    def __init__(self, strategies: Union[Sequence[Strategy], Mapping[str, Strategy]],
+                 initial_balance: float = 10000.0, params: Optional[Mapping[str, Dict]] = None,
+                 objective: str = 'total_return_pct'):
+        """
+        Args:
+            strategies: Strategies to compare, or label -> strategy (to compare variants of one)
+            initial_balance: Starting balance of every engine
+            params: label -> BacktestEngine.set_params overrides
+            objective: Result key the comparison table is ranked by (higher is better)
+        """
+        if not isinstance(strategies, Mapping):
+            strategies = {strategy.name: strategy for strategy in strategies}
+        if not strategies:
+            raise ValueError("At least one strategy is required")
+        unknown = set(params or {}) - set(strategies)
+        if unknown:
+            raise ValueError(f"Parameters for unknown strategies: {sorted(unknown)}")
+
+        self.initial_balance = initial_balance
+        self.objective = objective
+        self.engines: Dict[str, BacktestEngine] = {}
+        for label, strategy in strategies.items():
+            engine = BacktestEngine(initial_balance=initial_balance, strategy=strategy)
+            engine.set_params(**(params or {}).get(label, {}))
+            self.engines[label] = engine
+
+    def indicator_fields(self) -> Tuple[str, ...]:
+        """Union of the indicator columns every strategy reads"""
+        return tuple(sorted(set().union(*(engine.indicator_fields() for engine in self.engines.values()))))
+
+    def _lead(self) -> BacktestEngine:
+        return next(iter(self.engines.values()))
+
+    def run(self, symbols: List[str], days: int = 30) -> Dict:
+        """Generate history once (as BacktestEngine.run_backtest does) and compare every strategy on it"""
+        lead = self._lead()
+        end = lead.data_end()
+        historical_data = {symbol: lead.generate_historical_data(symbol, days, end) for symbol in symbols}
+        panel = lead.build_panel(historical_data, self.indicator_fields())
+        return self.run_panel(panel)
+
+    def run_panel(self, panel: MarketPanel, start: int = 0, stop: Optional[int] = None,
+                  close_open: bool = False) -> Dict:
+        """
+        Simulate steps [start, stop) of a panel built with indicator_fields()
+
+        Args:
+            panel: Shared panel
+            start: First step
+            stop: End step (exclusive, defaults to the end of the panel)
+            close_open: Close positions still open at the last step at its close
+
+        Returns:
+            dict: Per-strategy results and comparison table
+        """
+        stop = len(panel) if stop is None else min(stop, len(panel))
+        started = time.perf_counter()
+        for engine in self.engines.values():
+            engine.reset()
+        self._simulate(panel, start, stop, close_open)
+        return self._report(panel.symbols, stop - start, time.perf_counter() - started)
+
+    def run_stream(self, store: HistoryStore, chunk_bars: int = 24 * 30, close_open: bool = False) -> Dict:
+        """
+        Simulate a HistoryStore chunk by chunk (see BacktestEngine.run_stream)
+
+        Each chunk is read and given the union of indicator columns once,
+        then stepped by every engine.
+        """
+        logger.info("Streaming %s strategies over %s rows x %s symbols in chunks of %s",
+                    len(self.engines), len(store), len(store.symbols), chunk_bars)
+        started = time.perf_counter()
+        for engine in self.engines.values():
+            engine.reset()
+        for panel, final in self._lead().stream_panels(store, chunk_bars, self.indicator_fields()):
+            self._simulate(panel, 0, len(panel), close_open and final)
+
+        return self._report(store.symbols, len(store), time.perf_counter() - started)
+
+    def _simulate(self, panel: MarketPanel, start: int, stop: int, close_open: bool):
+        """Step every engine through [start, stop) together."""
+        engines = list(self.engines.values())
+        for engine in engines:
+            engine.begin_window(panel, start, stop)
+
+        for t in range(start, stop):
+            for engine in engines:
+                engine.step(panel, t)
+
+        for engine in engines:
+            engine.end_window(panel, start, stop, close_open)
+
+    def _report(self, symbols: Sequence[str], bars: int, elapsed: float) -> Dict:
+        results = {label: engine.results() for label, engine in self.engines.items()}
+        logger.info("Compared %s strategies over %s bars x %s symbols in %.2fs",
+                    len(results), bars, len(symbols), elapsed)
+        return {
+            'strategies': results,
+            'comparison': self.comparison(results),
+            'symbols': list(symbols),
+            'bars': bars,
+            'indicator_fields': list(self.indicator_fields()),
+            'elapsed_seconds': round(elapsed, 3),
+        }
+
+    def comparison(self, results: Mapping[str, Dict]) -> List[Dict]:
+        """One row per strategy with the headline metrics, best objective first"""
+        rows = []
+        for label, result in results.items():
+            engine = self.engines[label]
+            row = {'strategy': label, 'rules': engine.strategy.name}
+            row.update({name: result.get(name, 0) for name in COMPARISON_FIELDS})
+            row['final_balance'] = result.get('final_balance', self.initial_balance)
+            row['params'] = engine.get_params()
+            rows.append(row)
+        rows.sort(key=lambda row: results[row['strategy']].get(self.objective, 0), reverse=True)
+        for rank, row in enumerate(rows, 1):
+            row['rank'] = rank
+        return rows
+
+
+def format_comparison(rows: List[Dict]) -> str:
+    """Comparison table as aligned text"""
+    header = f"{'#':>2}  {'strategy':<24}{'return %':>10}{'sharpe':>8}{'max dd %':>10}{'win %':>8}" \
+             f"{'trades':>8}{'final $':>12}"
+    lines = [header, '-' * len(header)]
+    for row in rows:
+        lines.append(f"{row['rank']:>2}  {row['strategy']:<24}{row['total_return_pct']:>10.2f}"
+                     f"{row['sharpe_ratio']:>8.2f}{row['max_drawdown_pct']:>10.2f}{row['win_rate']:>8.1f}"
+                     f"{row['total_trades']:>8}{row['final_balance']:>12,.2f}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare strategies side by side on the same history")
+    parser.add_argument('--symbols', nargs='+', default=['BTC/USDT', 'ETH/USDT', 'DOGE/USDT', 'UNI/USDT', 'MANA/USDT'])
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--strategies', nargs='+', choices=sorted(STRATEGIES), default=sorted(STRATEGIES))
+    parser.add_argument('--initial-balance', type=float, default=1000.0)
+    parser.add_argument('--objective', default='total_return_pct')
+    parser.add_argument('--json', help="Write the full report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    runner = MultiStrategyBacktest([STRATEGIES[name] for name in args.strategies],
+                                   initial_balance=args.initial_balance, objective=args.objective)
+    report = runner.run(args.symbols, args.days)
+
+    print(f"\n=== Strategy comparison ({len(report['symbols'])} symbols, {report['bars']} bars, "
+          f"{report['elapsed_seconds']:.2f}s) ===")
+    print(format_comparison(report['comparison']))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+"""
+Market Panel Module
+
+MarketPanel aligns per-symbol OHLCV (and indicator) frames once onto a
+shared time axis as a dense (time x symbol x field) float64 array plus a
+(time x symbol) presence mask. Simulation loops advance an integer cursor
+and read contiguous rows (values[t] is a symbol x field block) instead of
+looking timestamps up in each symbol's DataFrame.
+
+Missing observations are NaN with present[t, s] False; bar_index[t, s]
+counts the symbol's own bars up to t, so "enough history" checks do not
+depend on gaps in other symbols.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+
+
+class MarketPanel:
+    """Dense time x symbol x field array with a presence mask"""
+
+    def __init__(self, timestamps: pd.DatetimeIndex, symbols: Sequence[str], fields: Sequence[str],
+                 values: np.ndarray, present: np.ndarray):
+        """
+        Args:
+            timestamps: Sorted union time axis (length T)
+            symbols: Symbol per column (length S)
+            fields: Field per slice (length F)
+            values: float64 array of shape (T, S, F)
+            present: bool array of shape (T, S)
+        """
+        self.timestamps = timestamps
+        self.symbols = list(symbols)
+        self.fields = list(fields)
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.present = np.ascontiguousarray(present, dtype=bool)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.field_index = {field: i for i, field in enumerate(self.fields)}
+
+        # Per-symbol bar count up to each step (-1 before the first bar)
+        self.bar_index = np.cumsum(self.present, axis=0) - 1
+        self.hours = np.asarray(timestamps.hour) if isinstance(timestamps, pd.DatetimeIndex) else None
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], fields: Optional[Iterable[str]] = None) -> 'MarketPanel':
+        """
+        Align per-symbol frames onto the union of their indexes
+
+        Args:
+            frames: symbol -> DataFrame indexed by timestamp
+            fields: Columns to include (defaults to OHLCV)
+
+        Returns:
+            MarketPanel
+        """
+        fields = list(fields or OHLCV)
+        symbols = list(frames)
+        if frames:
+            timestamps = pd.DatetimeIndex(np.unique(np.concatenate([df.index.values for df in frames.values()])))
+        else:
+            timestamps = pd.DatetimeIndex([])
+
+        values = np.full((len(timestamps), len(symbols), len(fields)), np.nan)
+        present = np.zeros((len(timestamps), len(symbols)), dtype=bool)
+        for column, symbol in enumerate(symbols):
+            df = frames[symbol]
+            rows = timestamps.get_indexer(df.index)
+            values[rows, column, :] = df[fields].to_numpy(dtype=np.float64)
+            present[rows, column] = True
+
+        logger.debug("Aligned %s symbols x %s steps x %s fields", len(symbols), len(timestamps), len(fields))
+        return cls(timestamps, symbols, fields, values, present)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def field(self, name: str) -> np.ndarray:
+        """(T, S) view of one field"""
+        return self.values[:, :, self.field_index[name]]
+
+    def series(self, symbol: str, name: str) -> np.ndarray:
+        """One symbol's field over time (NaN where absent)"""
+        return self.values[:, self.symbol_index[symbol], self.field_index[name]]
+
+    def add_fields(self, columns: Dict[str, np.ndarray]):
+        """
+        Append (T, S) arrays as new fields (one reallocation for all of them)
+
+        Args:
+            columns: field name -> (T, S) array
+        """
+        new = [name for name in columns if name not in self.field_index]
+        if new:
+            grown = np.empty(self.values.shape[:2] + (len(self.fields) + len(new),))
+            grown[:, :, :len(self.fields)] = self.values
+            self.values = grown
+            for name in new:
+                self.field_index[name] = len(self.fields)
+                self.fields.append(name)
+        for name, column in columns.items():
+            self.values[:, :, self.field_index[name]] = column
+
+    def slice(self, start: int, stop: int) -> 'MarketPanel':
+        """Panel restricted to steps [start, stop) (bar_index restarts at the slice)"""
+        return MarketPanel(self.timestamps[start:stop], self.symbols, self.fields,
+                           self.values[start:stop], self.present[start:stop])
+
+    def to_frames(self, fields: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+        """Per-symbol DataFrames of the present rows"""
+        fields = fields or self.fields
+        index = [self.field_index[name] for name in fields]
+        frames = {}
+        for column, symbol in enumerate(self.symbols):
+            rows = self.present[:, column]
+            frames[symbol] = pd.DataFrame(self.values[rows, column][:, index], index=self.timestamps[rows],
+                                          columns=fields)
+        return frames
@@ -0,0 +1,665 @@
+"""
+Paper Trading Module
+
+Simulated execution venue for running the whole app without sending orders
+to the exchange.
+
+- PaperExchange keeps one in-memory book per symbol, driven by ticks from a
+  price feed (live polling, recorded or synthetic). Around each tick's mid
+  price it quotes synthetic liquidity: `levels` price levels per side,
+  `spread_bps` apart at the touch and `level_spacing_bps` apart after that,
+  each holding `level_notional` of quantity. Liquidity taken during a tick is
+  used up until the next tick.
+- Market orders walk the synthetic levels (slippage grows with size; what
+  the book cannot absorb is cancelled). Limit orders take what is
+  marketable and rest the remainder; resting orders fill at their limit as
+  later ticks cross them, possibly over several ticks. Stop orders turn
+  into market orders when a tick reaches the stop price.
+- Fills update a netted one-way position per symbol, wallet balance and
+  fees (taker for aggressive fills, maker for resting fills).
+
+PaperTradingClient exposes the APIClient interface on top of a
+PaperExchange, taking prices and klines from an optional market data client
+so paper trading can run on live market data.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from position import Position
+
+logger = logging.getLogger(__name__)
+
+BUY = 'BUY'
+SELL = 'SELL'
+MARKET = 'MARKET'
+LIMIT = 'LIMIT'
+STOP = 'STOP'
+
+NEW = 'NEW'
+PARTIALLY_FILLED = 'PARTIALLY_FILLED'
+FILLED = 'FILLED'
+CANCELED = 'CANCELED'
+REJECTED = 'REJECTED'
+
+_EPSILON = 1e-12
+
+# Same conservative brackets APIClient attaches to exchange positions
+STOP_LOSS_PERCENT = 0.015
+TAKE_PROFIT_PERCENT = 0.03
+
+INTERVAL_MINUTES = {'1m': 1, '3m': 3, '5m': 5, '15m': 15, '30m': 30, '1h': 60, '2h': 120,
+                    '4h': 240, '6h': 360, '12h': 720, '1d': 1440}
+
+
+@dataclass(slots=True)
+class Order:
+    """A paper order and its fill state"""
+
+    id: str
+    symbol: str
+    side: str  # BUY / SELL
+    type: str  # MARKET / LIMIT / STOP
+    quantity: float
+    price: Optional[float] = None  # Limit price
+    stop_price: Optional[float] = None
+    filled: float = 0.0
+    avg_price: float = 0.0
+    fee: float = 0.0
+    status: str = NEW
+    reason: Optional[str] = None
+    created: float = 0.0
+    updated: float = 0.0
+
+    @property
+    def remaining(self) -> float:
+        return self.quantity - self.filled
+
+    @property
+    def is_open(self) -> bool:
+        return self.status in (NEW, PARTIALLY_FILLED)
+
+    def to_dict(self) -> Dict:
+        """Order in the exchange's response shape"""
+        return {
+            'orderId': self.id,
+            'symbol': self.symbol,
+            'side': self.side,
+            'type': self.type,
+            'quantity': self.quantity,
+            'price': self.price,
+            'stopPrice': self.stop_price,
+            'filledQty': self.filled,
+            'avgPrice': self.avg_price,
+            'fee': self.fee,
+            'status': self.status,
+            'reason': self.reason,
+            'ctime': int(self.created * 1000),
+            'mtime': int(self.updated * 1000),
+        }
+
+
+class Fill(NamedTuple):
+    order_id: str
+    symbol: str
+    side: str
+    quantity: float
+    price: float
+    fee: float
+    liquidity: str  # 'taker' or 'maker'
+    ts: float
+
+
+class _Book:
+    """Per-symbol market state and resting orders"""
+
+    __slots__ = ('symbol', 'mid', 'ts', 'ask_used', 'bid_used', 'bids', 'asks',
+                 'buy_stops', 'sell_stops', 'cancelled', 'touched', 'bar', 'bars')
+
+    def __init__(self, symbol: str, levels: int, max_bars: int):
+        self.symbol = symbol
+        self.mid = None
+        self.ts = 0.0
+        self.ask_used = [0.0] * levels  # Liquidity taken from each level this tick
+        self.bid_used = [0.0] * levels
+        self.touched = False  # Any liquidity used since the last tick
+        self.bids = []  # (-price, seq, order): best bid first
+        self.asks = []  # (price, seq, order)
+        self.buy_stops = []  # (stop, seq, order): trigger when price rises to stop
+        self.sell_stops = []  # (-stop, seq, order): trigger when price falls to stop
+        self.cancelled = 0  # Cancelled entries still sitting in the heaps
+        self.bar = None  # Current 1m bar [start, open, high, low, close, ticks]
+        self.bars = deque(maxlen=max_bars)  # Completed 1m bars
+
+
+class PaperExchange:
+    """In-memory matching engine with synthetic liquidity around the last tick"""
+
+    def __init__(self, balance: float = 10000.0, leverage: float = 2.0,
+                 maker_fee: float = 0.0002, taker_fee: float = 0.0006,
+                 spread_bps: float = 2.0, level_spacing_bps: float = 1.0, levels: int = 20,
+                 level_notional: float = 25000.0, max_bars: int = 10080):
+        """
+        Args:
+            balance: Starting wallet balance (USDT)
+            leverage: Leverage used for margin on new positions
+            maker_fee: Fee rate for resting limit fills
+            taker_fee: Fee rate for aggressive fills
+            spread_bps: Bid/ask spread at the touch in basis points
+            level_spacing_bps: Distance between synthetic price levels in basis points
+            levels: Synthetic price levels per side
+            level_notional: Notional liquidity per level (converted to quantity at the mid)
+            max_bars: 1-minute bars kept per symbol for klines
+        """
+        self.balance = balance
+        self.leverage = leverage
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.half_spread = spread_bps / 2 / 10000
+        self.level_spacing = level_spacing_bps / 10000
+        self.levels = levels
+        self.level_notional = level_notional
+        self.max_bars = max_bars
+
+        self._lock = threading.RLock()
+        self._books: Dict[str, _Book] = {}
+        self._orders: Dict[str, Order] = {}  # Open orders
+        self._closed = deque(maxlen=10000)  # Recently finished orders
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        # symbol -> [signed quantity, entry price, realized pnl, position id]
+        self._positions: Dict[str, list] = {}
+        self.margin_used = 0.0
+        self.fees_paid = 0.0
+        self.fills = deque(maxlen=10000)
+        self._fill_listeners: List[Callable[[Fill], None]] = []
+        self.event_count = 0
+
+    # ------------------------------------------------------------------
+    # Market data
+    # ------------------------------------------------------------------
+
+    def _book(self, symbol: str) -> _Book:
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _Book(symbol, self.levels, self.max_bars)
+        return book
+
+    def on_tick(self, symbol: str, price: float, ts: Optional[float] = None):
+        """
+        Advance a symbol to a new trade price: refresh liquidity, trigger
+        stops and match resting limit orders
+
+        Args:
+            symbol: Trading symbol
+            price: Last / mid price
+            ts: Tick timestamp (epoch seconds, defaults to now)
+        """
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            book = self._book(symbol)
+            book.mid = price
+            book.ts = ts
+            if book.touched:
+                book.ask_used = [0.0] * self.levels
+                book.bid_used = [0.0] * self.levels
+                book.touched = False
+            self._update_bar(book, price, ts)
+            self.event_count += 1
+
+            if book.buy_stops and book.buy_stops[0][0] <= price:
+                self._trigger_stops(book, book.buy_stops, lambda key: key <= price)
+            if book.sell_stops and -book.sell_stops[0][0] >= price:
+                self._trigger_stops(book, book.sell_stops, lambda key: -key >= price)
+            if book.bids and -book.bids[0][0] >= price * (1 + self.half_spread):
+                self._match_resting(book, book.bids, BUY)
+            if book.asks and book.asks[0][0] <= price * (1 - self.half_spread):
+                self._match_resting(book, book.asks, SELL)
+
+    def attach_feed(self, feed):
+        """Drive the exchange from a market_feed.PriceFeed"""
+        feed.subscribe(self._on_feed_tick)
+
+    def detach_feed(self, feed):
+        feed.unsubscribe(self._on_feed_tick)
+
+    def _on_feed_tick(self, tick):
+        self.on_tick(tick.symbol, tick.price, tick.ts)
+
+    def price(self, symbol: str) -> Optional[float]:
+        book = self._books.get(symbol)
+        return book.mid if book else None
+
+    def _update_bar(self, book: _Book, price: float, ts: float):
+        start = ts - ts % 60
+        bar = book.bar
+        if bar is None or start != bar[0]:
+            if bar is not None:
+                book.bars.append(bar)
+            book.bar = [start, price, price, price, price, 1]
+            return
+        if price > bar[2]:
+            bar[2] = price
+        elif price < bar[3]:
+            bar[3] = price
+        bar[4] = price
+        bar[5] += 1
+
+    def klines(self, symbol: str, interval: str = '1h', limit: int = 100) -> List[List]:
+        """
+        Candles aggregated from the ticks seen for a symbol
+
+        Returns:
+            list: [open time ms, open, high, low, close, tick count] rows, oldest first
+        """
+        minutes = INTERVAL_MINUTES.get(interval)
+        with self._lock:
+            book = self._books.get(symbol)
+            if book is None or minutes is None or book.bar is None:
+                return []
+            bars = np.array(list(book.bars) + [book.bar], dtype=float)
+
+        step = minutes * 60
+        buckets = (bars[:, 0] // step).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(bars)] - 1
+        candles = np.column_stack([
+            buckets[starts] * step * 1000,
+            bars[starts, 1],
+            np.maximum.reduceat(bars[:, 2], starts),
+            np.minimum.reduceat(bars[:, 3], starts),
+            bars[ends, 4],
+            np.add.reduceat(bars[:, 5], starts),
+        ])[-limit:]
+        return [[int(row[0])] + [float(value) for value in row[1:]] for row in candles]
+
+    # ------------------------------------------------------------------
+    # Orders
+    # ------------------------------------------------------------------
+
+    def submit_order(self, symbol: str, side: str, quantity: float, order_type: str = MARKET,
+                     price: Optional[float] = None, stop_price: Optional[float] = None) -> Order:
+        """
+        Submit an order
+
+        Args:
+            symbol: Trading symbol
+            side: 'buy' / 'sell' (case-insensitive)
+            quantity: Order quantity in base units
+            order_type: 'market', 'limit' or 'stop'
+            price: Limit price (limit orders)
+            stop_price: Trigger price (stop orders)
+
+        Returns:
+            Order: The order after any immediate fills (status REJECTED with a
+                reason if it could not be accepted)
+        """
+        side = side.upper()
+        order_type = order_type.upper()
+        with self._lock:
+            book = self._book(symbol)
+            now = book.ts or time.time()
+            order = Order(f"paper-{next(self._ids)}", symbol, side, order_type, float(quantity),
+                          price=price, stop_price=stop_price, created=now, updated=now)
+            self.event_count += 1
+
+            reason = self._reject_reason(order, book)
+            if reason:
+                order.status = REJECTED
+                order.reason = reason
+                self._closed.append(order)
+                return order
+
+            if order_type == STOP:
+                if (side == BUY and book.mid >= stop_price) or (side == SELL and book.mid <= stop_price):
+                    self._execute_market(book, order)  # Already through the stop
+                else:
+                    key = stop_price if side == BUY else -stop_price
+                    heapq.heappush(book.buy_stops if side == BUY else book.sell_stops, (key, next(self._seq), order))
+                    self._orders[order.id] = order
+            elif order_type == LIMIT:
+                self._take(book, order, limit=price)
+                if order.remaining > _EPSILON:
+                    heap = book.bids if side == BUY else book.asks
+                    heapq.heappush(heap, (-price if side == BUY else price, next(self._seq), order))
+                    self._orders[order.id] = order
+                else:
+                    self._finish(order, FILLED)
+            else:
+                self._execute_market(book, order)
+            return order
+
+    def _reject_reason(self, order: Order, book: _Book) -> Optional[str]:
+        if order.side not in (BUY, SELL):
+            return f"invalid side {order.side}"
+        if order.type not in (MARKET, LIMIT, STOP):
+            return f"invalid order type {order.type}"
+        if not order.quantity > 0:
+            return "quantity must be positive"
+        if order.type == LIMIT and not (order.price and order.price > 0):
+            return "limit orders require a positive price"
+        if order.type == STOP and not (order.stop_price and order.stop_price > 0):
+            return "stop orders require a positive stop_price"
+        if book.mid is None:
+            return f"no market data for {order.symbol}"
+
+        # Margin check for the part of the order that increases exposure
+        position = self._positions.get(order.symbol)
+        current = position[0] if position else 0.0
+        signed = order.quantity if order.side == BUY else -order.quantity
+        added = max(abs(current + signed) - abs(current), 0.0)
+        if added > 0:
+            reference = order.price or order.stop_price or book.mid
+            required = added * reference / self.leverage
+            if required > self.available_balance():
+                return "insufficient margin"
+        return None
+
+    def _execute_market(self, book: _Book, order: Order):
+        self._take(book, order)
+        if order.remaining > _EPSILON:
+            # Book exhausted: the unfilled remainder is cancelled (IOC)
+            self._finish(order, CANCELED, reason="insufficient liquidity")
+        else:
+            self._finish(order, FILLED)
+
+    def _take(self, book: _Book, order: Order, limit: Optional[float] = None):
+        """Fill an order aggressively against the synthetic levels"""
+        buying = order.side == BUY
+        used = book.ask_used if buying else book.bid_used
+        level_quantity = self.level_notional / book.mid
+        direction = 1 if buying else -1
+        for i in range(self.levels):
+            available = level_quantity - used[i]
+            if available <= _EPSILON:
+                continue
+            level_price = book.mid * (1 + direction * (self.half_spread + i * self.level_spacing))
+            if limit is not None and (level_price > limit if buying else level_price < limit):
+                break
+            quantity = min(available, order.remaining)
+            used[i] += quantity
+            book.touched = True
+            self._fill(book, order, quantity, level_price, 'taker')
+            if order.remaining <= _EPSILON:
+                break
+
+    def _match_resting(self, book: _Book, heap: list, side: str):
+        """Fill resting limit orders that the current price has crossed"""
+        while heap:
+            key, _, order = heap[0]
+            if not order.is_open:
+                heapq.heappop(heap)  # Cancelled
+                continue
+            limit = order.price
+            touch = book.mid * (1 + self.half_spread) if side == BUY else book.mid * (1 - self.half_spread)
+            if (side == BUY and touch > limit) or (side == SELL and touch < limit):
+                break
+
+            # Liquidity at prices at least as good as the limit fills at the limit (maker)
+            used = book.ask_used if side == BUY else book.bid_used
+            level_quantity = self.level_notional / book.mid
+            direction = 1 if side == BUY else -1
+            for i in range(self.levels):
+                level_price = book.mid * (1 + direction * (self.half_spread + i * self.level_spacing))
+                if (level_price > limit) if side == BUY else (level_price < limit):
+                    break
+                available = level_quantity - used[i]
+                if available <= _EPSILON:
+                    continue
+                quantity = min(available, order.remaining)
+                used[i] += quantity
+                book.touched = True
+                self._fill(book, order, quantity, limit, 'maker')
+                if order.remaining <= _EPSILON:
+                    break
+
+            if order.remaining <= _EPSILON:
+                heapq.heappop(heap)
+                self._orders.pop(order.id, None)
+                self._finish(order, FILLED)
+            else:
+                break  # Liquidity through this price is exhausted for this tick
+
+    def _trigger_stops(self, book: _Book, heap: list, triggered: Callable[[float], bool]):
+        while heap and triggered(heap[0][0]):
+            _, _, order = heapq.heappop(heap)
+            if not order.is_open:
+                continue
+            self._orders.pop(order.id, None)
+            self._execute_market(book, order)
+
+    def _fill(self, book: _Book, order: Order, quantity: float, price: float, liquidity: str):
+        fee = quantity * price * (self.taker_fee if liquidity == 'taker' else self.maker_fee)
+        total = order.filled + quantity
+        order.avg_price = (order.avg_price * order.filled + price * quantity) / total
+        order.filled = total
+        order.fee += fee
+        order.updated = book.ts
+        if order.status == NEW:
+            order.status = PARTIALLY_FILLED
+        self.balance -= fee
+        self.fees_paid += fee
+        self._apply_fill(order.symbol, quantity if order.side == BUY else -quantity, price)
+        self.event_count += 1
+
+        fill = Fill(order.id, order.symbol, order.side, quantity, price, fee, liquidity, book.ts)
+        self.fills.append(fill)
+        for listener in self._fill_listeners:
+            try:
+                listener(fill)
+            except Exception as e:
+                logger.error("Error in fill listener: %s", e)
+
+    def _apply_fill(self, symbol: str, signed: float, price: float):
+        """Net a fill into the symbol's one-way position"""
+        position = self._positions.get(symbol)
+        if position is None:
+            self._positions[symbol] = [signed, price, 0.0, f"paper-pos-{next(self._ids)}"]
+            self.margin_used += abs(signed) * price / self.leverage
+            return
+
+        quantity, entry = position[0], position[1]
+        self.margin_used -= abs(quantity) * entry / self.leverage
+        if quantity * signed > 0:
+            total = quantity + signed
+            position[1] = (entry * quantity + price * signed) / total
+            position[0] = total
+        else:
+            closing = min(abs(signed), abs(quantity))
+            realized = closing * (price - entry) * (1 if quantity > 0 else -1)
+            self.balance += realized
+            position[2] += realized
+            remaining = quantity + signed
+            if abs(remaining) <= _EPSILON:
+                del self._positions[symbol]
+                if not self._positions:
+                    self.margin_used = 0.0  # Drop accumulated float drift
+                return
+            if remaining * quantity < 0:
+                position[1] = price  # Flipped through zero: remainder opened at this price
+                position[2] = 0.0
+                position[3] = f"paper-pos-{next(self._ids)}"
+            position[0] = remaining
+        self.margin_used += abs(position[0]) * position[1] / self.leverage
+
+    def _finish(self, order: Order, status: str, reason: Optional[str] = None):
+        order.status = status
+        if reason:
+            order.reason = reason
+        self._closed.append(order)
+
+    def cancel_order(self, order_id: str) -> bool:
+        """Cancel an open order; resting entries are discarded lazily"""
+        with self._lock:
+            order = self._orders.pop(order_id, None)
+            if order is None:
+                return False
+            self._finish(order, CANCELED)
+            self.event_count += 1
+
+            book = self._books[order.symbol]
+            book.cancelled += 1
+            heaps = (book.bids, book.asks, book.buy_stops, book.sell_stops)
+            if book.cancelled > 64 and book.cancelled * 2 > sum(len(heap) for heap in heaps):
+                # Mostly dead entries: rebuild the heaps instead of letting them grow
+                for heap in heaps:
+                    heap[:] = [entry for entry in heap if entry[2].is_open]
+                    heapq.heapify(heap)
+                book.cancelled = 0
+            return True
+
+    def get_order(self, order_id: str) -> Optional[Order]:
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None:
+                order = next((o for o in reversed(self._closed) if o.id == order_id), None)
+            return order
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Order]:
+        with self._lock:
+            return [o for o in self._orders.values() if symbol is None or o.symbol == symbol]
+
+    def add_fill_listener(self, listener: Callable[[Fill], None]):
+        self._fill_listeners.append(listener)
+
+    # ------------------------------------------------------------------
+    # Positions and account
+    # ------------------------------------------------------------------
+
+    def close_position(self, symbol: str) -> Optional[Order]:
+        """Flatten a symbol with a market order; None if there is no position"""
+        with self._lock:
+            position = self._positions.get(symbol)
+            if position is None:
+                return None
+            side = SELL if position[0] > 0 else BUY
+            return self.submit_order(symbol, side, abs(position[0]))
+
+    def unrealized_pnl(self) -> float:
+        with self._lock:
+            total = 0.0
+            for symbol, (quantity, entry, _, _) in self._positions.items():
+                mid = self._books[symbol].mid
+                total += quantity * (mid - entry)
+            return total
+
+    def available_balance(self) -> float:
+        return self.balance + self.unrealized_pnl() - self.margin_used
+
+    def positions(self) -> List[Position]:
+        """Open positions as Position objects, marked to the last tick"""
+        with self._lock:
+            result = []
+            for symbol, (quantity, entry, realized, position_id) in self._positions.items():
+                direction = 'long' if quantity > 0 else 'short'
+                sign = 1 if quantity > 0 else -1
+                mid = self._books[symbol].mid
+                position = Position(
+                    symbol=symbol,
+                    direction=direction,
+                    size=abs(quantity),
+                    entry_price=entry,
+                    current_price=mid,
+                    leverage=self.leverage,
+                    realized_pnl=realized,
+                    margin=abs(quantity) * entry / self.leverage,
+                    stop_loss=entry * (1 - sign * STOP_LOSS_PERCENT),
+                    take_profit=entry * (1 + sign * TAKE_PROFIT_PERCENT),
+                    id=position_id,
+                )
+                position.mark(mid)
+                result.append(position)
+            return result
+
+    def account(self) -> Dict:
+        with self._lock:
+            unrealized = self.unrealized_pnl()
+            return {
+                'balance': self.balance,
+                'equity': self.balance + unrealized,
+                'available': self.balance + unrealized - self.margin_used,
+                'margin': self.margin_used,
+                'unrealized_pnl': unrealized,
+                'fees_paid': self.fees_paid,
+                'open_orders': len(self._orders),
+                'positions': len(self._positions),
+            }
+
+
+class PaperTradingClient:
+    """APIClient-compatible client that executes against a PaperExchange"""
+
+    def __init__(self, exchange: Optional[PaperExchange] = None, market_data=None):
+        """
+        Args:
+            exchange: Simulated venue (defaults to PaperExchange())
+            market_data: Optional client for prices and klines (e.g. a live
+                APIClient); every price it returns is fed to the exchange as a tick
+        """
+        self.exchange = exchange or PaperExchange()
+        self.market_data = market_data
+        self.demo_mode = True
+        logger.info("Running in paper trading mode")
+
+    def test_connection(self):
+        return self.market_data.test_connection() if self.market_data else True
+
+    def heartbeat(self, timeout=3):
+        if self.market_data:
+            return self.market_data.heartbeat(timeout=timeout)
+        return {'ok': True, 'latency': 0.0, 'server_time': time.time()}
+
+    def get_account_balance(self):
+        return self.exchange.account()['equity']
+
+    def get_current_price(self, symbol):
+        if self.market_data:
+            price = self.market_data.get_current_price(symbol)
+            if price is not None:
+                self.exchange.on_tick(symbol, price)
+                return price
+        return self.exchange.price(symbol)
+
+    def get_klines(self, symbol, interval='1h', limit=100):
+        if self.market_data:
+            return self.market_data.get_klines(symbol, interval=interval, limit=limit)
+        return self.exchange.klines(symbol, interval, limit)
+
+    def place_order(self, symbol, side, quantity, order_type='market', price=None, stop_price=None):
+        """Place a paper order; returns the order dict, or None if rejected"""
+        if self.exchange.price(symbol) is None:
+            self.get_current_price(symbol)  # Seed the book before the first order
+        order = self.exchange.submit_order(symbol, side, quantity, order_type, price=price, stop_price=stop_price)
+        if order.status == REJECTED:
+            logger.error("Paper order rejected: %s %s %s (%s)", side, quantity, symbol, order.reason)
+            return None
+        logger.info("Paper order %s: %s %s %s filled %.6g @ %.6g", order.status, side, quantity, symbol,
+                    order.filled, order.avg_price)
+        return order.to_dict()
+
+    def cancel_order(self, order_id):
+        return self.exchange.cancel_order(order_id)
+
+    def get_positions(self):
+        return [position.to_dict() for position in self.exchange.positions()]
+
+    def close_position(self, symbol, position_id=None, timeout=10):
+        order = self.exchange.close_position(symbol)
+        return order is not None and order.status == FILLED
+
+    def get_account_info(self):
+        account = self.exchange.account()
+        return {
+            'balance': account['equity'],
+            'positions': self.get_positions(),
+            'orders': [order.to_dict() for order in self.exchange.open_orders()],
+            'leverage': self.exchange.leverage
+        }
@@ -1,34 +1,125 @@
 import logging
+import threading
+import time
+from collections import deque
 from datetime import datetime, timedelta
+from metrics import TICK_DECISION_SECONDS, TICK_OVER_BUDGET
+from position import Position, PositionBook
+from trigger_index import TriggerIndex, STOP_LOSS, TAKE_PROFIT, DRAWDOWN_ALERT
 
 logger = logging.getLogger(__name__)
 
 class PortfolioMonitor:
     """Monitor portfolio positions and risk metrics"""
     
-    def __init__(self, api_client, risk_manager):
+    def __init__(self, api_client, risk_manager, latency_budget=0.005, risk_engine=None, journal=None):
         self.api_client = api_client
         self.risk_manager = risk_manager
+        self.risk_engine = risk_engine  # Optional risk_engine.RiskEngine for correlation-aware VaR
         self.positions = {}
+        self.book = PositionBook()  # Columnar totals for O(1) P&L and risk
+        self.trigger_index = TriggerIndex()
+        self._lock = threading.RLock()  # Ticks arrive on feed threads
+        self._closed_ids = set()  # Synced positions whose stop/target alert fired, still reported by the exchange
+        
+        # Tick-driven monitoring
+        self.latency_budget = latency_budget  # Target seconds from tick to close decision
+        self.tick_latencies = deque(maxlen=10000)
+        self.tick_events = 0
+        self._feeds = []
         self.daily_trades = 0
         self.daily_pnl = 0.0
         self.last_reset_date = datetime.now().date()
         
+        # Daily counters survive restarts through the state journal
+        self.journal = journal
+        self._restore_daily_counters()
+        
     def monitor_positions(self):
         """Continuously monitor open positions for risk management"""
         try:
-            positions = self.get_open_positions()
+            # One price fetch per symbol; the trigger index resolves every position in it
+            symbols = self.trigger_index.symbols()
             
-            for position in positions:
-                self.check_stop_loss(position)
-                self.check_take_profit(position)
-                self.monitor_drawdown(position)
-                self.update_position_pnl(position)
+            for symbol in symbols:
+                current_price = self.api_client.get_current_price(symbol)
+                if current_price is None:
+                    continue
+                self.process_price(symbol, current_price)
                 
-            logger.debug(f"Monitored {len(positions)} positions")
+            logger.debug("Monitored %s positions across %s symbols", len(self.positions), len(symbols))
+            
+        except Exception as e:
+            logger.error("Error monitoring positions: %s", e)
+    
+    def process_price(self, symbol, price):
+        """
+        Apply a price update to every position in a symbol
+        
+        Args:
+            symbol: Trading symbol
+            price: Latest price
             
+        Returns:
+            list: (position_id, trigger_kind) events that fired
+        """
+        events = []
+        try:
+            with self._lock:
+                for position_id in self.trigger_index.positions_for(symbol):
+                    self.positions[position_id].mark(price)
+                self.book.mark(symbol, price)
+                    
+                for position_id, kind, level in self.trigger_index.crossed(symbol, price):
+                    position = self.positions.get(position_id)
+                    if position is None:
+                        continue  # Already dropped by a higher-priority trigger on this tick
+                        
+                    if kind == STOP_LOSS:
+                        logger.warning("Stop loss triggered for %s at %s", symbol, price)
+                        self.close_position(position, 'stop_loss')
+                    elif kind == TAKE_PROFIT:
+                        logger.info("Take profit reached for %s at %s", symbol, price)
+                        self.close_position(position, 'take_profit')
+                    elif kind == DRAWDOWN_ALERT:
+                        drawdown = abs(position['entry_price'] - price) / position['entry_price']
+                        logger.warning("High drawdown detected for %s: %.2f%%", symbol, drawdown * 100)
+                        # Alert once per position rather than on every tick
+                        self.trigger_index.remove_trigger(position_id, DRAWDOWN_ALERT)
+                    events.append((position_id, kind))
+                    
         except Exception as e:
-            logger.error(f"Error monitoring positions: {e}")
+            logger.error("Error processing price for %s: %s", symbol, e)
+        return events
+    
+    def attach_feed(self, feed):
+        """
+        Subscribe to a price feed so every tick is evaluated as it arrives
+        
+        Args:
+            feed: market_feed.PriceFeed instance
+        """
+        feed.subscribe(self.on_tick)
+        self._feeds.append(feed)
+    
+    def detach_feed(self, feed):
+        """Stop receiving ticks from a feed"""
+        feed.unsubscribe(self.on_tick)
+        if feed in self._feeds:
+            self._feeds.remove(feed)
+    
+    def on_tick(self, tick):
+        """Evaluate one price tick and record tick-to-decision latency"""
+        events = self.process_price(tick.symbol, tick.price)
+        
+        latency = time.perf_counter() - tick.received if tick.received else 0.0
+        self.tick_latencies.append(latency)
+        self.tick_events += len(events)
+        TICK_DECISION_SECONDS.observe(latency)
+        if latency > self.latency_budget:
+            TICK_OVER_BUDGET.inc()
+            
+        return events
     
     def get_open_positions(self):
         """Get list of open positions"""
@@ -38,7 +129,7 @@ class PortfolioMonitor:
             return list(self.positions.values())
             
         except Exception as e:
-            logger.error(f"Error getting open positions: {e}")
+            logger.error("Error getting open positions: %s", e)
             return []
     
     def check_stop_loss(self, position):
@@ -56,11 +147,11 @@ class PortfolioMonitor:
                 should_close = current_price >= position['stop_loss']
                 
             if should_close:
-                logger.warning(f"Stop loss triggered for {position['symbol']} at {current_price}")
+                logger.warning("Stop loss triggered for %s at %s", position['symbol'], current_price)
                 self.close_position(position, 'stop_loss')
                 
         except Exception as e:
-            logger.error(f"Error checking stop loss for {position.get('symbol', 'unknown')}: {e}")
+            logger.error("Error checking stop loss for %s: %s", position.get('symbol', 'unknown'), e)
     
     def check_take_profit(self, position):
         """Check if position should be closed due to take profit"""
@@ -77,11 +168,11 @@ class PortfolioMonitor:
                 should_close = current_price <= position['take_profit']
                 
             if should_close:
-                logger.info(f"Take profit reached for {position['symbol']} at {current_price}")
+                logger.info("Take profit reached for %s at %s", position['symbol'], current_price)
                 self.close_position(position, 'take_profit')
                 
         except Exception as e:
-            logger.error(f"Error checking take profit for {position.get('symbol', 'unknown')}: {e}")
+            logger.error("Error checking take profit for %s: %s", position.get('symbol', 'unknown'), e)
     
     def monitor_drawdown(self, position):
         """Monitor position drawdown and suggest adjustments"""
@@ -101,10 +192,10 @@ class PortfolioMonitor:
             stop_loss_distance = abs(entry_price - position['stop_loss']) / entry_price
             
             if drawdown > stop_loss_distance * 0.5:
-                logger.warning(f"High drawdown detected for {position['symbol']}: {drawdown:.2%}")
+                logger.warning("High drawdown detected for %s: %.2f%%", position['symbol'], drawdown * 100)
                 
         except Exception as e:
-            logger.error(f"Error monitoring drawdown for {position.get('symbol', 'unknown')}: {e}")
+            logger.error("Error monitoring drawdown for %s: %s", position.get('symbol', 'unknown'), e)
     
     def update_position_pnl(self, position):
         """Update position P&L"""
@@ -113,73 +204,129 @@ class PortfolioMonitor:
             if current_price is None:
                 return
                 
-            entry_price = position['entry_price']
-            position_size = position['size']
-            
-            if position['direction'] == 'long':
-                pnl = (current_price - entry_price) * position_size
-            else:
-                pnl = (entry_price - current_price) * position_size
-                
-            position['unrealized_pnl'] = pnl
-            position['current_price'] = current_price
+            self._apply_price(position, current_price)
             
         except Exception as e:
-            logger.error(f"Error updating P&L for {position.get('symbol', 'unknown')}: {e}")
+            logger.error("Error updating P&L for %s: %s", position.get('symbol', 'unknown'), e)
+    
+    def _apply_price(self, position, current_price):
+        """Mark a position to a price and update its unrealized P&L"""
+        with self._lock:
+            position.mark(current_price)
+            self.book.mark(position.symbol, current_price)
     
     def close_position(self, position, reason):
-        """Close a position"""
+        """
+        Stop monitoring a position after its stop-loss or take-profit fired
+        
+        No order is sent: tick triggers only raise alerts. Closing positions
+        on the exchange is left to the trader or the kill switch
+        (EmergencyStop). The position's unrealized P&L is booked into the
+        daily P&L and it is not re-added while the exchange still reports it.
+        """
         try:
-            # In real implementation, this would place a market order to close
             position_id = position['id']
             
-            logger.info(f"Closing position {position_id} for {position['symbol']} - Reason: {reason}")
+            logger.warning("ALERT %s for %s (%s): no longer monitored, close it on the exchange",
+                           reason, position['symbol'], position_id)
             
             # Update daily P&L
-            if 'unrealized_pnl' in position:
-                self.daily_pnl += position['unrealized_pnl']
+            self.daily_pnl += position['unrealized_pnl'] or 0
+            self._journal_daily_counters()
                 
             # Remove from positions
-            if position_id in self.positions:
-                del self.positions[position_id]
+            with self._lock:
+                if position_id in self.positions:
+                    del self.positions[position_id]
+                self.book.remove(position_id)
+                self.trigger_index.remove_position(position_id)
+                self._closed_ids.add(position_id)
                 
         except Exception as e:
-            logger.error(f"Error closing position: {e}")
+            logger.error("Error closing position: %s", e)
     
     def calculate_portfolio_risk(self):
-        """Calculate total portfolio risk percentage"""
+        """
+        Calculate total portfolio risk percentage
+        
+        Uses parametric VaR from the risk engine once it has enough return
+        history, so correlated positions are not treated as independent;
+        otherwise falls back to the sum of entry-to-stop distances.
+        """
         try:
-            total_risk = 0
             balance = self.api_client.get_account_balance()
             
             if balance <= 0:
                 return 0
                 
-            for position in self.positions.values():
-                # Calculate risk amount for each position
-                entry_price = position['entry_price']
-                stop_loss = position['stop_loss']
-                size = position['size']
-                
-                risk_per_unit = abs(entry_price - stop_loss)
-                position_risk = risk_per_unit * size
-                total_risk += position_risk
-                
-            risk_percentage = (total_risk / balance) * 100
-            logger.debug(f"Total portfolio risk: {risk_percentage:.2f}%")
+            if self.risk_engine is not None and self.risk_engine.observations >= self.risk_engine.min_observations:
+                with self._lock:
+                    positions = list(self.positions.values())
+                risk = self.risk_engine.portfolio_risk(positions, balance)
+                risk_percentage = risk['parametric_var_percent'] or 0
+                logger.debug("Portfolio VaR (%.0f%%): %.2f%%", risk['confidence'] * 100, risk_percentage)
+            else:
+                # Sum of |entry - stop| * size, maintained incrementally by the book
+                risk_percentage = (self.book.total_stop_risk / balance) * 100
+                logger.debug("Total portfolio risk: %.2f%%", risk_percentage)
             
             return min(risk_percentage, 100)  # Cap at 100%
             
         except Exception as e:
-            logger.error(f"Error calculating portfolio risk: {e}")
+            logger.error("Error calculating portfolio risk: %s", e)
             return 0
     
+    def refresh_interval(self, positions=None, base_interval=30.0, min_interval=5.0):
+        """
+        Suggest a portfolio refresh interval from how close positions are to their stops
+        
+        Args:
+            positions: Positions or position dicts (defaults to monitored positions)
+            base_interval: Interval in seconds when no position is near its stop
+            min_interval: Interval in seconds when a position is about to hit its stop
+            
+        Returns:
+            float: Suggested refresh interval in seconds
+        """
+        try:
+            if positions is None:
+                positions = list(self.positions.values())
+                
+            # Smallest remaining distance to stop, as a fraction of the full entry-to-stop distance
+            closest = 1.0
+            for position in positions:
+                entry_price = position.get('entry_price')
+                stop_loss = position.get('stop_loss')
+                current_price = position.get('current_price', entry_price)
+                if not entry_price or not stop_loss or current_price is None:
+                    continue
+                    
+                stop_distance = abs(entry_price - stop_loss)
+                if stop_distance == 0:
+                    continue
+                    
+                if position.get('direction') == 'long':
+                    remaining = (current_price - stop_loss) / stop_distance
+                else:
+                    remaining = (stop_loss - current_price) / stop_distance
+                closest = min(closest, max(remaining, 0.0))
+                
+            if closest <= 0.25:
+                return min_interval
+            if closest <= 0.5:
+                return max(min_interval, base_interval / 3)
+            return base_interval
+            
+        except Exception as e:
+            logger.error("Error calculating refresh interval: %s", e)
+            return base_interval
+    
     def get_balance(self):
         """Get account balance"""
         try:
             return self.api_client.get_account_balance()
         except Exception as e:
-            logger.error(f"Error getting balance: {e}")
+            logger.error("Error getting balance: %s", e)
             return 0
     
     def get_daily_pnl(self):
@@ -191,17 +338,13 @@ class PortfolioMonitor:
                 self.daily_pnl = 0
                 self.daily_trades = 0
                 self.last_reset_date = current_date
+                self._journal_daily_counters()
                 
             # Add unrealized P&L from open positions
-            total_pnl = self.daily_pnl
-            for position in self.positions.values():
-                if 'unrealized_pnl' in position:
-                    total_pnl += position['unrealized_pnl']
-                    
-            return total_pnl
+            return self.daily_pnl + self.book.total_unrealized_pnl
             
         except Exception as e:
-            logger.error(f"Error getting daily P&L: {e}")
+            logger.error("Error getting daily P&L: %s", e)
             return 0
     
     def suggest_position_adjustments(self):
@@ -231,36 +374,114 @@ class PortfolioMonitor:
             return suggestions
             
         except Exception as e:
-            logger.error(f"Error suggesting position adjustments: {e}")
+            logger.error("Error suggesting position adjustments: %s", e)
             return ["Error analyzing portfolio. Manual review recommended."]
     
+    def sync_positions(self, positions):
+        """
+        Mirror the account's open positions into the monitor and trigger index
+        
+        Positions are keyed by id, or symbol:direction when the exchange gives
+        none. New positions are indexed, positions no longer reported are
+        dropped, and changed stop / take-profit levels are re-indexed. A
+        position whose stop / take-profit alert fired is not re-added while the
+        exchange still reports it. Daily trade counters are not touched.
+        
+        Args:
+            positions: Position dicts or Position objects (e.g. APIClient.get_positions)
+            
+        Returns:
+            tuple: (added, removed) counts
+        """
+        snapshot = {}
+        for data in positions:
+            position = data if isinstance(data, Position) else Position.from_dict(data)
+            position.id = position.id or f"{position.symbol}:{position.direction}"
+            snapshot[position.id] = position
+        
+        added = removed = 0
+        with self._lock:
+            for position_id in list(self.positions):
+                if position_id not in snapshot:
+                    del self.positions[position_id]
+                    self.book.remove(position_id)
+                    self.trigger_index.remove_position(position_id)
+                    removed += 1
+            self._closed_ids &= set(snapshot)
+            
+            for position_id, position in snapshot.items():
+                if position_id in self._closed_ids:
+                    continue
+                current = self.positions.get(position_id)
+                if current is None:
+                    added += 1
+                elif (current.entry_price, current.stop_loss, current.take_profit, current.direction) == \
+                        (position.entry_price, position.stop_loss, position.take_profit, position.direction):
+                    # Same levels: keep the indexed triggers (a fired drawdown alert stays off)
+                    current.mark(position.current_price)
+                    self.book.mark(position.symbol, position.current_price)
+                    continue
+                self.positions[position_id] = position
+                self.book.add(position, position_id)
+                self.trigger_index.add_position(position)
+        
+        if added or removed:
+            logger.info("Synced positions: %s added, %s removed, %s monitored", added, removed, len(self.positions))
+        return added, removed
+    
     def add_position(self, position_data):
         """Add new position to monitoring"""
         try:
             position_id = f"{position_data['symbol']}_{datetime.now().timestamp()}"
-            position = {
-                'id': position_id,
-                'symbol': position_data['symbol'],
-                'direction': position_data['direction'],
-                'entry_price': position_data['entry_price'],
-                'size': position_data['size'],
-                'stop_loss': position_data['stop_loss'],
-                'take_profit': position_data['take_profit'],
-                'leverage': position_data.get('leverage', 1),
-                'timestamp': datetime.now(),
-                'unrealized_pnl': 0
-            }
+            position = Position(
+                id=position_id,
+                symbol=position_data['symbol'],
+                direction=position_data['direction'],
+                entry_price=position_data['entry_price'],
+                size=position_data['size'],
+                stop_loss=position_data['stop_loss'],
+                take_profit=position_data['take_profit'],
+                leverage=position_data.get('leverage', 1),
+                timestamp=datetime.now()
+            )
             
-            self.positions[position_id] = position
+            with self._lock:
+                self.positions[position_id] = position
+                self.book.add(position, position_id)
+                self.trigger_index.add_position(position)
             self.daily_trades += 1
+            self._journal_daily_counters()
             
-            logger.info(f"Added position {position_id} for monitoring")
+            logger.info("Added position %s for monitoring", position_id)
             return position_id
             
         except Exception as e:
-            logger.error(f"Error adding position: {e}")
+            logger.error("Error adding position: %s", e)
             return None
     
+    def _journal_daily_counters(self):
+        """Append the daily P&L / trade counters to the state journal"""
+        if self.journal is None:
+            return
+        try:
+            self.journal.append('portfolio', date=self.last_reset_date.isoformat(),
+                                daily_pnl=self.daily_pnl, daily_trades=self.daily_trades)
+        except Exception as e:
+            logger.error("Error journaling daily counters: %s", e)
+    
+    def _restore_daily_counters(self):
+        """Restore today's daily counters written before a restart"""
+        if self.journal is None:
+            return
+        try:
+            saved = self.journal.get('portfolio')
+            if saved.get('date') == self.last_reset_date.isoformat():
+                self.daily_pnl = float(saved.get('daily_pnl', 0.0))
+                self.daily_trades = int(saved.get('daily_trades', 0))
+                logger.info("Restored daily counters: P&L $%.2f, %s trades", self.daily_pnl, self.daily_trades)
+        except Exception as e:
+            logger.error("Error restoring daily counters: %s", e)
+    
     def get_portfolio_summary(self):
         """Get comprehensive portfolio summary"""
         try:
@@ -275,12 +496,12 @@ class PortfolioMonitor:
                 'total_risk_percent': risk_percent,
                 'active_positions': len(self.positions),
                 'daily_trades': self.daily_trades,
-                'positions': list(self.positions.values()),
+                'positions': [position.to_dict() for position in self.positions.values()],
                 'suggestions': self.suggest_position_adjustments()
             }
             
         except Exception as e:
-            logger.error(f"Error getting portfolio summary: {e}")
+            logger.error("Error getting portfolio summary: %s", e)
             return {
                 'total_balance': 0,
                 'daily_pnl': 0,
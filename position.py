@@ -0,0 +1,341 @@
+"""
+Position Model Module
+
+Position is the single shape for an open position across the API client,
+portfolio monitor, backtester and dashboard. It is a slotted dataclass that
+also supports read-only mapping access (position['symbol'],
+position.get('stop_loss')) so code written against the old dict positions
+keeps working; to_dict() produces the JSON shape the dashboard expects.
+
+PositionBook stores the numeric fields of many positions in NumPy columns
+and maintains portfolio totals incrementally, so portfolio summaries are
+O(1) reads instead of a Python sum over every position.
+"""
+
+import logging
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Position:
+    """An open futures position"""
+
+    symbol: str
+    direction: str  # 'long' or 'short'
+    size: float
+    entry_price: float
+    current_price: Optional[float] = None
+    leverage: float = 1
+    unrealized_pnl: float = 0.0
+    realized_pnl: float = 0.0
+    margin: float = 0.0
+    margin_ratio: float = 0.0
+    position_value: Optional[float] = None
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    id: Optional[str] = None
+    timestamp: Optional[datetime] = None
+    confidence: Optional[float] = None
+    reason: Optional[str] = None
+    extra: Dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.current_price is None:
+            self.current_price = self.entry_price
+        if self.position_value is None:
+            self.position_value = abs(self.size) * self.current_price
+
+    # Mapping-style read access for code written against dict positions
+    def __getitem__(self, key):
+        # Only fields (slots) and extra keys; methods such as mark are not items
+        if key in _FIELD_NAMES:
+            return getattr(self, key)
+        try:
+            return self.extra[key]
+        except KeyError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in _FIELD_NAMES or key in self.extra
+
+    def get(self, key, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        # Unset optional fields behave like missing keys, matching to_dict()
+        return default if value is None else value
+
+    @property
+    def sign(self) -> int:
+        return 1 if self.direction == 'long' else -1
+
+    def pnl_at(self, price: float) -> float:
+        """Unrealized P&L if marked at price"""
+        return self.sign * (price - self.entry_price) * self.size
+
+    def mark(self, price: float):
+        """Mark the position to a price, updating unrealized P&L"""
+        self.current_price = price
+        self.unrealized_pnl = self.pnl_at(price)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Position':
+        """Build a Position from a legacy position dict; unknown keys go to extra"""
+        known = {key: data[key] for key in _FIELD_NAMES if key in data and key != 'extra'}
+        extra = {key: value for key, value in data.items() if key not in _FIELD_NAMES}
+        return cls(extra=extra, **known)
+
+    def to_dict(self) -> Dict:
+        """JSON-friendly dict in the shape the dashboard and API return"""
+        data = {name: getattr(self, name) for name in _FIELD_NAMES if name != 'extra'}
+        data = {key: value for key, value in data.items() if value is not None}
+        data.update(self.extra)
+        return data
+
+
+_FIELD_NAMES = frozenset(f.name for f in fields(Position))
+
+
+class PositionBook:
+    """
+    Columnar store of open positions with incrementally maintained totals.
+
+    Rows are packed: removing a position moves the last row into the freed
+    slot, so every column stays contiguous.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._capacity = max(capacity, 1)
+        self._count = 0
+        self._sign = np.zeros(self._capacity)
+        self._size = np.zeros(self._capacity)
+        self._entry = np.zeros(self._capacity)
+        self._mark = np.zeros(self._capacity)
+        self._margin = np.zeros(self._capacity)
+        self._realized = np.zeros(self._capacity)
+        self._stop = np.full(self._capacity, np.nan)
+        self._pnl = np.zeros(self._capacity)
+
+        self._ids: List[str] = []
+        self._symbols: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._symbol_rows: Dict[str, set] = {}
+
+        self._reset_totals()
+
+    def _reset_totals(self):
+        self.total_unrealized_pnl = 0.0
+        self.total_realized_pnl = 0.0
+        self.total_margin = 0.0
+        self.total_notional = 0.0
+        self.total_stop_risk = 0.0
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, position_id):
+        return position_id in self._rows
+
+    def _grow(self):
+        self._capacity *= 2
+        for name in ('_sign', '_size', '_entry', '_mark', '_margin', '_realized', '_pnl'):
+            column = getattr(self, name)
+            grown = np.zeros(self._capacity)
+            grown[:column.size] = column
+            setattr(self, name, grown)
+        stop = np.full(self._capacity, np.nan)
+        stop[:self._stop.size] = self._stop
+        self._stop = stop
+
+    def add(self, position: Position, position_id: Optional[str] = None) -> int:
+        """
+        Add (or replace) a position
+
+        Args:
+            position: Position to add
+            position_id: Key for the position (defaults to position.id, then symbol:direction)
+
+        Returns:
+            int: Row index of the position
+        """
+        key = position_id or position.id or f"{position.symbol}:{position.direction}"
+        if key in self._rows:
+            self.remove(key)
+        if self._count == self._capacity:
+            self._grow()
+
+        row = self._count
+        self._count += 1
+        self._ids.append(key)
+        self._symbols.append(position.symbol)
+        self._rows[key] = row
+        self._symbol_rows.setdefault(position.symbol, set()).add(row)
+
+        for column, value in zip(self._columns(), self._row_values(position)):
+            column[row] = value
+
+        self._apply_row_totals(row, 1.0)
+        return row
+
+    def _columns(self):
+        return (self._sign, self._size, self._entry, self._mark,
+                self._margin, self._realized, self._stop, self._pnl)
+
+    @staticmethod
+    def _row_values(position: Position) -> Tuple[float, ...]:
+        """Column values of a position, in _columns() order"""
+        mark = position.current_price if position.current_price is not None else position.entry_price
+        return (
+            position.sign,
+            position.size,
+            position.entry_price,
+            mark,
+            position.margin or 0.0,
+            position.realized_pnl or 0.0,
+            position.stop_loss if position.stop_loss is not None else np.nan,
+            position.unrealized_pnl if position.unrealized_pnl else position.pnl_at(mark),
+        )
+
+    def remove(self, position_id: str) -> bool:
+        """Remove a position; returns False if it was not in the book"""
+        row = self._rows.pop(position_id, None)
+        if row is None:
+            return False
+
+        self._apply_row_totals(row, -1.0)
+        symbol = self._symbols[row]
+        self._symbol_rows[symbol].discard(row)
+
+        last = self._count - 1
+        if row != last:
+            # Move the last row into the freed slot
+            for column in self._columns():
+                column[row] = column[last]
+            moved_id = self._ids[last]
+            moved_symbol = self._symbols[last]
+            self._ids[row] = moved_id
+            self._symbols[row] = moved_symbol
+            self._rows[moved_id] = row
+            self._symbol_rows[moved_symbol].discard(last)
+            self._symbol_rows[moved_symbol].add(row)
+
+        self._ids.pop()
+        self._symbols.pop()
+        self._stop[last] = np.nan
+        self._count -= 1
+        if self._count == 0:
+            self._reset_totals()  # Drop accumulated float drift
+        return True
+
+    def clear(self):
+        self._count = 0
+        self._ids = []
+        self._symbols = []
+        self._rows = {}
+        self._symbol_rows = {}
+        self._stop[:] = np.nan
+        self._reset_totals()
+
+    def sync(self, positions: Iterable[Position]) -> Tuple[int, int, int]:
+        """
+        Bring the book in line with a fresh snapshot of positions
+
+        Only the difference is applied: positions missing from the snapshot
+        are removed, new ones added and rows whose values changed replaced;
+        unchanged rows are left alone. Positions are keyed by id, else
+        symbol:direction (suffixed with a counter when repeated).
+
+        Args:
+            positions: Complete set of open positions
+
+        Returns:
+            tuple: (added, removed, updated) counts
+        """
+        snapshot = {}
+        for position in positions:
+            key = base = position.id or f"{position.symbol}:{position.direction}"
+            repeat = 1
+            while key in snapshot:
+                key = f"{base}:{repeat}"
+                repeat += 1
+            snapshot[key] = position
+
+        removed = sum(self.remove(key) for key in [key for key in self._rows if key not in snapshot])
+        added = updated = 0
+        for key, position in snapshot.items():
+            row = self._rows.get(key)
+            if row is None:
+                added += 1
+            elif np.array_equal([column[row] for column in self._columns()], self._row_values(position),
+                                equal_nan=True) and self._symbols[row] == position.symbol:
+                continue
+            else:
+                updated += 1
+            self.add(position, key)
+        return added, removed, updated
+
+    def _apply_row_totals(self, row: int, weight: float):
+        self.total_unrealized_pnl += weight * self._pnl[row]
+        self.total_realized_pnl += weight * self._realized[row]
+        self.total_margin += weight * self._margin[row]
+        self.total_notional += weight * self._size[row] * self._mark[row]
+        stop = self._stop[row]
+        if not np.isnan(stop):
+            self.total_stop_risk += weight * abs(self._entry[row] - stop) * self._size[row]
+
+    def mark(self, symbol: str, price: float):
+        """Mark every position in a symbol to a price, updating totals by the delta"""
+        rows = self._symbol_rows.get(symbol)
+        if not rows:
+            return
+        index = np.fromiter(rows, dtype=np.intp, count=len(rows))
+        new_pnl = self._sign[index] * (price - self._entry[index]) * self._size[index]
+        self.total_unrealized_pnl += float(new_pnl.sum() - self._pnl[index].sum())
+        self.total_notional += float((self._size[index] * (price - self._mark[index])).sum())
+        self._pnl[index] = new_pnl
+        self._mark[index] = price
+
+    def mark_all(self, prices: Dict[str, float]):
+        for symbol, price in prices.items():
+            self.mark(symbol, price)
+
+    def recompute(self):
+        """Recompute totals from the columns (clears accumulated float drift)"""
+        n = self._count
+        self.total_unrealized_pnl = float(self._pnl[:n].sum())
+        self.total_realized_pnl = float(self._realized[:n].sum())
+        self.total_margin = float(self._margin[:n].sum())
+        self.total_notional = float((self._size[:n] * self._mark[:n]).sum())
+        stops = self._stop[:n]
+        has_stop = ~np.isnan(stops)
+        self.total_stop_risk = float((np.abs(self._entry[:n][has_stop] - stops[has_stop]) * self._size[:n][has_stop]).sum())
+
+    def summary(self, balance: float) -> Dict:
+        """
+        Portfolio totals relative to a balance (O(1))
+
+        Args:
+            balance: Account balance
+
+        Returns:
+            dict: P&L, margin and risk totals
+        """
+        total_pnl = self.total_unrealized_pnl + self.total_realized_pnl
+        return {
+            'active_positions': self._count,
+            'unrealized_pnl': self.total_unrealized_pnl,
+            'realized_pnl': self.total_realized_pnl,
+            'total_pnl': total_pnl,
+            'total_pnl_percent': (total_pnl / balance * 100) if balance > 0 else 0,
+            'total_margin': self.total_margin,
+            'margin_risk_percent': (self.total_margin / balance * 100) if balance > 0 else 0,
+            'stop_risk_percent': (self.total_stop_risk / balance * 100) if balance > 0 else 0,
+            'total_notional': self.total_notional
+        }
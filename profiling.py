@@ -0,0 +1,197 @@
+"""
+Runtime Profiling Module
+
+Two complementary tools that can be switched on in a running process
+without a redeploy:
+
+- Instrumentation hooks: the profiled decorator, profile_class class
+  decorator and section context manager record call counts and wall time
+  per named section. While profiling is disabled each hook costs a single
+  flag check.
+- Sampling profiler: capture_sample_profile samples every thread's stack
+  at a fixed interval for a bounded time and returns collapsed stacks
+  ("frame;frame;frame count" lines) that flamegraph.pl, speedscope and
+  similar tools read directly.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, List, Optional
+
+# Hard limits for on-demand sampling so an admin request cannot stall the app
+MAX_SAMPLE_SECONDS = 60.0
+MIN_SAMPLE_INTERVAL = 0.001
+
+
+class ProfilingHooks:
+    """Collects per-section timing statistics while enabled"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._stats: Dict[str, List[float]] = {}  # name -> [count, total, max]
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    def record(self, name: str, elapsed: float):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                self._stats[name] = [1, elapsed, elapsed]
+            else:
+                stats[0] += 1
+                stats[1] += elapsed
+                if elapsed > stats[2]:
+                    stats[2] = elapsed
+
+    def get_stats(self, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Get collected statistics ordered by total time
+
+        Args:
+            limit: Maximum number of sections to return
+
+        Returns:
+            list: Dicts with name, calls, total_ms, avg_ms and max_ms
+        """
+        with self._lock:
+            items = [(name, list(stats)) for name, stats in self._stats.items()]
+
+        items.sort(key=lambda item: item[1][1], reverse=True)
+        if limit:
+            items = items[:limit]
+
+        return [
+            {
+                'name': name,
+                'calls': int(count),
+                'total_ms': round(total * 1000, 3),
+                'avg_ms': round(total / count * 1000, 3) if count else 0,
+                'max_ms': round(maximum * 1000, 3)
+            }
+            for name, (count, total, maximum) in items
+        ]
+
+
+HOOKS = ProfilingHooks(enabled=os.environ.get("PROFILING_ENABLED", "").lower() in ("1", "true", "yes"))
+
+
+def profiled(name: Optional[str] = None, hooks: ProfilingHooks = HOOKS):
+    """
+    Decorator timing a function into the profiling hooks while enabled
+
+    Args:
+        name: Section name (defaults to module.qualname)
+        hooks: Hooks instance to record into
+    """
+    def decorator(func):
+        section_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not hooks.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                hooks.record(section_name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def profile_class(cls=None, *, hooks: ProfilingHooks = HOOKS):
+    """
+    Class decorator applying profiled to every method defined on the class
+
+    Plain, static and class methods are wrapped; dunder methods are left alone.
+    """
+    def decorate(klass):
+        for attr, value in list(vars(klass).items()):
+            if attr.startswith('__'):
+                continue
+            name = f"{klass.__name__}.{attr}"
+            if isinstance(value, staticmethod):
+                setattr(klass, attr, staticmethod(profiled(name, hooks)(value.__func__)))
+            elif isinstance(value, classmethod):
+                setattr(klass, attr, classmethod(profiled(name, hooks)(value.__func__)))
+            elif callable(value):
+                setattr(klass, attr, profiled(name, hooks)(value))
+        return klass
+
+    return decorate(cls) if cls is not None else decorate
+
+
+@contextmanager
+def section(name: str, hooks: ProfilingHooks = HOOKS):
+    """Context manager timing a block into the profiling hooks while enabled"""
+    if not hooks.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        hooks.record(name, time.perf_counter() - start)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}:{code.co_firstlineno}"
+
+
+def capture_sample_profile(seconds: float = 5.0, interval: float = 0.005,
+                           include_idle: bool = False) -> str:
+    """
+    Sample all thread stacks of the live process for a bounded time
+
+    Args:
+        seconds: Capture duration (capped at MAX_SAMPLE_SECONDS)
+        interval: Time between samples in seconds (at least MIN_SAMPLE_INTERVAL)
+        include_idle: Keep stacks of threads parked in wait/sleep/select calls
+
+    Returns:
+        str: Collapsed stacks, one "thread;root;...;leaf count" line per unique stack
+    """
+    seconds = min(max(seconds, 0.0), MAX_SAMPLE_SECONDS)
+    interval = max(interval, MIN_SAMPLE_INTERVAL)
+    idle_leaves = {'wait', 'sleep', 'select', 'poll', 'epoll', 'accept', '_wait_for_tstate_lock', 'get'}
+
+    own_ident = threading.get_ident()
+    stacks = Counter()
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            if not include_idle and frame.f_code.co_name in idle_leaves:
+                continue
+
+            labels = []
+            while frame is not None:
+                # Hide the instrumentation wrappers so stacks match the source
+                if frame.f_code.co_name != 'wrapper' or frame.f_globals.get('__name__') != __name__:
+                    labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(thread_names.get(ident, f"thread-{ident}"))
+            labels.reverse()
+            stacks[';'.join(labels)] += 1
+        time.sleep(interval)
+
+    return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + ("\n" if stacks else "")
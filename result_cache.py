@@ -0,0 +1,161 @@
+"""
+Backtest Result Cache Module
+
+Content-addressed on-disk cache for backtest results. An entry's key is the
+SHA-256 of its inputs (data fingerprint, strategy parameters, engine
+version), so a changed input is a different key and entries never need
+invalidating.
+
+- Entries are JSON files in two-character shard directories
+- Writes go to a unique temp file and are renamed into place (atomic), so
+  concurrent processes sharing the directory never read a partial entry
+  and the last writer of identical content wins
+- Hits refresh the entry's mtime; when the directory grows beyond
+  max_bytes, the least recently used entries are deleted (races with
+  other processes deleting the same file are ignored)
+- Lookups are counted in the cache_requests_total metric
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+ENTRY_SUFFIX = '.json'
+
+
+def make_key(*parts) -> str:
+    """SHA-256 hex key of JSON-serializable parts (dict order does not matter)"""
+    blob = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """Size-bounded, process-safe key -> JSON payload cache on disk"""
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, name: str = 'backtest'):
+        """
+        Args:
+            directory: Cache directory (shared by every process using it)
+            max_bytes: Total entry size above which LRU entries are evicted
+            name: Cache label in the cache_requests_total metric
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.name = name
+        self._lock = threading.Lock()
+        self._bytes_written = 0  # Since the last size scan
+        self._size = None  # Total size at the last scan
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached payload for key, or None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except FileNotFoundError:
+            payload = None
+        except (OSError, ValueError) as e:
+            logger.warning("Dropping unreadable cache entry %s: %s", path, e)
+            self._remove(path)
+            payload = None
+        else:
+            try:
+                os.utime(path)  # Most recently used
+            except OSError:
+                pass
+
+        record_cache_lookup(self.name, payload is not None)
+        return payload
+
+    def put(self, key: str, payload: Any):
+        """Store payload under key (atomic replace) and evict if over the size bound"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, separators=(',', ':'), default=str)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._bytes_written += size
+            # Rescan on overflow, and periodically to see other processes' writes
+            if (self._size is None or self._size + self._bytes_written > self.max_bytes
+                    or self._bytes_written > self.max_bytes // 10):
+                self._evict_locked()
+
+    def _entries(self):
+        """(mtime, size, path) of every entry"""
+        entries = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Evicted by another process
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _evict_locked(self):
+        """Delete least recently used entries until the total is within 90% of max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            target = self.max_bytes * 0.9
+            evicted = 0
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                self._remove(path)
+                total -= size
+                evicted += 1
+            logger.info("Evicted %s cache entries from %s (%.1f MB kept)", evicted, self.directory, total / 1e6)
+        self._size = total
+        self._bytes_written = 0
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Delete every entry"""
+        with self._lock:
+            for _, _, path in self._entries():
+                self._remove(path)
+            self._size = 0
+            self._bytes_written = 0
+
+    def get_status(self) -> Dict:
+        """Entry count and total size (scans the directory)"""
+        entries = self._entries()
+        return {
+            'directory': self.directory,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+            'oldest_entry_age_seconds': round(time.time() - min(e[0] for e in entries), 1) if entries else None,
+        }
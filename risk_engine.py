@@ -0,0 +1,359 @@
+"""
+Portfolio Risk Engine Module
+
+Correlation-aware risk for the live book. The engine keeps a rolling window
+of per-candle returns for every tracked symbol together with running sums
+of returns and return cross-products, so each new candle updates the
+covariance matrix in O(n²) instead of recomputing it from the window.
+
+From the covariance and the window of returns it computes, for a vector of
+signed symbol exposures:
+
+- Parametric (variance-covariance) VaR and CVaR: one quadratic form w'Σw
+- Historical VaR and CVaR: one matrix-vector product R·w over the window
+- Component VaR per symbol, which sums to the parametric VaR
+
+Fast enough to run on every portfolio refresh and as a pre-trade check.
+"""
+
+import logging
+import threading
+from statistics import NormalDist
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def closes_from_klines(klines) -> pd.Series:
+    """
+    Extract a close-price series indexed by candle open time from kline data
+
+    Args:
+        klines: Rows of [ts_ms, open, high, low, close, volume], dicts with
+            time/close keys, or an exchange response wrapping either in 'data'
+
+    Returns:
+        pd.Series: Close prices indexed by epoch-millisecond timestamp
+    """
+    if isinstance(klines, dict):
+        klines = klines.get('data') or []
+    timestamps, closes = [], []
+    for row in klines:
+        if isinstance(row, dict):
+            ts = row.get('time', row.get('ts', row.get('openTime')))
+            close = row.get('close', row.get('c'))
+        else:
+            ts, close = row[0], row[4]
+        if ts is None or close is None:
+            continue
+        timestamps.append(int(ts))
+        closes.append(float(close))
+    return pd.Series(closes, index=timestamps, dtype=float).sort_index()
+
+
+class RiskEngine:
+    """Rolling covariance of symbol returns with VaR / CVaR for a book of positions"""
+
+    def __init__(self, window: int = 720, confidence: float = 0.99, horizon: int = 1,
+                 min_observations: int = 30, default_volatility: float = 0.02):
+        """
+        Args:
+            window: Number of candle returns kept for covariance and historical VaR
+            confidence: VaR confidence level
+            horizon: VaR horizon in candles (parametric VaR scales by sqrt(horizon))
+            min_observations: Returns required before a symbol's estimates are trusted
+            default_volatility: Per-candle volatility assumed for symbols without enough history
+        """
+        self.window = window
+        self.confidence = confidence
+        self.horizon = horizon
+        self.min_observations = min_observations
+        self.default_volatility = default_volatility
+
+        self._lock = threading.Lock()
+        self._reset([])
+
+    def _reset(self, symbols: List[str]):
+        n = len(symbols)
+        self._symbols = list(symbols)
+        self._index = {symbol: i for i, symbol in enumerate(symbols)}
+        self._returns = np.zeros((self.window, n))  # Ring buffer of simple returns
+        self._head = 0  # Next row to write
+        self._count = 0  # Filled rows
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._observations = np.zeros(n, dtype=np.int64)  # Real (non-filled) returns per symbol
+        self._last_close = np.full(n, np.nan)
+        self._last_ts = None
+        self._updates_since_rebuild = 0
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    @property
+    def observations(self) -> int:
+        return self._count
+
+    def needs_history(self, symbols: Iterable[str]) -> List[str]:
+        """Symbols with fewer than min_observations returns in the window"""
+        with self._lock:
+            return [
+                symbol for symbol in symbols
+                if symbol not in self._index or self._observations[self._index[symbol]] < self.min_observations
+            ]
+
+    def _add_symbols(self, symbols: Iterable[str]):
+        new = [symbol for symbol in symbols if symbol not in self._index]
+        if not new:
+            return
+        for symbol in new:
+            self._index[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        extra = len(new)
+        # Existing rows get zero returns for the new columns; their covariance
+        # stays untrusted until min_observations real returns arrive
+        self._returns = np.pad(self._returns, ((0, 0), (0, extra)))
+        self._sum = np.pad(self._sum, (0, extra))
+        self._cross = np.pad(self._cross, ((0, extra), (0, extra)))
+        self._observations = np.pad(self._observations, (0, extra))
+        self._last_close = np.pad(self._last_close, (0, extra), constant_values=np.nan)
+
+    def seed(self, closes: pd.DataFrame):
+        """
+        Rebuild the window from a (time x symbol) frame of close prices
+
+        Args:
+            closes: Close prices with one column per symbol, rows in time order
+        """
+        closes = closes.sort_index().ffill()
+        returns = closes.pct_change().iloc[1:]
+        observed = returns.notna().to_numpy()
+        values = returns.fillna(0.0).to_numpy()[-self.window:]
+
+        with self._lock:
+            self._reset(list(closes.columns))
+            rows = values.shape[0]
+            self._returns[:rows] = values
+            self._head = rows % self.window
+            self._count = rows
+            self._sum = values.sum(axis=0)
+            self._cross = values.T @ values
+            self._observations = observed[-self.window:].sum(axis=0).astype(np.int64)
+            self._last_close = closes.iloc[-1].to_numpy(dtype=float)
+            self._last_ts = closes.index[-1]
+
+        logger.info("Risk engine seeded with %s returns across %s symbols", rows, len(self._symbols))
+
+    def update(self, closes: Dict[str, float], ts=None) -> bool:
+        """
+        Add one candle of closes; symbols without a close this candle get a zero return
+
+        Args:
+            closes: Close price per symbol for the new candle
+            ts: Candle timestamp; candles not newer than the last one are ignored
+
+        Returns:
+            bool: True if a new return row was added
+        """
+        with self._lock:
+            if ts is not None and self._last_ts is not None and ts <= self._last_ts:
+                return False
+            self._add_symbols(closes)
+
+            new_close = self._last_close.copy()
+            for symbol, close in closes.items():
+                new_close[self._index[symbol]] = close
+            has_both = ~np.isnan(self._last_close) & ~np.isnan(new_close)
+            row = np.zeros(len(self._symbols))
+            row[has_both] = new_close[has_both] / self._last_close[has_both] - 1.0
+            self._last_close = new_close
+            if ts is not None:
+                self._last_ts = ts
+            if not has_both.any():
+                return False
+
+            # Evict the oldest row once the window is full, then add the new one
+            if self._count == self.window:
+                old = self._returns[self._head]
+                self._sum -= old
+                self._cross -= np.outer(old, old)
+            else:
+                self._count += 1
+            self._returns[self._head] = row
+            self._head = (self._head + 1) % self.window
+            self._sum += row
+            self._cross += np.outer(row, row)
+            self._observations += has_both
+
+            # Periodically rebuild the running sums to drop accumulated float error
+            self._updates_since_rebuild += 1
+            if self._updates_since_rebuild >= self.window:
+                window = self._window_returns()
+                self._sum = window.sum(axis=0)
+                self._cross = window.T @ window
+                self._updates_since_rebuild = 0
+            return True
+
+    def _window_returns(self) -> np.ndarray:
+        """Filled window rows, oldest first"""
+        if self._count < self.window:
+            return self._returns[:self._count]
+        return np.roll(self._returns, -self._head, axis=0)
+
+    def covariance(self) -> np.ndarray:
+        """Per-candle return covariance matrix (symbols in self.symbols order)"""
+        with self._lock:
+            return self._covariance()
+
+    def _covariance(self) -> np.ndarray:
+        n = len(self._symbols)
+        k = self._count
+        if k < 2:
+            cov = np.zeros((n, n))
+        else:
+            cov = (self._cross - np.outer(self._sum, self._sum) / k) / (k - 1)
+
+        # Symbols without enough history: assumed volatility, no correlation
+        thin = self._observations < self.min_observations
+        if thin.any():
+            cov[thin, :] = 0.0
+            cov[:, thin] = 0.0
+            cov[thin, thin] = self.default_volatility ** 2
+        return cov
+
+    def correlation(self) -> pd.DataFrame:
+        """Return correlation matrix as a labelled frame"""
+        cov = self.covariance()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = cov / np.outer(std, std)
+        return pd.DataFrame(np.nan_to_num(corr), index=self._symbols, columns=self._symbols)
+
+    def exposures(self, positions: Iterable) -> np.ndarray:
+        """
+        Signed notional exposure per symbol (long positive, short negative)
+
+        Args:
+            positions: Position objects or position dicts
+
+        Returns:
+            np.ndarray: Exposure vector aligned with self.symbols
+        """
+        positions = list(positions)
+        with self._lock:
+            self._add_symbols(position['symbol'] for position in positions)
+            weights = np.zeros(len(self._symbols))
+            for position in positions:
+                price = position.get('current_price') or position['entry_price']
+                sign = 1.0 if position['direction'] == 'long' else -1.0
+                weights[self._index[position['symbol']]] += sign * position['size'] * price
+        return weights
+
+    def evaluate(self, exposures: np.ndarray, balance: float = 0.0) -> Dict:
+        """
+        VaR and CVaR (as positive losses) for an exposure vector
+
+        Args:
+            exposures: Signed notional per symbol, aligned with self.symbols
+            balance: Account balance for percentage figures (optional)
+
+        Returns:
+            dict: Parametric and historical VaR/CVaR, component VaR and volatility
+        """
+        with self._lock:
+            n = len(self._symbols)
+            w = np.zeros(n)
+            w[:exposures.size] = exposures
+            cov = self._covariance()
+            window = self._window_returns()
+            thin = self._observations < self.min_observations
+
+        alpha = 1.0 - self.confidence
+        z = NormalDist().inv_cdf(self.confidence)
+        scale = np.sqrt(self.horizon)
+
+        # Parametric: one quadratic form
+        cov_w = cov @ w
+        sigma = float(np.sqrt(max(w @ cov_w, 0.0)))
+        parametric_var = float(z * sigma * scale)
+        parametric_cvar = float(sigma * NormalDist().pdf(z) / alpha * scale)
+        if sigma > 0:
+            component = w * cov_w / sigma * z * scale
+        else:
+            component = np.zeros(n)
+
+        # Historical: one matrix-vector product over the window. Symbols with thin
+        # history contribute via the parametric figure only.
+        historical_var = historical_cvar = None
+        if window.shape[0] >= self.min_observations:
+            pnl = window @ np.where(thin, 0.0, w)
+            cutoff = np.quantile(pnl, alpha)
+            historical_var = float(max(-cutoff, 0.0))
+            tail = pnl[pnl <= cutoff]
+            historical_cvar = float(max(-tail.mean(), 0.0)) if tail.size else historical_var
+
+        def percent(value):
+            if value is None or balance <= 0:
+                return None
+            return value / balance * 100
+
+        return {
+            'confidence': self.confidence,
+            'horizon': self.horizon,
+            'observations': int(window.shape[0]),
+            'gross_exposure': float(np.abs(w).sum()),
+            'net_exposure': float(w.sum()),
+            'volatility': sigma,
+            'parametric_var': parametric_var,
+            'parametric_cvar': parametric_cvar,
+            'historical_var': historical_var,
+            'historical_cvar': historical_cvar,
+            'parametric_var_percent': percent(parametric_var),
+            'parametric_cvar_percent': percent(parametric_cvar),
+            'historical_var_percent': percent(historical_var),
+            'historical_cvar_percent': percent(historical_cvar),
+            'component_var': {
+                symbol: float(component[i]) for i, symbol in enumerate(self._symbols[:n]) if w[i] != 0
+            },
+            'thin_history': [symbol for i, symbol in enumerate(self._symbols[:n]) if w[i] != 0 and thin[i]]
+        }
+
+    def portfolio_risk(self, positions: Iterable, balance: float = 0.0) -> Dict:
+        """VaR / CVaR for a list of positions"""
+        return self.evaluate(self.exposures(positions), balance)
+
+    def pre_trade_check(self, positions: Iterable, candidate: Dict, balance: float,
+                        max_var_percent: float = 5.0) -> Tuple[bool, Dict]:
+        """
+        Check whether adding a trade keeps portfolio VaR within a limit
+
+        Args:
+            positions: Current positions
+            candidate: Proposed trade with symbol, direction, size and entry_price
+            balance: Account balance
+            max_var_percent: Maximum parametric VaR as a percentage of balance
+
+        Returns:
+            tuple: (allowed: bool, details: dict with VaR before and after)
+        """
+        positions = list(positions)
+        before = self.evaluate(self.exposures(positions), balance)
+        after = self.evaluate(self.exposures(positions + [candidate]), balance)
+
+        var_percent = after['parametric_var_percent']
+        allowed = bool(var_percent is not None and var_percent <= max_var_percent)
+        if not allowed:
+            logger.warning("Pre-trade VaR check failed for %s: %.2f%% of balance (limit %.2f%%)",
+                           candidate.get('symbol'), var_percent or 0.0, max_var_percent)
+
+        return allowed, {
+            'var_before': before['parametric_var'],
+            'var_after': after['parametric_var'],
+            'var_percent_after': var_percent,
+            'incremental_var': after['parametric_var'] - before['parametric_var'],
+            'limit_percent': max_var_percent
+        }
@@ -1,4 +1,6 @@
 import logging
+import numpy as np
+import pandas as pd
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +18,8 @@ class RiskManager:
         self.max_leverage = max_leverage
         self.max_daily_loss = max_daily_loss
         
-        logger.info(f"RiskManager initialized with max_risk: {max_risk_percent}%, "
-                   f"max_leverage: {max_leverage}x, max_daily_loss: {max_daily_loss}%")
+        logger.info("RiskManager initialized with max_risk: %s%%, max_leverage: %sx, max_daily_loss: %s%%",
+                    max_risk_percent, max_leverage, max_daily_loss)
         
     def validate_trade(self, trade_params):
         """
@@ -42,14 +44,89 @@ class RiskManager:
             
             if not is_valid:
                 failed_checks = [check for check, passed in checks.items() if not passed]
-                logger.warning(f"Trade validation failed. Failed checks: {failed_checks}")
+                logger.warning("Trade validation failed. Failed checks: %s", failed_checks)
             
             return is_valid, checks
             
         except Exception as e:
-            logger.error(f"Error validating trade: {e}")
+            logger.error("Error validating trade: %s", e)
             return False, {'error': str(e)}
     
+    def validate_trades(self, trades):
+        """
+        Validate many candidate trades at once
+        
+        Applies the same checks as validate_trade column-wise. Missing inputs
+        are derived where possible: stop_loss from entry_price, direction and
+        atr; position_size (as position value) and risk_percent from
+        account_balance, entry_price and stop_loss via calculate_position_size.
+        
+        Args:
+            trades: DataFrame or dict of equal-length arrays with any of leverage,
+                risk_percent, stop_loss, position_size, account_balance,
+                risk_reward_ratio, entry_price, direction and atr
+            
+        Returns:
+            tuple: (is_valid: np.ndarray of bool, failures: pd.DataFrame with one
+                boolean column per check, True where the check failed, plus the
+                derived stop_loss, position_size and risk_percent columns)
+        """
+        frame = pd.DataFrame(trades).reset_index(drop=True)
+        n = len(frame)
+        
+        def column(name, default):
+            if name in frame:
+                return pd.to_numeric(frame[name], errors='coerce').to_numpy(dtype=float)
+            return np.full(n, default, dtype=float)
+        
+        entry_price = column('entry_price', np.nan)
+        account_balance = column('account_balance', 0.0)
+        
+        stop_loss = column('stop_loss', np.nan)
+        if 'atr' in frame and 'direction' in frame:
+            derived_stop = self.calculate_stop_loss(entry_price, frame['direction'].to_numpy(), column('atr', 0.0))
+            stop_loss = np.where(np.isnan(stop_loss), derived_stop, stop_loss)
+        
+        if 'position_size' in frame:
+            position_size = column('position_size', 0.0)
+        else:
+            risk_percent = column('risk_percent', self.max_risk_percent)
+            units = self.calculate_position_size(account_balance, risk_percent, entry_price,
+                                                 np.nan_to_num(stop_loss))
+            position_size = np.nan_to_num(units * entry_price)
+        
+        if 'risk_percent' in frame:
+            risk_percent = column('risk_percent', 0.0)
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                risk_percent = np.abs(entry_price - stop_loss) / entry_price * position_size / account_balance * 100
+            risk_percent = np.nan_to_num(risk_percent)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position_percent = np.where(account_balance > 0, position_size / account_balance * 100, np.inf)
+        
+        failures = pd.DataFrame({
+            'leverage_safe': ~(column('leverage', 1.0) <= self.max_leverage),
+            'risk_acceptable': ~(risk_percent <= self.max_risk_percent),
+            'stop_loss_set': np.isnan(stop_loss),
+            # Maximum 20% of balance in single position (tolerance for sizes capped at exactly 20%)
+            'position_size_safe': ~(position_percent <= 20 + 1e-9),
+            'risk_reward_adequate': ~(column('risk_reward_ratio', 0.0) >= 2.0)
+        })
+        is_valid = ~failures.to_numpy().any(axis=1)
+        
+        failures['stop_loss'] = stop_loss
+        failures['position_size'] = position_size
+        failures['risk_percent'] = risk_percent
+        
+        if n and not is_valid.all():
+            counts = failures[['leverage_safe', 'risk_acceptable', 'stop_loss_set',
+                               'position_size_safe', 'risk_reward_adequate']].sum()
+            logger.debug("Batch validation rejected %s of %s trades: %s",
+                         int((~is_valid).sum()), n, counts[counts > 0].to_dict())
+        
+        return is_valid, failures
+    
     def check_position_size(self, trade_params):
         """
         Check if position size is within safe limits
@@ -71,13 +148,15 @@ class RiskManager:
             return position_percent <= 20  # Maximum 20% of balance in single position
             
         except Exception as e:
-            logger.error(f"Error checking position size: {e}")
+            logger.error("Error checking position size: %s", e)
             return False
     
     def calculate_position_size(self, account_balance, risk_percent, entry_price, stop_loss_price):
         """
         Calculate safe position size based on risk parameters
         
+        Accepts scalars or arrays (element-wise sizing for many candidates).
+        
         Args:
             account_balance: Total account balance
             risk_percent: Risk percentage for this trade
@@ -85,71 +164,77 @@ class RiskManager:
             stop_loss_price: Stop loss price
             
         Returns:
-            float: Safe position size
+            float or np.ndarray: Safe position size (0 where inputs are invalid)
         """
         try:
-            if stop_loss_price <= 0 or entry_price <= 0:
-                return 0
-                
-            risk_amount = account_balance * (min(risk_percent, self.max_risk_percent) / 100)
-            price_difference = abs(entry_price - stop_loss_price)
+            balance = np.asarray(account_balance, dtype=float)
+            entry = np.asarray(entry_price, dtype=float)
+            stop = np.asarray(stop_loss_price, dtype=float)
             
-            if price_difference == 0:
-                return 0
-                
-            position_size = risk_amount / price_difference
+            risk_amount = balance * (np.minimum(risk_percent, self.max_risk_percent) / 100)
+            price_difference = np.abs(entry - stop)
+            valid = (stop > 0) & (entry > 0) & (price_difference > 0)
             
-            # Cap position size to maximum percentage of balance
-            max_position_value = account_balance * 0.2  # 20% max
-            if position_size * entry_price > max_position_value:
-                position_size = max_position_value / entry_price
+            with np.errstate(divide='ignore', invalid='ignore'):
+                position_size = np.where(valid, risk_amount / price_difference, 0.0)
                 
-            logger.debug(f"Calculated position size: {position_size} for risk: {risk_percent}%")
+                # Cap position size to maximum percentage of balance
+                max_position_value = balance * 0.2  # 20% max
+                position_size = np.where(position_size * entry > max_position_value,
+                                         max_position_value / entry, position_size)
+            position_size = np.where(valid, position_size, 0.0)
+            
+            if position_size.ndim == 0:
+                logger.debug("Calculated position size: %s for risk: %s%%", position_size, risk_percent)
+                return float(position_size)
             return position_size
             
         except Exception as e:
-            logger.error(f"Error calculating position size: {e}")
+            logger.error("Error calculating position size: %s", e)
             return 0
     
     def calculate_stop_loss(self, entry_price, direction, atr_value):
         """
         Calculate conservative stop loss using ATR
         
+        Accepts scalars or arrays (element-wise stops for many candidates).
+        
         Args:
             entry_price: Entry price for the trade
             direction: 'long' or 'short'
             atr_value: Average True Range value
             
         Returns:
-            float: Stop loss price
+            float or np.ndarray: Stop loss price
         """
         try:
-            if atr_value <= 0 or entry_price <= 0:
-                # Fallback to 2% stop loss if ATR unavailable
-                multiplier = 0.98 if direction == 'long' else 1.02
-                return entry_price * multiplier
-                
+            entry = np.asarray(entry_price, dtype=float)
+            atr = np.asarray(atr_value, dtype=float)
+            is_long = np.asarray(direction) == 'long'
+            
             # Use 2x ATR for conservative stop loss
             atr_multiplier = 2.0
+            stop_loss = np.where(is_long, entry - atr_multiplier * atr, entry + atr_multiplier * atr)
             
-            if direction == 'long':
-                stop_loss = entry_price - (atr_multiplier * atr_value)
-            else:
-                stop_loss = entry_price + (atr_multiplier * atr_value)
-                
             # Ensure stop loss is reasonable (not more than 5% from entry)
-            max_stop_distance = entry_price * 0.05
-            if direction == 'long':
-                stop_loss = max(stop_loss, entry_price - max_stop_distance)
-            else:
-                stop_loss = min(stop_loss, entry_price + max_stop_distance)
-                
-            logger.debug(f"Calculated stop loss: {stop_loss} for {direction} position at {entry_price}")
+            max_stop_distance = entry * 0.05
+            stop_loss = np.where(is_long,
+                                 np.maximum(stop_loss, entry - max_stop_distance),
+                                 np.minimum(stop_loss, entry + max_stop_distance))
+            
+            # Fallback to 2% stop loss if ATR unavailable
+            fallback = entry * np.where(is_long, 0.98, 1.02)
+            stop_loss = np.where((atr > 0) & (entry > 0), stop_loss, fallback)
+            
+            if stop_loss.ndim == 0:
+                logger.debug("Calculated stop loss: %s for %s position at %s", stop_loss, direction, entry_price)
+                return float(stop_loss)
             return stop_loss
             
         except Exception as e:
-            logger.error(f"Error calculating stop loss: {e}")
-            return entry_price * (0.98 if direction == 'long' else 1.02)
+            logger.error("Error calculating stop loss: %s", e)
+            fallback = np.asarray(entry_price, dtype=float) * np.where(np.asarray(direction) == 'long', 0.98, 1.02)
+            return float(fallback) if fallback.ndim == 0 else fallback
     
     def check_daily_loss_limit(self, daily_pnl_percent):
         """
@@ -163,12 +248,12 @@ class RiskManager:
         """
         try:
             if daily_pnl_percent < -self.max_daily_loss:
-                logger.warning(f"Daily loss limit exceeded: {daily_pnl_percent}% vs limit {self.max_daily_loss}%")
+                logger.warning("Daily loss limit exceeded: %s%% vs limit %s%%", daily_pnl_percent, self.max_daily_loss)
                 return True
             return False
             
         except Exception as e:
-            logger.error(f"Error checking daily loss limit: {e}")
+            logger.error("Error checking daily loss limit: %s", e)
             return False
     
     def get_max_simultaneous_positions(self):
@@ -1,143 +1,58 @@
 import pandas as pd
 import numpy as np
 import logging
-from indicators import ConservativeIndicators
+from strategy import LIVE_STRATEGY, MARKET_CONDITIONS, compute_indicators
+from metrics import SIGNAL_SECONDS
+from profiling import profile_class
 
 logger = logging.getLogger(__name__)
 
+@profile_class
 class ConservativeSignals:
     """Generate conservative trading signals with high confidence requirements"""
     
-    def __init__(self, risk_manager):
+    def __init__(self, risk_manager, strategy=LIVE_STRATEGY):
         self.risk_manager = risk_manager
+        self.strategy = strategy  # Gate, rules, warm-up and stops (see strategy.py)
         self.min_confidence = 75.0  # Minimum 75% confidence
-        self.min_risk_reward = 2.0  # Minimum 2:1 risk-reward ratio
+        
+    def _latest_values(self, data):
+        """Values of every column the strategy reads at the last bar"""
+        columns = self.strategy.required_columns()
+        latest = compute_indicators(data, columns).iloc[-1]
+        return {name: float(latest[name]) for name in columns}
         
     def analyze_market_conditions(self, data):
         """
         Analyze market conditions for trade suitability
         
+        Diagnostic view of the strategy's market conditions (MARKET_CONDITIONS);
+        the strategy's gate is what decides whether a signal may fire.
+        
         Args:
             data: OHLCV price data
             
         Returns:
             dict: Market condition analysis
         """
+        unfavorable = dict.fromkeys(list(MARKET_CONDITIONS) + ['overall_favorable'], False)
         try:
-            if data.empty or len(data) < 50:
-                return {
-                    'trend_clear': False,
-                    'volatility_manageable': False,
-                    'volume_adequate': False,
-                    'risk_reward_favorable': False,
-                    'overall_favorable': False
-                }
+            if data.empty or len(data) < self.strategy.min_bars:
+                return unfavorable
             
-            indicators = ConservativeIndicators.calculate_all_indicators(data)
-            
-            conditions = {
-                'trend_clear': self.check_trend_clarity(data, indicators),
-                'volatility_manageable': self.check_volatility(data, indicators),
-                'volume_adequate': self.check_volume(data),
-                'risk_reward_favorable': self.check_risk_reward_potential(data, indicators)
-            }
+            values = self._latest_values(data)
+            conditions = {name: bool(condition.evaluate(values)) for name, condition in MARKET_CONDITIONS.items()}
+            gate = self.strategy.gate
+            conditions['overall_favorable'] = bool(gate.evaluate(values)) if gate is not None else True
             
-            # Overall favorable if at least 3 of 4 conditions met
-            conditions['overall_favorable'] = sum(conditions.values()) >= 3
-            
-            logger.debug(f"Market conditions analyzed: {conditions}")
+            logger.debug("Market conditions analyzed: %s", conditions)
             return conditions
             
         except Exception as e:
-            logger.error(f"Error analyzing market conditions: {e}")
-            return {
-                'trend_clear': False,
-                'volatility_manageable': False,
-                'volume_adequate': False,
-                'risk_reward_favorable': False,
-                'overall_favorable': False
-            }
-    
-    def check_trend_clarity(self, data, indicators):
-        """Check if trend is clear and strong"""
-        try:
-            if not indicators or 'ma_20' not in indicators:
-                return False
-                
-            current_price = data['close'].iloc[-1]
-            ma_20 = indicators['ma_20'].iloc[-1]
-            ma_50 = indicators['ma_50'].iloc[-1]
-            
-            # Trend is clear if:
-            # 1. Price is clearly above/below both MAs
-            # 2. MA20 is clearly above/below MA50
-            price_ma20_diff = abs(current_price - ma_20) / current_price
-            ma20_ma50_diff = abs(ma_20 - ma_50) / ma_20
-            
-            return price_ma20_diff > 0.02 and ma20_ma50_diff > 0.01  # 2% and 1% thresholds
-            
-        except Exception as e:
-            logger.error(f"Error checking trend clarity: {e}")
-            return False
-    
-    def check_volatility(self, data, indicators):
-        """Check if volatility is manageable"""
-        try:
-            if not indicators or 'atr' not in indicators:
-                return False
-                
-            current_price = data['close'].iloc[-1]
-            current_atr = indicators['atr'].iloc[-1]
-            avg_atr = indicators['atr'].tail(20).mean()
-            
-            # Volatility is manageable if current ATR is not excessive
-            atr_percent = (current_atr / current_price) * 100
-            volatility_increase = current_atr / avg_atr if avg_atr > 0 else 1
-            
-            return atr_percent < 5 and volatility_increase < 2  # Less than 5% ATR and not doubled
-            
-        except Exception as e:
-            logger.error(f"Error checking volatility: {e}")
-            return False
-    
-    def check_volume(self, data):
-        """Check if volume is adequate"""
-        try:
-            if 'volume' not in data.columns or len(data) < 20:
-                return True  # Assume adequate if no volume data
-                
-            current_volume = data['volume'].iloc[-1]
-            avg_volume = data['volume'].tail(20).mean()
-            
-            # Volume is adequate if current volume is at least 50% of average
-            return current_volume >= avg_volume * 0.5
-            
-        except Exception as e:
-            logger.error(f"Error checking volume: {e}")
-            return True
-    
-    def check_risk_reward_potential(self, data, indicators):
-        """Check if risk-reward potential is favorable"""
-        try:
-            if not indicators or 'bb_upper' not in indicators:
-                return False
-                
-            current_price = data['close'].iloc[-1]
-            bb_upper = indicators['bb_upper'].iloc[-1]
-            bb_lower = indicators['bb_lower'].iloc[-1]
-            
-            # Check if price is not at extremes of Bollinger Bands
-            bb_width = bb_upper - bb_lower
-            distance_to_upper = abs(current_price - bb_upper)
-            distance_to_lower = abs(current_price - bb_lower)
-            
-            # Favorable if not too close to either band (within 20% of band width)
-            return distance_to_upper > bb_width * 0.2 and distance_to_lower > bb_width * 0.2
-            
-        except Exception as e:
-            logger.error(f"Error checking risk-reward potential: {e}")
-            return False
+            logger.error("Error analyzing market conditions: %s", e)
+            return unfavorable
     
+    @SIGNAL_SECONDS.time()
     def generate_conservative_signal(self, symbol, data):
         """
         Generate conservative trading signal for a symbol
@@ -150,102 +65,47 @@ class ConservativeSignals:
             dict: Trading signal or None if no signal
         """
         try:
-            if data.empty or len(data) < 50:
-                logger.warning(f"Insufficient data for {symbol}")
+            if data.empty or len(data) < self.strategy.min_bars:
+                logger.warning("Insufficient data for %s", symbol)
                 return None
                 
-            # Analyze market conditions first
-            conditions = self.analyze_market_conditions(data)
-            if not conditions['overall_favorable']:
-                logger.debug(f"Market conditions not favorable for {symbol}")
+            # Market-conditions gate and entry rules, as backtested (see strategy.py)
+            values = self._latest_values(data)
+            decision = self.strategy.evaluate_bar(values)
+            if decision is None:
+                logger.debug("No signal for %s", symbol)
                 return None
                 
-            indicators = ConservativeIndicators.calculate_all_indicators(data)
-            if not indicators:
-                logger.warning(f"Could not calculate indicators for {symbol}")
-                return None
-                
-            # Generate signal based on multiple confirmations
-            signal = self._analyze_entry_signals(symbol, data, indicators)
-            
-            if signal and signal['confidence'] >= self.min_confidence:
-                logger.info(f"Conservative signal generated for {symbol}: {signal['direction']} "
-                           f"confidence: {signal['confidence']}%")
+            signal = self._build_signal(symbol, values, decision)
+            if signal['confidence'] >= self.min_confidence:
+                logger.info("Conservative signal generated for %s: %s confidence: %s%%",
+                            symbol, signal['direction'], signal['confidence'])
                 return signal
                 
             return None
             
         except Exception as e:
-            logger.error(f"Error generating signal for {symbol}: {e}")
+            logger.error("Error generating signal for %s: %s", symbol, e)
             return None
     
-    def _analyze_entry_signals(self, symbol, data, indicators):
-        """Analyze entry signals using multiple indicators"""
-        try:
-            current_price = data['close'].iloc[-1]
-            rsi = indicators['rsi'].iloc[-1]
-            macd = indicators['macd'].iloc[-1]
-            macd_signal = indicators['macd_signal'].iloc[-1]
-            ma_20 = indicators['ma_20'].iloc[-1]
-            ma_50 = indicators['ma_50'].iloc[-1]
-            bb_upper = indicators['bb_upper'].iloc[-1]
-            bb_lower = indicators['bb_lower'].iloc[-1]
-            atr = indicators['atr'].iloc[-1]
-            
-            signals = []
-            
-            # Long signal conditions
-            long_conditions = [
-                current_price > ma_20 > ma_50,  # Uptrend
-                rsi > 40 and rsi < 70,  # Not oversold or overbought
-                macd > macd_signal,  # MACD bullish
-                current_price > bb_lower + (bb_upper - bb_lower) * 0.3  # Not near lower band
-            ]
-            
-            # Short signal conditions  
-            short_conditions = [
-                current_price < ma_20 < ma_50,  # Downtrend
-                rsi < 60 and rsi > 30,  # Not overbought or oversold
-                macd < macd_signal,  # MACD bearish
-                current_price < bb_upper - (bb_upper - bb_lower) * 0.3  # Not near upper band
-            ]
-            
-            long_score = sum(long_conditions)
-            short_score = sum(short_conditions)
-            
-            direction = None
-            confidence = 0
-            
-            if long_score >= 3:  # At least 3 of 4 conditions
-                direction = 'long'
-                confidence = 70 + (long_score * 5)  # 75-90% based on conditions met
-            elif short_score >= 3:
-                direction = 'short'
-                confidence = 70 + (short_score * 5)
-                
-            if direction:
-                # Calculate stop loss and take profit
-                stop_loss = self.risk_manager.calculate_stop_loss(current_price, direction, atr)
-                risk_distance = abs(current_price - stop_loss)
-                take_profit = current_price + (risk_distance * self.min_risk_reward) if direction == 'long' else current_price - (risk_distance * self.min_risk_reward)
-                
-                return {
-                    'symbol': symbol,
-                    'direction': direction,
-                    'confidence': min(confidence, 95),  # Cap at 95%
-                    'entry_price': current_price,
-                    'stop_loss': stop_loss,
-                    'take_profit': take_profit,
-                    'suggested_leverage': min(3, max(1, int(confidence / 30))),  # 1-3x based on confidence
-                    'risk_reward_ratio': self.min_risk_reward,
-                    'market_conditions': 'favorable'
-                }
-                
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error analyzing entry signals: {e}")
-            return None
+    def _build_signal(self, symbol, values, decision):
+        """Signal dict for a strategy decision, with the strategy's stop and target"""
+        current_price = values['close']
+        direction = decision['direction']
+        confidence = decision['confidence']  # 85-90% based on conditions met
+        stop_loss, take_profit = self.strategy.stops.levels(current_price, direction, values)
+        
+        return {
+            'symbol': symbol,
+            'direction': direction,
+            'confidence': confidence,
+            'entry_price': current_price,
+            'stop_loss': stop_loss,
+            'take_profit': take_profit,
+            'suggested_leverage': min(3, max(1, int(confidence / 30))),  # 1-3x based on confidence
+            'risk_reward_ratio': self.strategy.stops.risk_reward,
+            'market_conditions': 'favorable'
+        }
     
     def get_conservative_signals(self, symbols=None):
         """
@@ -295,11 +155,11 @@ class ConservativeSignals:
                 if len(signals) >= 2:
                     break
                     
-            logger.info(f"Generated {len(signals)} conservative signals")
+            logger.info("Generated %s conservative signals", len(signals))
             return signals
             
         except Exception as e:
-            logger.error(f"Error getting conservative signals: {e}")
+            logger.error("Error getting conservative signals: %s", e)
             return []
     
     def _generate_sample_data(self, symbol):
@@ -359,5 +219,5 @@ class ConservativeSignals:
             return pd.DataFrame(data)
             
         except Exception as e:
-            logger.error(f"Error generating sample data: {e}")
+            logger.error("Error generating sample data: %s", e)
             return pd.DataFrame()
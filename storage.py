@@ -0,0 +1,504 @@
+"""
+Persistent Time-Series Storage Module
+
+Stores balance history, position snapshots and generated signals so they
+survive restarts. Writes are buffered in memory and flushed in batches by a
+background thread, keeping database I/O off the request path. Every sample
+is also folded into 1m / 1h / 1d rollup tables so dashboard range queries
+read a bounded number of pre-aggregated rows instead of raw samples.
+
+Runs against SQLite (default, and for local testing) or Postgres when
+DATABASE_URL is set.
+"""
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import (
+    Column, Float, Index, Integer, MetaData, String, Table,
+    UniqueConstraint, case, create_engine, select,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+logger = logging.getLogger(__name__)
+
+# Rollup resolutions in seconds: 1 minute, 1 hour, 1 day
+ROLLUP_RESOLUTIONS = (60, 3600, 86400)
+
+# Pseudo-symbol used for account-level (balance) rollups
+ACCOUNT_SYMBOL = '__account__'
+
+metadata = MetaData()
+
+balance_samples = Table(
+    'balance_samples', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('ts', Float, nullable=False),
+    Column('total_balance', Float, nullable=False),
+    Column('daily_pnl', Float, nullable=False, default=0.0),
+    Column('daily_pnl_percent', Float, nullable=False, default=0.0),
+    Column('total_risk_percent', Float, nullable=False, default=0.0),
+    Column('active_positions', Integer, nullable=False, default=0),
+    Index('ix_balance_samples_ts', 'ts'),
+)
+
+position_samples = Table(
+    'position_samples', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('ts', Float, nullable=False),
+    Column('symbol', String(32), nullable=False),
+    Column('direction', String(8), nullable=False),
+    Column('size', Float, nullable=False, default=0.0),
+    Column('entry_price', Float, nullable=False, default=0.0),
+    Column('current_price', Float, nullable=False, default=0.0),
+    Column('unrealized_pnl', Float, nullable=False, default=0.0),
+    Column('margin', Float, nullable=False, default=0.0),
+    Index('ix_position_samples_symbol_ts', 'symbol', 'ts'),
+)
+
+signal_records = Table(
+    'signal_records', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('ts', Float, nullable=False),
+    Column('symbol', String(32), nullable=False),
+    Column('direction', String(8), nullable=False),
+    Column('confidence', Float, nullable=False, default=0.0),
+    Column('entry_price', Float),
+    Column('stop_loss', Float),
+    Column('take_profit', Float),
+    Column('risk_reward_ratio', Float),
+    Index('ix_signal_records_symbol_ts', 'symbol', 'ts'),
+)
+
+# One row per (resolution, symbol, bucket). For the account pseudo-symbol the
+# OHLC columns track total balance; for real symbols they track unrealized PnL.
+rollups = Table(
+    'rollups', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('resolution', Integer, nullable=False),
+    Column('symbol', String(32), nullable=False),
+    Column('bucket', Float, nullable=False),
+    Column('open', Float, nullable=False),
+    Column('high', Float, nullable=False),
+    Column('low', Float, nullable=False),
+    Column('close', Float, nullable=False),
+    Column('first_ts', Float, nullable=False),
+    Column('last_ts', Float, nullable=False),
+    Column('samples', Integer, nullable=False),
+    # Also the index for range queries by (resolution, symbol, bucket)
+    UniqueConstraint('resolution', 'symbol', 'bucket', name='uq_rollups_key'),
+)
+
+
+def normalize_database_url(url: Optional[str]) -> str:
+    """
+    Normalize a database URL for SQLAlchemy.
+
+    Args:
+        url: Database URL, e.g. from the DATABASE_URL environment variable
+
+    Returns:
+        str: URL usable by create_engine (defaults to a local SQLite file)
+    """
+    if not url:
+        return 'sqlite:///bitunix.db'
+    # Hosted Postgres providers still hand out the legacy scheme
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+class TimeSeriesStore:
+    """
+    Buffered time-series store for balances, positions and signals.
+
+    record_* methods only enqueue rows and return immediately; a background
+    writer thread flushes them in batches, every flush_interval seconds or
+    as soon as batch_size rows are pending. A batch whose transaction fails
+    is held and retried with the next flush; it is dropped only after
+    max_flush_attempts consecutive failures.
+    """
+
+    def __init__(self, database_url: Optional[str] = None, batch_size: int = 500,
+                 flush_interval: float = 2.0, max_flush_attempts: int = 5):
+        self.database_url = normalize_database_url(database_url)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_flush_attempts = max_flush_attempts
+
+        self.engine = create_engine(self.database_url, future=True)
+        metadata.create_all(self.engine)
+
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._held = None  # Batch from failed flushes, written before newer rows
+        self._failed_flushes = 0
+        self._writer = None
+
+        logger.info("Time-series store initialized (%s)", self.engine.dialect.name)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._writer and self._writer.is_alive():
+            return
+        self._stop_event.clear()
+        self._writer = threading.Thread(target=self._run_writer, name='timeseries-writer', daemon=True)
+        self._writer.start()
+
+    def stop(self):
+        """Stop the writer thread and flush any pending rows"""
+        self._stop_event.set()
+        if self._writer:
+            self._writer.join(timeout=self.flush_interval + 5)
+            self._writer = None
+        self.flush()
+
+    def _run_writer(self):
+        while not self._stop_event.is_set():
+            deadline = time.monotonic() + self.flush_interval
+            while self._queue.qsize() < self.batch_size and time.monotonic() < deadline:
+                if self._stop_event.wait(0.05):
+                    break
+            self.flush()
+
+    # ------------------------------------------------------------------
+    # Recording (called from the request / scheduler path)
+    # ------------------------------------------------------------------
+
+    def record_balance(self, portfolio_data: Dict, ts: Optional[float] = None):
+        """
+        Queue an account balance sample
+
+        Args:
+            portfolio_data: Dict with total_balance, daily_pnl, daily_pnl_percent,
+                total_risk_percent and active_positions
+            ts: Sample time as epoch seconds (defaults to now)
+        """
+        self._queue.put(('balance', {
+            'ts': ts if ts is not None else time.time(),
+            'total_balance': float(portfolio_data.get('total_balance', 0) or 0),
+            'daily_pnl': float(portfolio_data.get('daily_pnl', 0) or 0),
+            'daily_pnl_percent': float(portfolio_data.get('daily_pnl_percent', 0) or 0),
+            'total_risk_percent': float(portfolio_data.get('total_risk_percent', 0) or 0),
+            'active_positions': int(portfolio_data.get('active_positions', 0) or 0),
+        }))
+
+    def record_positions(self, positions: List[Dict], ts: Optional[float] = None):
+        """
+        Queue a snapshot of open positions
+
+        Args:
+            positions: Position dicts as built by APIClient.get_positions
+            ts: Snapshot time as epoch seconds (defaults to now)
+        """
+        ts = ts if ts is not None else time.time()
+        for position in positions:
+            self._queue.put(('position', {
+                'ts': ts,
+                'symbol': position.get('symbol', 'unknown'),
+                'direction': position.get('direction', 'long'),
+                'size': float(position.get('size', 0) or 0),
+                'entry_price': float(position.get('entry_price', 0) or 0),
+                'current_price': float(position.get('current_price', position.get('entry_price', 0)) or 0),
+                'unrealized_pnl': float(position.get('unrealized_pnl', 0) or 0),
+                'margin': float(position.get('margin', 0) or 0),
+            }))
+
+    def record_signals(self, signals: List[Dict], ts: Optional[float] = None):
+        """
+        Queue generated trading signals
+
+        Args:
+            signals: Signal dicts as produced by the signal generator
+            ts: Generation time as epoch seconds (defaults to now)
+        """
+        ts = ts if ts is not None else time.time()
+        for signal in signals:
+            self._queue.put(('signal', {
+                'ts': ts,
+                'symbol': signal.get('symbol', 'unknown'),
+                'direction': signal.get('direction', 'long'),
+                'confidence': float(signal.get('confidence', 0) or 0),
+                'entry_price': signal.get('entry_price'),
+                'stop_loss': signal.get('stop_loss'),
+                'take_profit': signal.get('take_profit'),
+                'risk_reward_ratio': signal.get('risk_reward_ratio'),
+            }))
+
+    def pending(self) -> int:
+        """Number of rows waiting to be flushed (including rows held after a failed flush)"""
+        held = self._held
+        return self._queue.qsize() + (sum(len(rows) for rows in held.values()) if held else 0)
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def flush(self) -> int:
+        """
+        Write all queued rows (after any held from failed flushes) in one transaction
+
+        Returns:
+            int: Number of raw rows written
+        """
+        with self._flush_lock:
+            batch = self._held or {'balance': [], 'position': [], 'signal': []}
+            self._held = None
+            try:
+                while True:
+                    kind, row = self._queue.get_nowait()
+                    batch[kind].append(row)
+            except queue.Empty:
+                pass
+
+            written = sum(len(rows) for rows in batch.values())
+            if not written:
+                return 0
+
+            try:
+                with self.engine.begin() as conn:
+                    if batch['balance']:
+                        conn.execute(balance_samples.insert(), batch['balance'])
+                    if batch['position']:
+                        conn.execute(position_samples.insert(), batch['position'])
+                    if batch['signal']:
+                        conn.execute(signal_records.insert(), batch['signal'])
+
+                    rollup_rows = self._build_rollups(batch['balance'], batch['position'])
+                    if rollup_rows:
+                        self._upsert_rollups(conn, rollup_rows)
+
+                self._failed_flushes = 0
+                logger.debug("Flushed %s time-series rows", written)
+                return written
+
+            except Exception as e:
+                # The transaction rolled back, so the whole batch can be retried as is
+                self._failed_flushes += 1
+                if self._failed_flushes >= self.max_flush_attempts:
+                    logger.error("Dropping %s time-series rows after %s failed flushes: %s",
+                                 written, self._failed_flushes, e)
+                    self._failed_flushes = 0
+                else:
+                    self._held = batch
+                    logger.warning("Error flushing %s time-series rows (attempt %s of %s, will retry): %s",
+                                   written, self._failed_flushes, self.max_flush_attempts, e)
+                return 0
+
+    def _build_rollups(self, balance_rows: List[Dict], position_rows: List[Dict]) -> List[Dict]:
+        """Aggregate a batch into one OHLC row per (resolution, symbol, bucket)"""
+        points = [(ACCOUNT_SYMBOL, row['ts'], row['total_balance']) for row in balance_rows]
+        points.extend((row['symbol'], row['ts'], row['unrealized_pnl']) for row in position_rows)
+        points.sort(key=lambda point: point[1])
+
+        aggregated = {}
+        for symbol, ts, value in points:
+            for resolution in ROLLUP_RESOLUTIONS:
+                bucket = float(int(ts // resolution) * resolution)
+                key = (resolution, symbol, bucket)
+                row = aggregated.get(key)
+                if row is None:
+                    aggregated[key] = {
+                        'resolution': resolution, 'symbol': symbol, 'bucket': bucket,
+                        'open': value, 'high': value, 'low': value, 'close': value,
+                        'first_ts': ts, 'last_ts': ts, 'samples': 1,
+                    }
+                else:
+                    row['high'] = max(row['high'], value)
+                    row['low'] = min(row['low'], value)
+                    row['close'] = value
+                    row['last_ts'] = ts
+                    row['samples'] += 1
+
+        return list(aggregated.values())
+
+    def _upsert_rollups(self, conn, rows: List[Dict]):
+        """Merge aggregated rows into the rollup table"""
+        insert = pg_insert if self.engine.dialect.name == 'postgresql' else sqlite_insert
+        stmt = insert(rollups)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['resolution', 'symbol', 'bucket'],
+            set_={
+                'open': case((excluded.first_ts < rollups.c.first_ts, excluded.open), else_=rollups.c.open),
+                'first_ts': case((excluded.first_ts < rollups.c.first_ts, excluded.first_ts), else_=rollups.c.first_ts),
+                'close': case((excluded.last_ts >= rollups.c.last_ts, excluded.close), else_=rollups.c.close),
+                'last_ts': case((excluded.last_ts >= rollups.c.last_ts, excluded.last_ts), else_=rollups.c.last_ts),
+                'high': case((excluded.high > rollups.c.high, excluded.high), else_=rollups.c.high),
+                'low': case((excluded.low < rollups.c.low, excluded.low), else_=rollups.c.low),
+                'samples': rollups.c.samples + excluded.samples,
+            }
+        )
+        conn.execute(stmt, rows)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def pick_resolution(start: float, end: float, max_points: int = 500) -> int:
+        """
+        Pick the finest rollup resolution that keeps a range under max_points
+
+        Args:
+            start: Range start as epoch seconds
+            end: Range end as epoch seconds
+            max_points: Maximum number of buckets wanted
+
+        Returns:
+            int: Resolution in seconds
+        """
+        span = max(end - start, 0)
+        for resolution in ROLLUP_RESOLUTIONS:
+            if span / resolution <= max_points:
+                return resolution
+        return ROLLUP_RESOLUTIONS[-1]
+
+    def get_rollups(self, symbol: str, start: float, end: Optional[float] = None,
+                    resolution: Optional[int] = None, max_points: int = 500) -> List[Dict]:
+        """
+        Read downsampled OHLC history for a symbol (or the account balance)
+
+        Args:
+            symbol: Trading symbol, or ACCOUNT_SYMBOL for total balance
+            start: Range start as epoch seconds
+            end: Range end as epoch seconds (defaults to now)
+            resolution: Bucket size in seconds; picked automatically if omitted
+            max_points: Used to pick the resolution automatically
+
+        Returns:
+            list: Rollup rows ordered by bucket
+        """
+        end = end if end is not None else time.time()
+        if resolution is None:
+            resolution = self.pick_resolution(start, end, max_points)
+
+        query = (
+            select(rollups.c.bucket, rollups.c.open, rollups.c.high, rollups.c.low,
+                   rollups.c.close, rollups.c.samples)
+            .where(rollups.c.resolution == resolution)
+            .where(rollups.c.symbol == symbol)
+            .where(rollups.c.bucket >= (start // resolution) * resolution)
+            .where(rollups.c.bucket <= end)
+            .order_by(rollups.c.bucket)
+        )
+
+        try:
+            with self.engine.connect() as conn:
+                return [
+                    {
+                        'timestamp': _isoformat(row.bucket),
+                        'resolution': resolution,
+                        'open': row.open,
+                        'high': row.high,
+                        'low': row.low,
+                        'close': row.close,
+                        'samples': row.samples,
+                    }
+                    for row in conn.execute(query)
+                ]
+        except Exception as e:
+            logger.error("Error reading rollups for %s: %s", symbol, e)
+            return []
+
+    def get_balance_history(self, start: float, end: Optional[float] = None,
+                            resolution: Optional[int] = None, max_points: int = 500) -> List[Dict]:
+        """Read downsampled account balance history"""
+        return self.get_rollups(ACCOUNT_SYMBOL, start, end, resolution, max_points)
+
+    def get_position_history(self, symbol: str, start: float, end: Optional[float] = None,
+                             limit: int = 1000) -> List[Dict]:
+        """
+        Read raw position snapshots for a symbol
+
+        Args:
+            symbol: Trading symbol
+            start: Range start as epoch seconds
+            end: Range end as epoch seconds (defaults to now)
+            limit: Maximum rows returned (most recent first)
+
+        Returns:
+            list: Position snapshot dicts
+        """
+        end = end if end is not None else time.time()
+        query = (
+            select(position_samples)
+            .where(position_samples.c.symbol == symbol)
+            .where(position_samples.c.ts >= start)
+            .where(position_samples.c.ts <= end)
+            .order_by(position_samples.c.ts.desc())
+            .limit(limit)
+        )
+
+        try:
+            with self.engine.connect() as conn:
+                return [_row_to_dict(row) for row in conn.execute(query)]
+        except Exception as e:
+            logger.error("Error reading position history for %s: %s", symbol, e)
+            return []
+
+    def get_recent_signals(self, since: float, symbol: Optional[str] = None,
+                           limit: int = 200) -> List[Dict]:
+        """
+        Read recently generated signals
+
+        Args:
+            since: Earliest signal time as epoch seconds
+            symbol: Optional symbol filter
+            limit: Maximum rows returned (most recent first)
+
+        Returns:
+            list: Signal dicts
+        """
+        query = select(signal_records).where(signal_records.c.ts >= since)
+        if symbol:
+            query = query.where(signal_records.c.symbol == symbol)
+        query = query.order_by(signal_records.c.ts.desc()).limit(limit)
+
+        try:
+            with self.engine.connect() as conn:
+                return [_row_to_dict(row) for row in conn.execute(query)]
+        except Exception as e:
+            logger.error("Error reading signals: %s", e)
+            return []
+
+    def prune_raw(self, older_than: float) -> int:
+        """
+        Delete raw samples older than a cutoff; rollups are kept
+
+        Args:
+            older_than: Cutoff as epoch seconds
+
+        Returns:
+            int: Number of rows deleted
+        """
+        try:
+            with self.engine.begin() as conn:
+                deleted = 0
+                for table in (balance_samples, position_samples):
+                    deleted += conn.execute(table.delete().where(table.c.ts < older_than)).rowcount
+                return deleted
+        except Exception as e:
+            logger.error("Error pruning raw samples: %s", e)
+            return 0
+
+
+def _isoformat(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def _row_to_dict(row) -> Dict:
+    data = dict(row._mapping)
+    data.pop('id', None)
+    data['timestamp'] = _isoformat(data.pop('ts'))
+    return data
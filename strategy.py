@@ -0,0 +1,462 @@
+"""
+Declarative Strategy Module
+
+A Strategy is an ordered list of entry rules. Each rule is a boolean
+expression over named indicator columns and thresholds, plus a confidence
+expression, built from plain Python operators:
+
+    close, rsi, bb_lower = Col('close'), Col('rsi'), Col('bb_lower')
+    Rule('long', (rsi < 35) & (close <= bb_lower * 1.02),
+         confidence=Min(0.8, (35 - rsi) / 35 + 0.5), reason='oversold_near_support')
+
+The same expression tree is evaluated two ways, with the same NumPy
+operations, so live and backtest decisions are identical:
+
+- Strategy.evaluate_bar(values): one bar's scalars (live signals)
+- Strategy.evaluate(columns): whole (time x symbol) arrays at once
+  (backtests), giving direction and confidence for every bar
+
+Rules are tried in order and the first one that holds decides the bar.
+A strategy also carries everything else that decides a trade, so live
+signals and backtests cannot drift apart:
+
+- gate: an expression that must hold before any rule is tried (market
+  conditions)
+- min_bars: bars of history needed before the strategy may signal
+- stops: how stop-loss and take-profit levels are set from the entry
+
+Columns are computed by compute_indicators() from the INDICATORS registry,
+which wraps the ConservativeIndicators functions used live.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from indicators import ConservativeIndicators
+
+logger = logging.getLogger(__name__)
+
+LONG, SHORT, FLAT = 1, -1, 0
+DIRECTIONS = {'long': LONG, 'short': SHORT}
+
+
+class Expr:
+    """Expression node over named columns; operators build new nodes"""
+
+    def evaluate(self, columns: Mapping):
+        raise NotImplementedError
+
+    def columns(self) -> Set[str]:
+        return set()
+
+    def __add__(self, other): return BinOp(np.add, self, other)
+    def __radd__(self, other): return BinOp(np.add, other, self)
+    def __sub__(self, other): return BinOp(np.subtract, self, other)
+    def __rsub__(self, other): return BinOp(np.subtract, other, self)
+    def __mul__(self, other): return BinOp(np.multiply, self, other)
+    def __rmul__(self, other): return BinOp(np.multiply, other, self)
+    def __truediv__(self, other): return BinOp(np.divide, self, other)
+    def __rtruediv__(self, other): return BinOp(np.divide, other, self)
+    def __lt__(self, other): return BinOp(np.less, self, other)
+    def __le__(self, other): return BinOp(np.less_equal, self, other)
+    def __gt__(self, other): return BinOp(np.greater, self, other)
+    def __ge__(self, other): return BinOp(np.greater_equal, self, other)
+    def __and__(self, other): return BinOp(np.logical_and, self, other)
+    def __rand__(self, other): return BinOp(np.logical_and, other, self)
+    def __or__(self, other): return BinOp(np.logical_or, self, other)
+    def __ror__(self, other): return BinOp(np.logical_or, other, self)
+    def __invert__(self): return Func(np.logical_not, self)
+
+
+def _node(value) -> Expr:
+    return value if isinstance(value, Expr) else Const(value)
+
+
+class Col(Expr):
+    """A named column (indicator or OHLCV field)"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def evaluate(self, columns):
+        return columns[self.name]
+
+    def columns(self):
+        return {self.name}
+
+    def __repr__(self):
+        return self.name
+
+
+class Const(Expr):
+    def __init__(self, value):
+        self.value = value
+
+    def evaluate(self, columns):
+        return self.value
+
+    def __repr__(self):
+        return repr(self.value)
+
+
+class BinOp(Expr):
+    def __init__(self, op: Callable, left, right):
+        self.op = op
+        self.left = _node(left)
+        self.right = _node(right)
+
+    def evaluate(self, columns):
+        return self.op(self.left.evaluate(columns), self.right.evaluate(columns))
+
+    def columns(self):
+        return self.left.columns() | self.right.columns()
+
+    def __repr__(self):
+        return f"{self.op.__name__}({self.left!r}, {self.right!r})"
+
+
+class Func(Expr):
+    """A NumPy ufunc applied element-wise to argument expressions"""
+
+    def __init__(self, op: Callable, *args):
+        self.op = op
+        self.args = [_node(arg) for arg in args]
+
+    def evaluate(self, columns):
+        return self.op(*(arg.evaluate(columns) for arg in self.args))
+
+    def columns(self):
+        return set().union(*(arg.columns() for arg in self.args))
+
+    def __repr__(self):
+        return f"{self.op.__name__}({', '.join(map(repr, self.args))})"
+
+
+class Count(Expr):
+    """Number of the given boolean expressions that hold"""
+
+    def __init__(self, *conditions):
+        self.conditions = [_node(condition) for condition in conditions]
+
+    def evaluate(self, columns):
+        total = 0
+        for condition in self.conditions:
+            total = np.add(total, condition.evaluate(columns), dtype=np.int64)
+        return total
+
+    def columns(self):
+        return set().union(*(condition.columns() for condition in self.conditions))
+
+    def __repr__(self):
+        return f"Count({', '.join(map(repr, self.conditions))})"
+
+
+def Min(*args) -> Expr:
+    """Element-wise minimum (NaN-propagating, like np.minimum)"""
+    expr = _node(args[0])
+    for arg in args[1:]:
+        expr = Func(np.minimum, expr, arg)
+    return expr
+
+
+def Max(*args) -> Expr:
+    """Element-wise maximum (NaN-propagating, like np.maximum)"""
+    expr = _node(args[0])
+    for arg in args[1:]:
+        expr = Func(np.maximum, expr, arg)
+    return expr
+
+
+def Abs(arg) -> Expr:
+    """Element-wise absolute value"""
+    return Func(np.absolute, arg)
+
+
+@dataclass(frozen=True)
+class Rule:
+    """Enter in direction when condition holds, with the given confidence"""
+
+    direction: str  # 'long' or 'short'
+    when: Expr
+    confidence: Expr
+    reason: str = ''
+
+    def __post_init__(self):
+        if self.direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction {self.direction!r}")
+        object.__setattr__(self, 'confidence', _node(self.confidence))
+
+
+class Signals(NamedTuple):
+    """Vectorized evaluation result (arrays shaped like the input columns)"""
+    direction: np.ndarray  # LONG / SHORT / FLAT
+    confidence: np.ndarray  # NaN where FLAT
+    rule: np.ndarray  # Index of the deciding rule, -1 where FLAT
+
+
+@dataclass(frozen=True)
+class PercentStops:
+    """Stop-loss and take-profit a fixed fraction away from the entry"""
+
+    stop_loss_pct: float = 0.015
+    take_profit_pct: float = 0.03
+
+    def columns(self) -> Set[str]:
+        return set()
+
+    @property
+    def risk_reward(self) -> float:
+        return self.take_profit_pct / self.stop_loss_pct
+
+    def levels(self, entry: float, direction: str, values: Mapping[str, float]) -> Tuple[float, float]:
+        """(stop, target) for an entry"""
+        if direction == 'long':
+            return entry * (1 - self.stop_loss_pct), entry * (1 + self.take_profit_pct)
+        return entry * (1 + self.stop_loss_pct), entry * (1 - self.take_profit_pct)
+
+
+@dataclass(frozen=True)
+class AtrStops:
+    """
+    Stop-loss atr_multiplier x ATR from the entry, at most max_stop_pct away
+    (fallback_stop_pct without a usable ATR); take-profit reward_ratio times
+    the stop distance on the other side
+    """
+
+    atr_multiplier: float = 2.0
+    max_stop_pct: float = 0.05
+    fallback_stop_pct: float = 0.02
+    reward_ratio: float = 2.0
+
+    def columns(self) -> Set[str]:
+        return {'atr'}
+
+    @property
+    def risk_reward(self) -> float:
+        return self.reward_ratio
+
+    def levels(self, entry: float, direction: str, values: Mapping[str, float]) -> Tuple[float, float]:
+        """(stop, target) for an entry, given the bar's atr"""
+        atr = values['atr']
+        if direction == 'long':
+            if atr > 0 and entry > 0:
+                stop = max(entry - self.atr_multiplier * atr, entry - entry * self.max_stop_pct)
+            else:
+                stop = entry * (1 - self.fallback_stop_pct)
+            return stop, entry + abs(entry - stop) * self.reward_ratio
+        if atr > 0 and entry > 0:
+            stop = min(entry + self.atr_multiplier * atr, entry + entry * self.max_stop_pct)
+        else:
+            stop = entry * (1 + self.fallback_stop_pct)
+        return stop, entry - abs(entry - stop) * self.reward_ratio
+
+
+class Strategy:
+    """Ordered entry rules over indicator columns, with their gate, warm-up and exits"""
+
+    def __init__(self, name: str, rules: Sequence[Rule], description: str = '', confidence_scale: float = 1.0,
+                 gate: Optional[Expr] = None, min_bars: int = 1, stops=PercentStops()):
+        """
+        Args:
+            name: Registry / report name
+            rules: Entry rules, tried in order
+            description: One-line summary
+            confidence_scale: Confidence of a certain signal (1.0, or 100 for percentages)
+            gate: Condition that must hold for any rule to fire (None: always open)
+            min_bars: Bars of history, including the current one, before a signal is allowed
+            stops: Stop / target rule (PercentStops or AtrStops)
+        """
+        self.name = name
+        self.rules = list(rules)
+        self.description = description
+        self.confidence_scale = confidence_scale
+        self.gate = gate
+        self.min_bars = min_bars
+        self.stops = stops
+
+    def required_columns(self) -> Set[str]:
+        """Every column referenced by the rules, the gate and the stops"""
+        columns = set().union(*(rule.when.columns() | rule.confidence.columns() for rule in self.rules))
+        if self.gate is not None:
+            columns |= self.gate.columns()
+        return columns | self.stops.columns()
+
+    def evaluate_bar(self, values: Mapping[str, float]) -> Optional[Dict]:
+        """
+        Decide one bar
+
+        Args:
+            values: column name -> value at this bar
+
+        Returns:
+            dict with direction, confidence and reason of the first rule that holds, or None
+        """
+        if self.gate is not None and not self.gate.evaluate(values):
+            return None
+        for rule in self.rules:
+            if rule.when.evaluate(values):
+                return {
+                    'direction': rule.direction,
+                    'confidence': float(rule.confidence.evaluate(values)),
+                    'reason': rule.reason,
+                }
+        return None
+
+    def evaluate(self, columns: Mapping[str, np.ndarray]) -> Signals:
+        """
+        Decide every bar at once
+
+        Args:
+            columns: column name -> array (all the same shape, e.g. time x symbol)
+
+        Returns:
+            Signals
+        """
+        shape = np.shape(next(iter(columns.values())))
+        direction = np.zeros(shape, dtype=np.int8)
+        confidence = np.full(shape, np.nan)
+        rule_index = np.full(shape, -1, dtype=np.int16)
+        undecided = np.ones(shape, dtype=bool)
+        if self.gate is not None:
+            undecided &= np.broadcast_to(self.gate.evaluate(columns), shape)
+        for i, rule in enumerate(self.rules):
+            hit = undecided & np.broadcast_to(rule.when.evaluate(columns), shape)
+            if not hit.any():
+                continue
+            direction[hit] = DIRECTIONS[rule.direction]
+            confidence[hit] = np.broadcast_to(rule.confidence.evaluate(columns), shape)[hit]
+            rule_index[hit] = i
+            undecided &= ~hit
+        return Signals(direction, confidence, rule_index)
+
+    def fingerprint(self) -> str:
+        """SHA-256 of the rule definitions (expression reprs are deterministic), for cache keys"""
+        spec = repr((self.rules, self.confidence_scale, self.gate, self.min_bars, self.stops))
+        return hashlib.sha256(spec.encode('utf-8')).hexdigest()
+
+    def __repr__(self):
+        return f"Strategy({self.name!r}, {len(self.rules)} rules)"
+
+
+# Indicator columns: group -> function(OHLCV frame) returning {column: Series}
+def _bollinger(df):
+    return dict(zip(('bb_upper', 'bb_middle', 'bb_lower'), ConservativeIndicators.bollinger_bands(df['close'])))
+
+
+def _macd(df):
+    return dict(zip(('macd', 'macd_signal', 'macd_histogram'), ConservativeIndicators.macd(df['close'])))
+
+
+def _atr(df):
+    atr = ConservativeIndicators.calculate_atr(df['high'], df['low'], df['close'])
+    return {'atr': atr, 'atr_ma_20': atr.rolling(20).mean()}
+
+
+INDICATOR_GROUPS: Dict[str, Callable[[pd.DataFrame], Dict[str, pd.Series]]] = {
+    'atr': _atr,
+    'rsi': lambda df: {'rsi': ConservativeIndicators.rsi(df['close'])},
+    'bollinger': _bollinger,
+    'ma_20': lambda df: {'ma_20': ConservativeIndicators.moving_average(df['close'], 20)},
+    'ma_50': lambda df: {'ma_50': ConservativeIndicators.moving_average(df['close'], 50)},
+    'ema_12': lambda df: {'ema_12': ConservativeIndicators.ema(df['close'], 12)},
+    'ema_26': lambda df: {'ema_26': ConservativeIndicators.ema(df['close'], 26)},
+    'macd': _macd,
+    'volume_ma_20': lambda df: {'volume_ma_20': df['volume'].rolling(20).mean()},
+}
+INDICATORS = {
+    'atr': 'atr', 'atr_ma_20': 'atr', 'rsi': 'rsi', 'volume_ma_20': 'volume_ma_20',
+    'bb_upper': 'bollinger', 'bb_middle': 'bollinger', 'bb_lower': 'bollinger',
+    'ma_20': 'ma_20', 'ma_50': 'ma_50', 'ema_12': 'ema_12', 'ema_26': 'ema_26',
+    'macd': 'macd', 'macd_signal': 'macd', 'macd_histogram': 'macd',
+}
+# Bars of history a group looks back. Rolling windows are exact; EMAs (ema_*,
+# macd*) depend on all earlier bars, so theirs is where older bars' weight
+# has decayed below ~1e-8 and recomputing over that tail is approximate.
+INDICATOR_LOOKBACK = {
+    'atr': 35, 'rsi': 15, 'bollinger': 20, 'ma_20': 20, 'ma_50': 50,
+    'ema_12': 120, 'ema_26': 260, 'macd': 350, 'volume_ma_20': 20,
+}
+
+
+def indicator_lookback(names: Iterable[str]) -> int:
+    """Longest lookback (bars) of the named indicator columns (0 for plain OHLCV)"""
+    return max((INDICATOR_LOOKBACK[INDICATORS[name]] for name in names if name in INDICATORS), default=0)
+
+
+def compute_indicators(df: pd.DataFrame, names: Iterable[str]) -> pd.DataFrame:
+    """
+    OHLCV frame with the named indicator columns added (each group computed once)
+
+    Names that are already columns of df (e.g. 'close') are left as they are.
+    """
+    names = [name for name in names if name not in df.columns]
+    unknown = [name for name in names if name not in INDICATORS]
+    if unknown:
+        raise ValueError(f"Unknown indicator columns: {unknown}")
+    columns = {}
+    for group in dict.fromkeys(INDICATORS[name] for name in names):
+        computed = INDICATOR_GROUPS[group](df)
+        columns.update({name: series for name, series in computed.items() if name in names})
+    return df.assign(**{name: columns[name] for name in names})
+
+
+close, rsi = Col('close'), Col('rsi')
+bb_upper, bb_lower = Col('bb_upper'), Col('bb_lower')
+ma_20, ma_50 = Col('ma_20'), Col('ma_50')
+macd, macd_signal = Col('macd'), Col('macd_signal')
+atr, atr_ma_20 = Col('atr'), Col('atr_ma_20')
+volume, volume_ma_20 = Col('volume'), Col('volume_ma_20')
+
+# Market conditions a live trade needs; the gate wants at least 3 of 4
+_band_width = bb_upper - bb_lower
+MARKET_CONDITIONS = {
+    # Price clearly away from MA20 (2%) and MA20 clearly away from MA50 (1%)
+    'trend_clear': (Abs(close - ma_20) / close > 0.02) & (Abs(ma_20 - ma_50) / ma_20 > 0.01),
+    # ATR under 5% of price and not double its 20-bar average
+    'volatility_manageable': (atr / close * 100 < 5) & ((atr_ma_20 <= 0) | (atr < atr_ma_20 * 2)),
+    # Volume at least half its 20-bar average
+    'volume_adequate': volume >= volume_ma_20 * 0.5,
+    # Price not within 20% of the band width of either Bollinger band
+    'risk_reward_favorable': (Abs(close - bb_upper) > _band_width * 0.2) & (Abs(close - bb_lower) > _band_width * 0.2),
+}
+MARKET_GATE = Count(*MARKET_CONDITIONS.values()) >= 3
+
+# Backtest rules: RSI extreme near a Bollinger band (confidence 0.5-0.8)
+MEAN_REVERSION = Strategy('mean_reversion', [
+    Rule('long', (rsi < 35) & (close <= bb_lower * 1.02),  # Within 2% of lower BB
+         confidence=Min(0.8, (35 - rsi) / 35 + 0.5), reason='oversold_near_support'),
+    Rule('short', (rsi > 65) & (close >= bb_upper * 0.98),  # Within 2% of upper BB
+         confidence=Min(0.8, (rsi - 65) / 35 + 0.5), reason='overbought_near_resistance'),
+], description='Oversold/overbought RSI near the Bollinger bands', min_bars=21,
+    stops=PercentStops(stop_loss_pct=0.015, take_profit_pct=0.03))
+
+# Live rules: at least 3 of 4 trend confirmations (confidence 85-90%) in
+# favourable market conditions, after 50 bars, with 2x ATR stops at 2:1
+_long_conditions = (
+    (close > ma_20) & (ma_20 > ma_50),  # Uptrend
+    (rsi > 40) & (rsi < 70),  # Not oversold or overbought
+    macd > macd_signal,  # MACD bullish
+    close > bb_lower + (bb_upper - bb_lower) * 0.3,  # Not near lower band
+)
+_short_conditions = (
+    (close < ma_20) & (ma_20 < ma_50),  # Downtrend
+    (rsi < 60) & (rsi > 30),  # Not overbought or oversold
+    macd < macd_signal,  # MACD bearish
+    close < bb_upper - (bb_upper - bb_lower) * 0.3,  # Not near upper band
+)
+TREND_CONFIRMATION = Strategy('trend_confirmation', [
+    Rule('long', Count(*_long_conditions) >= 3, confidence=Min(70 + Count(*_long_conditions) * 5, 95),
+         reason='trend_confirmation'),
+    Rule('short', Count(*_short_conditions) >= 3, confidence=Min(70 + Count(*_short_conditions) * 5, 95),
+         reason='trend_confirmation'),
+], description='Trend, RSI, MACD and band position confirmations', confidence_scale=100.0,
+    gate=MARKET_GATE, min_bars=50, stops=AtrStops())
+
+STRATEGIES = {strategy.name: strategy for strategy in (MEAN_REVERSION, TREND_CONFIRMATION)}
+# The strategy the live signal generator trades, and backtests default to
+LIVE_STRATEGY = TREND_CONFIRMATION
@@ -0,0 +1,84 @@
+"""intrabar.first_touch against a bar-by-bar reference"""
+
+import numpy as np
+import pytest
+
+from intrabar import Exit, first_touch
+
+
+def reference(opens, highs, lows, start, direction, stop, target):
+    """One bar at a time: gaps fill at the open, a bar touching both levels stops out"""
+    sign = 1 if direction == 'long' else -1
+    for i in range(start, len(opens)):
+        if np.isnan(opens[i]):
+            continue
+        adverse, favourable = (lows[i], highs[i]) if sign == 1 else (highs[i], lows[i])
+        if sign * (opens[i] - stop) <= 0:
+            return Exit(i, opens[i], 'stop_loss')
+        if sign * (opens[i] - target) >= 0:
+            return Exit(i, opens[i], 'take_profit')
+        if sign * (adverse - stop) <= 0:
+            return Exit(i, stop, 'stop_loss')
+        if sign * (favourable - target) >= 0:
+            return Exit(i, target, 'take_profit')
+    return None
+
+
+def bars(rng, n):
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    opens = np.roll(closes, 1) * np.exp(rng.normal(0, 0.002, n))
+    gaps = rng.random(n) < 0.05
+    opens[gaps] *= np.exp(rng.normal(0, 0.05, gaps.sum()))  # Opens far beyond either level
+    highs = np.maximum(opens, closes) * (1 + rng.exponential(0.004, n))
+    lows = np.minimum(opens, closes) * (1 - rng.exponential(0.004, n))
+    wide = rng.random(n) < 0.03
+    highs[wide] *= 1.08  # Ranges wide enough to touch both levels
+    lows[wide] *= 0.92
+    absent = rng.random(n) < 0.1
+    for column in (opens, highs, lows):
+        column[absent] = np.nan
+    return opens, highs, lows
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_bar_by_bar_reference(seed):
+    rng = np.random.default_rng(seed)
+    opens, highs, lows = bars(rng, 600)
+    reasons = set()
+    for _ in range(300):
+        start = int(rng.integers(0, 600))
+        direction = 'long' if rng.random() < 0.5 else 'short'
+        sign = 1 if direction == 'long' else -1
+        seen = opens[:start + 1][~np.isnan(opens[:start + 1])]
+        entry = float(seen[-1]) if seen.size else 100.0
+        stop = entry * (1 - sign * float(rng.uniform(0.005, 0.05)))
+        target = entry * (1 + sign * float(rng.uniform(0.005, 0.1)))
+        window = int(rng.choice([1, 2, 32]))
+
+        expected = reference(opens, highs, lows, start, direction, stop, target)
+        assert first_touch(opens, highs, lows, start, direction, stop, target, initial_window=window) == expected
+        reasons.add(expected.reason if expected else None)
+    assert {'stop_loss', 'take_profit'} <= reasons
+
+
+@pytest.mark.parametrize('direction, stop, target', [('long', 95.0, 110.0), ('short', 105.0, 90.0)])
+def test_gap_and_ambiguous_bars(direction, stop, target):
+    nan = np.nan
+    sign = 1 if direction == 'long' else -1
+    # Bar 1 absent, bar 2 quiet, bar 3 touches both levels
+    opens = np.array([100.0, nan, 100.0, 100.0])
+    highs = np.array([101.0, nan, 101.0, 112.0])
+    lows = np.array([99.0, nan, 99.0, 88.0])
+    assert first_touch(opens, highs, lows, 1, direction, stop, target) == Exit(3, stop, 'stop_loss')
+
+    # Opening beyond the target (a favourable gap) fills at the open
+    gap = 100.0 + sign * 15.0
+    opens[3], highs[3], lows[3] = gap, max(gap, gap + sign), min(gap, gap + sign)
+    assert first_touch(opens, highs, lows, 1, direction, stop, target) == Exit(3, gap, 'take_profit')
+
+    # Opening beyond the stop fills at the open, even if the bar then reaches the target
+    gap = 100.0 - sign * 8.0
+    opens[3], highs[3], lows[3] = gap, 112.0, 88.0
+    assert first_touch(opens, highs, lows, 1, direction, stop, target) == Exit(3, gap, 'stop_loss')
+
+    assert first_touch(opens, highs, lows, 4, direction, stop, target) is None
@@ -0,0 +1,39 @@
+"""SingleFlightJob outcome and overlap metrics"""
+
+import threading
+
+from job_runner import SingleFlightJob
+from metrics import JOB_IN_PROGRESS, JOB_OVERLAPS, JOB_RUNS
+
+
+def test_failed_run_is_recorded_as_error():
+    def fail():
+        raise RuntimeError("exchange down")
+
+    job = SingleFlightJob('test_failing_job', fail, interval=60)
+    assert job.run() is True
+    assert job.run() is True
+    assert JOB_RUNS.labels('test_failing_job', 'error').value == 2
+    assert JOB_RUNS.labels('test_failing_job', 'success').value == 0
+    assert JOB_IN_PROGRESS.labels('test_failing_job').value == 0
+
+
+def test_overlapping_request_is_counted_once():
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    job = SingleFlightJob('test_slow_job', slow, interval=60)
+    runner = threading.Thread(target=job.run)
+    runner.start()
+    assert started.wait(5)
+
+    assert job.run(wait=False) is False
+    release.set()
+    runner.join(5)
+
+    assert JOB_OVERLAPS.labels('test_slow_job').value == 1
+    assert JOB_RUNS.labels('test_slow_job', 'success').value == 1
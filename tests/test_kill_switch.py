@@ -0,0 +1,95 @@
+"""EmergencyStop liquidation against the mock exchange (tools/mock_exchange.py)"""
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tools'))
+
+from api_client import APIClient  # noqa: E402
+from emergency_stop import EmergencyStop  # noqa: E402
+from mock_exchange import MockExchange, MockExchangeServer  # noqa: E402
+
+SEEDED = [
+    {'symbol': 'BTC/USDT', 'side': 'long', 'quantity': 0.5, 'positionId': 'btc-1'},
+    {'symbol': 'ETH/USDT', 'side': 'short', 'quantity': 2.0, 'positionId': 'eth-1'},
+    {'symbol': 'SOL/USDT', 'side': 'long', 'quantity': 10.0, 'positionId': 'sol-1'},
+]
+
+
+@pytest.fixture
+def server():
+    server = MockExchangeServer(MockExchange(hang_seconds=3.0)).start()
+    server.exchange.seed_positions(SEEDED)
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def kill_switch(server):
+    client = APIClient()
+    client.base_url = server.api_url
+    client.api_key = server.exchange.api_key
+    client.secret_key = server.exchange.secret_key
+    stop = EmergencyStop(client)
+    stop.close_timeout = 0.5
+    stop.close_retries = 2
+    stop.close_backoff = 0.01
+    stop.liquidation_deadline = 5.0
+    return stop
+
+
+def test_activation_closes_every_live_position(server, kill_switch):
+    report = kill_switch.activate_emergency_stop("test")
+
+    assert report['positions'] == 3 and report['closed'] == 3 and report['failed'] == 0
+    assert {outcome['position_id'] for outcome in report['outcomes']} == {'btc-1', 'eth-1', 'sol-1'}
+    assert all(outcome['attempts'] == 1 for outcome in report['outcomes'])
+    assert report['time_to_flat'] is not None
+    assert server.exchange.positions == {}
+    assert server.exchange.stats['closes'] == 3
+
+    # A second activation reports nothing new and sends nothing
+    assert kill_switch.activate_emergency_stop("again") is None
+    assert server.exchange.stats['closes'] == 3
+
+
+def test_refuses_to_liquidate_without_live_positions(server, kill_switch):
+    server.exchange.configure(error_rate=1.0)
+    report = kill_switch.activate_emergency_stop("test")
+
+    assert kill_switch.is_active
+    assert report['error'].startswith("Live positions unavailable")
+    assert report['closed'] == 0 and report['outcomes'] == []
+    assert len(server.exchange.positions) == 3
+    assert server.exchange.stats['closes'] == 0
+
+
+def test_rejected_closes_are_retried(server, kill_switch):
+    positions = kill_switch.api_client.get_live_positions()
+    server.exchange.configure(error_rate=1.0)
+    report = kill_switch.liquidate_positions(positions)
+
+    assert report['closed'] == 0 and report['failed'] == 3
+    assert all(outcome['attempts'] == kill_switch.close_retries + 1 for outcome in report['outcomes'])
+    assert server.exchange.stats['injected_errors'] == 3 * (kill_switch.close_retries + 1)
+    assert report['time_to_flat'] is None
+    assert len(server.exchange.positions) == 3
+
+
+def test_hung_closes_stop_at_the_deadline(server, kill_switch):
+    positions = kill_switch.api_client.get_live_positions()
+    server.exchange.configure(hang_rate=1.0)
+    kill_switch.liquidation_deadline = 1.0
+
+    started = time.perf_counter()
+    report = kill_switch.liquidate_positions(positions)
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < kill_switch.liquidation_deadline + 0.5
+    assert report['closed'] == 0 and report['failed'] == 3
+    assert report['time_to_flat'] is None
+    assert all(outcome['error'] for outcome in report['outcomes'])
+    assert server.exchange.stats['closes'] == 0
@@ -0,0 +1,82 @@
+"""Ledger columns round-trip through every export"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from ledger import TRADE_CATEGORICAL, TRADE_DTYPE, Ledger
+
+
+def trades(count):
+    start = datetime(2026, 1, 1, 12, 30, 15, 250000)
+    return [{
+        'symbol': ['BTC/USDT', 'ETH/USDT', 'DOGE/USDT'][i % 3],
+        'direction': 'long' if i % 2 else 'short',
+        'entry_price': 100.0 + i / 7,
+        'exit_price': 101.0 - i / 11,
+        'size': 0.5 + i,
+        'pnl': (-1) ** i * i / 3,
+        'pnl_pct': i / 13,
+        'entry_time': start + timedelta(hours=i),
+        'exit_time': start + timedelta(hours=i, minutes=45),
+        'reason': ['stop_loss', 'take_profit', 'end_of_test'][i % 3],
+        'confidence': 0.75 + i % 2 * 0.1,
+    } for i in range(count)]
+
+
+def filled(rows, capacity=4):
+    ledger = Ledger(TRADE_DTYPE, TRADE_CATEGORICAL, capacity=capacity)
+    for row in rows:
+        ledger.append(**row)
+    return ledger
+
+
+def test_records_round_trip_through_growth():
+    rows = trades(50)
+    ledger = filled(rows)
+    assert len(ledger) == 50
+    assert ledger.to_records() == rows
+    assert ledger.categories['symbol'] == ['BTC/USDT', 'ETH/USDT', 'DOGE/USDT']
+    assert ledger.decoded('reason').tolist() == [row['reason'] for row in rows]
+
+
+def test_columns_rebuild_the_same_ledger():
+    rows = trades(20)
+    exported = filled(rows).to_columns()
+    assert exported['length'] == 20
+
+    rebuilt = Ledger(TRADE_DTYPE, TRADE_CATEGORICAL, capacity=1)
+    for name, categories in exported['categories'].items():
+        for value in categories:
+            rebuilt.code(name, value)
+    columns = dict(exported['columns'])
+    for name in ('entry_time', 'exit_time'):
+        columns[name] = np.array(columns[name], dtype='datetime64[ms]')
+    rebuilt.extend(**columns)
+    rebuilt.extend(**columns)
+
+    # Millisecond export drops the sub-millisecond part of the timestamps only
+    assert rebuilt.to_records() == filled(rows).to_records() * 2
+    assert rebuilt.to_columns(['symbol', 'pnl']) == {
+        'length': 40,
+        'columns': {'symbol': exported['columns']['symbol'] * 2, 'pnl': exported['columns']['pnl'] * 2},
+        'categories': {'symbol': exported['categories']['symbol']},
+    }
+
+
+def test_clear_resets_rows_and_categories():
+    ledger = filled(trades(5))
+    ledger.clear()
+    assert len(ledger) == 0 and ledger.to_records() == []
+    ledger.append(**trades(3)[2])
+    assert ledger.categories['symbol'] == ['DOGE/USDT'] and ledger.column('symbol').tolist() == [0]
+
+
+def test_arrow_round_trip():
+    pytest.importorskip('pyarrow')
+    rows = trades(12)
+    table = filled(rows).to_arrow()
+    assert table.num_rows == 12
+    for name, values in table.to_pydict().items():
+        assert values == [row[name] for row in rows], name
@@ -0,0 +1,34 @@
+"""DeferredQueueHandler freezes messages whose arguments may be mutated"""
+
+import logging
+import queue
+
+from logging_config import DeferredQueueHandler
+
+
+def enqueue(msg, *args):
+    records = queue.Queue()
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, msg, args, None)
+    DeferredQueueHandler(records).emit(record)
+    return records.get_nowait()
+
+
+def test_scalar_args_are_deferred():
+    record = enqueue("%s at %.2f", 'BTC', 1.5)
+    assert record.args == ('BTC', 1.5)
+    assert record.getMessage() == "BTC at 1.50"
+
+
+def test_mutable_args_are_formatted_at_the_call():
+    position = {'size': 1}
+    record = enqueue("position %s", position)
+    position['size'] = 2
+    assert record.args is None
+    assert record.getMessage() == "position {'size': 1}"
+
+
+def test_mapping_args_are_formatted_at_the_call():
+    values = {'symbol': 'BTC'}
+    record = enqueue("%(symbol)s", values)
+    values['symbol'] = 'ETH'
+    assert record.getMessage() == "BTC"
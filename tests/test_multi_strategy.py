@@ -0,0 +1,48 @@
+"""MultiStrategyBacktest: each strategy trades exactly as it does on its own engine"""
+
+from datetime import datetime
+
+import pytest
+
+from backtesting import BacktestEngine
+from history_store import HistoryStore
+from multi_strategy import MultiStrategyBacktest
+from strategy import LIVE_STRATEGY, MEAN_REVERSION
+
+SYMBOLS = ['BTC/USDT', 'DOGE/USDT', 'UNI/USDT']
+STRATEGIES = {'live': LIVE_STRATEGY, 'mean_reversion': MEAN_REVERSION, 'wide_target': LIVE_STRATEGY}
+PARAMS = {'wide_target': {'reward_ratio': 3.0}}
+
+
+@pytest.fixture(scope='module')
+def history():
+    engine = BacktestEngine(1000.0)
+    return {symbol: engine.generate_historical_data(symbol, days=20, end=datetime(2026, 1, 1)) for symbol in SYMBOLS}
+
+
+def single_run(label, panel):
+    engine = BacktestEngine(1000.0, strategy=STRATEGIES[label])
+    engine.set_params(**PARAMS.get(label, {}))
+    return engine.run_panel(panel), engine.trades.to_records()
+
+
+def test_lockstep_trades_match_single_engine_runs(history):
+    runner = MultiStrategyBacktest(STRATEGIES, initial_balance=1000.0, params=PARAMS)
+    panel = BacktestEngine(1000.0).build_panel(history, runner.indicator_fields())
+    report = runner.run_panel(panel)
+
+    for label, engine in runner.engines.items():
+        results, trades = single_run(label, panel)
+        assert trades, label
+        assert engine.trades.to_records() == trades, label
+        assert report['strategies'][label] == results, label
+    assert report['strategies']['live'] != report['strategies']['wide_target']
+
+
+def test_streamed_comparison_matches_in_memory(history, tmp_path):
+    runner = MultiStrategyBacktest(STRATEGIES, initial_balance=1000.0, params=PARAMS)
+    panel = BacktestEngine(1000.0).build_panel(history, runner.indicator_fields())
+    in_memory = runner.run_panel(panel)['strategies']
+
+    streamed = runner.run_stream(HistoryStore.from_frames(str(tmp_path), history), chunk_bars=100)
+    assert streamed['strategies'] == in_memory
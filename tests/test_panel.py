@@ -0,0 +1,55 @@
+"""MarketPanel alignment of symbols with different histories"""
+
+import numpy as np
+import pandas as pd
+
+from panel import OHLCV, MarketPanel
+
+
+def frame(timestamps, seed):
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(1, 2, (len(timestamps), len(OHLCV)))
+    return pd.DataFrame(values, index=pd.DatetimeIndex(timestamps), columns=list(OHLCV))
+
+
+def frames():
+    hours = pd.date_range('2026-01-01', periods=48, freq='1h')
+    return {
+        'BTC/USDT': frame(hours, 0),
+        'DOGE/USDT': frame(hours[10:], 1),  # Lists later
+        'UNI/USDT': frame(hours[::3], 2),  # Sparse bars
+    }
+
+
+def test_aligns_onto_the_union_axis():
+    source = frames()
+    panel = MarketPanel.from_frames(source)
+    assert panel.shape == (48, 3, len(OHLCV))
+
+    for column, (symbol, df) in enumerate(source.items()):
+        rows = panel.timestamps.get_indexer(df.index)
+        assert panel.present[:, column].sum() == len(df) and panel.present[rows, column].all()
+        np.testing.assert_array_equal(panel.values[rows, column], df.to_numpy())
+        assert np.isnan(panel.values[~panel.present[:, column], column]).all()
+        # bar_index counts the symbol's own bars, -1 before its first
+        assert panel.bar_index[rows, column].tolist() == list(range(len(df)))
+    assert panel.bar_index[9, 1] == -1 and panel.bar_index[4, 2] == 1
+
+
+def test_frames_round_trip():
+    source = frames()
+    panel = MarketPanel.from_frames(source)
+    for symbol, df in panel.to_frames().items():
+        pd.testing.assert_frame_equal(df, source[symbol], check_freq=False)
+
+
+def test_slice_and_added_fields():
+    panel = MarketPanel.from_frames(frames())
+    panel.add_fields({'range': panel.field('high') - panel.field('low')})
+    np.testing.assert_array_equal(panel.series('BTC/USDT', 'range'),
+                                  panel.series('BTC/USDT', 'high') - panel.series('BTC/USDT', 'low'))
+
+    part = panel.slice(13, 30)
+    assert len(part) == 17 and part.fields == panel.fields
+    np.testing.assert_array_equal(part.values, panel.values[13:30])
+    assert part.bar_index[0].tolist() == [0, 0, -1]  # Restarts at the slice
@@ -0,0 +1,40 @@
+"""PositionBook.sync applies snapshots as a diff"""
+
+import pytest
+
+from position import Position, PositionBook
+
+
+def snapshot(**marks):
+    return [Position(symbol=symbol, direction='long', size=2.0, entry_price=100.0, current_price=price,
+                     stop_loss=95.0)
+            for symbol, price in marks.items()]
+
+
+def test_sync_adds_removes_and_updates():
+    book = PositionBook()
+    assert book.sync(snapshot(BTC=101.0, ETH=100.0)) == (2, 0, 0)
+    assert book.total_unrealized_pnl == pytest.approx(2.0)
+
+    assert book.sync(snapshot(BTC=101.0, ETH=100.0)) == (0, 0, 0)
+    assert book.sync(snapshot(BTC=103.0, SOL=100.0)) == (1, 1, 1)
+    assert 'ETH:long' not in book and 'SOL:long' in book
+    assert book.total_unrealized_pnl == pytest.approx(6.0)
+    assert book.total_stop_risk == pytest.approx(20.0)
+
+
+def test_sync_matches_a_rebuilt_book():
+    book = PositionBook()
+    for marks in ({'BTC': 101.0, 'ETH': 99.0}, {'BTC': 98.0}, {'BTC': 98.0, 'ETH': 105.0, 'SOL': 90.0}):
+        book.sync(snapshot(**marks))
+        rebuilt = PositionBook()
+        for position in snapshot(**marks):
+            rebuilt.add(position)
+        assert book.summary(1000.0) == pytest.approx(rebuilt.summary(1000.0))
+
+
+def test_repeated_keys_are_kept_apart():
+    book = PositionBook()
+    book.sync(snapshot(BTC=101.0) * 2)
+    assert len(book) == 2
+    assert book.sync(snapshot(BTC=101.0)) == (0, 1, 0)
@@ -0,0 +1,100 @@
+"""TimeSeriesStore against SQLite: rollups and the held-batch retry"""
+
+import pytest
+
+from storage import ACCOUNT_SYMBOL, TimeSeriesStore
+
+# 2024-01-01 00:00:00 UTC, aligned to every rollup resolution
+T0 = 1704067200.0
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TimeSeriesStore(f"sqlite:///{tmp_path / 'timeseries.db'}")
+
+
+def record(store, samples):
+    for ts, balance in samples:
+        store.record_balance({'total_balance': balance}, ts=ts)
+
+
+def ohlc(rows):
+    return [(row['open'], row['high'], row['low'], row['close'], row['samples']) for row in rows]
+
+
+def test_rollups_at_every_resolution(store):
+    record(store, [
+        (T0 + 0, 100.0), (T0 + 20, 120.0), (T0 + 40, 90.0),   # minute 0
+        (T0 + 60, 95.0), (T0 + 90, 105.0),                     # minute 1
+        (T0 + 3600, 200.0),                                    # hour 1
+        (T0 + 86400, 300.0),                                   # day 1
+    ])
+    assert store.flush() == 7
+    assert store.pending() == 0
+
+    end = T0 + 2 * 86400
+    assert ohlc(store.get_rollups(ACCOUNT_SYMBOL, T0, end, resolution=60)) == [
+        (100.0, 120.0, 90.0, 90.0, 3),
+        (95.0, 105.0, 95.0, 105.0, 2),
+        (200.0, 200.0, 200.0, 200.0, 1),
+        (300.0, 300.0, 300.0, 300.0, 1),
+    ]
+    assert ohlc(store.get_rollups(ACCOUNT_SYMBOL, T0, end, resolution=3600)) == [
+        (100.0, 120.0, 90.0, 105.0, 5),
+        (200.0, 200.0, 200.0, 200.0, 1),
+        (300.0, 300.0, 300.0, 300.0, 1),
+    ]
+    assert ohlc(store.get_rollups(ACCOUNT_SYMBOL, T0, end, resolution=86400)) == [
+        (100.0, 200.0, 90.0, 200.0, 6),
+        (300.0, 300.0, 300.0, 300.0, 1),
+    ]
+
+
+def test_rollups_merge_across_flushes(store):
+    record(store, [(T0 + 10, 100.0), (T0 + 30, 110.0)])
+    store.flush()
+    record(store, [(T0 + 5, 90.0), (T0 + 50, 105.0)])  # an earlier open and a later close
+    store.flush()
+
+    assert ohlc(store.get_rollups(ACCOUNT_SYMBOL, T0, T0 + 60, resolution=60)) == [
+        (90.0, 110.0, 90.0, 105.0, 4),
+    ]
+
+
+def test_failed_flush_is_held_and_retried(store, monkeypatch):
+    def fail(conn, rows):
+        raise RuntimeError("database unavailable")
+
+    record(store, [(T0, 100.0), (T0 + 30, 110.0)])
+    monkeypatch.setattr(store, '_upsert_rollups', fail)
+    assert store.flush() == 0
+    assert store.pending() == 2
+
+    # Rows recorded while the batch is held are written with it
+    record(store, [(T0 + 45, 120.0)])
+    monkeypatch.undo()
+    assert store.flush() == 3
+    assert store.pending() == 0
+    assert ohlc(store.get_rollups(ACCOUNT_SYMBOL, T0, T0 + 60, resolution=60)) == [
+        (100.0, 120.0, 100.0, 120.0, 3),
+    ]
+    assert len(store.get_balance_history(T0, T0 + 60, resolution=60)) == 1
+
+
+def test_batch_dropped_after_max_flush_attempts(store, monkeypatch):
+    store.max_flush_attempts = 3
+    monkeypatch.setattr(store, '_upsert_rollups', lambda conn, rows: (_ for _ in ()).throw(RuntimeError("down")))
+
+    record(store, [(T0, 100.0)])
+    for _ in range(2):
+        assert store.flush() == 0
+        assert store.pending() == 1
+    assert store.flush() == 0
+    assert store.pending() == 0
+
+    monkeypatch.undo()
+    record(store, [(T0 + 60, 110.0)])
+    assert store.flush() == 1
+    assert ohlc(store.get_rollups(ACCOUNT_SYMBOL, T0, T0 + 120, resolution=60)) == [
+        (110.0, 110.0, 110.0, 110.0, 1),
+    ]
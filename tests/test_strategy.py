@@ -0,0 +1,97 @@
+"""Live signals and backtests run the same Strategy: gate, warm-up, rules and stops"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backtesting import BacktestEngine
+from risk_manager import RiskManager
+from signals import ConservativeSignals
+from strategy import LIVE_STRATEGY, MEAN_REVERSION, AtrStops, PercentStops, Strategy, compute_indicators
+
+END = datetime(2026, 1, 1)
+
+
+@pytest.fixture(scope='module')
+def history():
+    return BacktestEngine(1000.0).generate_historical_data('SOL/USDT', days=12, end=END)
+
+
+@pytest.mark.parametrize('strategy', [LIVE_STRATEGY, MEAN_REVERSION], ids=lambda strategy: strategy.name)
+def test_bar_and_vectorized_decisions_agree(history, strategy):
+    frame = compute_indicators(history, strategy.required_columns())
+    columns = {name: frame[name].to_numpy() for name in strategy.required_columns()}
+    signals = strategy.evaluate(columns)
+    assert (signals.direction != 0).any()
+    for i in range(len(frame)):
+        decision = strategy.evaluate_bar({name: values[i] for name, values in columns.items()})
+        if decision is None:
+            assert signals.direction[i] == 0
+        else:
+            assert signals.direction[i] == {'long': 1, 'short': -1}[decision['direction']]
+            assert signals.confidence[i] == decision['confidence']
+
+
+def test_backtest_opens_exactly_the_live_signals(history):
+    engine = BacktestEngine(1000.0)
+    assert engine.strategy is LIVE_STRATEGY
+    panel = engine.build_panel({'SOL/USDT': history})
+    direction, confidence, _ = engine.evaluate_signals(panel)
+    atr = panel.series('SOL/USDT', 'atr')
+    live = ConservativeSignals(RiskManager())
+
+    fired = 0
+    for t in range(len(history)):
+        signal = live.generate_conservative_signal('SOL/USDT', history.iloc[:t + 1])
+        backtested = (panel.bar_index[t, 0] >= engine.strategy.min_bars - 1
+                      and confidence[t, 0] >= engine.min_confidence)
+        assert (signal is not None) == backtested, t
+        if signal is None:
+            continue
+        fired += 1
+        entry = panel.series('SOL/USDT', 'close')[t]
+        assert signal['direction'] == {1: 'long', -1: 'short'}[direction[t, 0]]
+        assert (signal['stop_loss'], signal['take_profit']) == pytest.approx(
+            engine.stops.levels(entry, signal['direction'], {'atr': atr[t]}))
+    assert fired
+
+
+def test_no_signal_before_min_bars(history):
+    live = ConservativeSignals(RiskManager())
+    short = history.iloc[:LIVE_STRATEGY.min_bars - 1]
+    assert live.generate_conservative_signal('SOL/USDT', short) is None
+    assert not live.analyze_market_conditions(short)['overall_favorable']
+
+
+@pytest.mark.parametrize('direction', ['long', 'short'])
+@pytest.mark.parametrize('atr', [0.5, 4.0, 0.0, np.nan])
+def test_atr_stops_match_the_risk_manager(direction, atr):
+    entry = 50.0
+    stop, target = AtrStops().levels(entry, direction, {'atr': atr})
+    assert stop == pytest.approx(RiskManager().calculate_stop_loss(entry, direction, atr))
+    assert abs(target - entry) == pytest.approx(2.0 * abs(entry - stop))
+    assert (target > entry) == (direction == 'long')
+
+
+def test_stop_settings_are_engine_parameters():
+    engine = BacktestEngine(1000.0, strategy=MEAN_REVERSION)
+    assert engine.stops == PercentStops(0.015, 0.03)
+    engine.set_params(take_profit_pct=0.045, max_positions=2)
+    assert engine.get_params()['take_profit_pct'] == 0.045
+    assert engine.stops.risk_reward == pytest.approx(3.0)
+    assert MEAN_REVERSION.stops.take_profit_pct == 0.03
+    with pytest.raises(ValueError):
+        engine.set_params(atr_multiplier=1.5)
+
+
+def test_fingerprint_covers_gate_warmup_and_stops():
+    def variant(**changes):
+        settings = {'gate': LIVE_STRATEGY.gate, 'min_bars': LIVE_STRATEGY.min_bars, 'stops': LIVE_STRATEGY.stops,
+                    **changes}
+        return Strategy(LIVE_STRATEGY.name, LIVE_STRATEGY.rules, confidence_scale=100.0, **settings).fingerprint()
+
+    assert variant() == LIVE_STRATEGY.fingerprint()
+    assert variant(gate=None) != variant()
+    assert variant(min_bars=21) != variant()
+    assert variant(stops=AtrStops(reward_ratio=3.0)) != variant()
@@ -0,0 +1,53 @@
+"""Streamed backtests over a HistoryStore equal in-memory runs"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from backtesting import BacktestEngine
+from history_store import HistoryStore
+from panel import MarketPanel
+from strategy import LIVE_STRATEGY, MEAN_REVERSION
+
+
+@pytest.fixture(scope='module')
+def history():
+    engine = BacktestEngine(1000.0)
+    end = datetime(2026, 1, 1)
+    frames = {symbol: engine.generate_historical_data(symbol, days=25, end=end)
+              for symbol in ('BTC/USDT', 'DOGE/USDT', 'UNI/USDT')}
+    frames['DOGE/USDT'] = frames['DOGE/USDT'].iloc[200:]  # Lists partway through
+    frames['UNI/USDT'] = frames['UNI/USDT'].iloc[::2]  # Every other bar
+    return frames
+
+
+@pytest.fixture(scope='module')
+def store(history, tmp_path_factory):
+    return HistoryStore.from_frames(str(tmp_path_factory.mktemp('history')), history)
+
+
+def test_store_reads_back_the_aligned_panel(history, store):
+    panel = MarketPanel.from_frames(history)
+    assert len(store) == len(panel)
+    for start, stop in ((0, None), (0, 50), (123, 321), (len(panel) - 7, None)):
+        part = store.read(start, stop)
+        expected = panel.slice(start, len(panel) if stop is None else stop)
+        assert part.timestamps.equals(expected.timestamps)
+        np.testing.assert_array_equal(part.values, expected.values)
+        np.testing.assert_array_equal(part.present, expected.present)
+
+
+@pytest.mark.parametrize('strategy', [LIVE_STRATEGY, MEAN_REVERSION], ids=lambda strategy: strategy.name)
+@pytest.mark.parametrize('chunk_bars, close_open', [(37, False), (100, True), (24 * 30, False)])
+def test_stream_matches_in_memory_run(history, store, strategy, chunk_bars, close_open):
+    whole = BacktestEngine(1000.0, strategy=strategy)
+    expected = whole.run_panel(whole.build_panel(history), close_open=close_open)
+    assert expected['total_trades']
+
+    streamed = BacktestEngine(1000.0, strategy=strategy)
+    assert streamed.run_stream(store, chunk_bars, close_open=close_open) == expected
+    assert streamed.trades.to_records() == whole.trades.to_records()
+    assert streamed.daily_balances.to_records() == whole.daily_balances.to_records()
+    np.testing.assert_array_equal(streamed.equity.column('timestamp'), whole.equity.column('timestamp'))
+    np.testing.assert_allclose(streamed.equity.column('balance'), whole.equity.column('balance'), rtol=1e-12)
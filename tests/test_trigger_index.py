@@ -0,0 +1,92 @@
+"""TriggerIndex levels and PortfolioMonitor firing each trigger exactly once"""
+
+import numpy as np
+import pytest
+
+from portfolio import PortfolioMonitor
+from position import Position
+from trigger_index import DRAWDOWN_ALERT, STOP_LOSS, TAKE_PROFIT, TriggerIndex
+
+
+def position(position_id, direction, entry=100.0, stop=None, target=None, symbol='BTC/USDT'):
+    return Position(id=position_id, symbol=symbol, direction=direction, size=1.0, entry_price=entry,
+                    stop_loss=stop, take_profit=target)
+
+
+@pytest.mark.parametrize('direction, stop, target, alert', [('long', 90.0, 120.0, 95.0), ('short', 110.0, 80.0, 105.0)])
+def test_levels_fire_at_and_beyond_the_level_only(direction, stop, target, alert):
+    index = TriggerIndex()
+    index.add_position(position('p', direction, stop=stop, target=target))
+    sign = 1 if direction == 'long' else -1
+
+    assert index.crossed('BTC/USDT', 100.0) == []
+    assert index.crossed('BTC/USDT', alert + sign * 0.01) == []
+    assert index.crossed('BTC/USDT', alert) == [('p', DRAWDOWN_ALERT, alert)]
+    assert index.crossed('BTC/USDT', stop) == [('p', STOP_LOSS, stop), ('p', DRAWDOWN_ALERT, alert)]
+    assert index.crossed('BTC/USDT', target - sign * 0.01) == []
+    assert index.crossed('BTC/USDT', target) == [('p', TAKE_PROFIT, target)]
+    assert index.crossed('ETH/USDT', stop) == []
+
+    index.remove_position('p')
+    assert index.crossed('BTC/USDT', stop) == [] and len(index) == 0
+
+
+def reference_events(positions, prices):
+    """Bar-by-bar reference: stop, else a first drawdown alert, else target; stop/target end the position"""
+    state = {p.id: {'open': True, 'alert': True} for p in positions}
+    events = []
+    for price in prices:
+        fired = []
+        for p in positions:
+            if not state[p.id]['open']:
+                continue
+            sign = 1 if p.direction == 'long' else -1
+            alert = p.entry_price - sign * abs(p.entry_price - p.stop_loss) * 0.5
+            if sign * (price - p.stop_loss) <= 0:
+                fired.append((p.id, STOP_LOSS))
+                state[p.id]['open'] = False
+            elif state[p.id]['alert'] and sign * (price - alert) <= 0:
+                fired.append((p.id, DRAWDOWN_ALERT))
+                state[p.id]['alert'] = False
+            elif sign * (price - p.take_profit) >= 0:
+                fired.append((p.id, TAKE_PROFIT))
+                state[p.id]['open'] = False
+        events.append(sorted(fired))
+    return events
+
+
+def test_monitor_fires_each_trigger_once_along_a_price_path():
+    rng = np.random.default_rng(7)
+    positions = []
+    for i in range(40):
+        direction = 'long' if i % 2 else 'short'
+        entry = float(rng.uniform(95, 105))
+        sign = 1 if direction == 'long' else -1
+        positions.append(position(f"p{i}", direction, entry, stop=entry - sign * float(rng.uniform(1, 8)),
+                                  target=entry + sign * float(rng.uniform(2, 16))))
+    prices = 100 + np.cumsum(rng.normal(0, 0.8, 400))
+
+    monitor = PortfolioMonitor(api_client=None, risk_manager=None)
+    monitor.sync_positions(positions)
+    fired = [sorted(monitor.process_price('BTC/USDT', float(price))) for price in prices]
+
+    assert fired == reference_events(positions, prices)
+    flat = [event for tick in fired for event in tick]
+    assert len(flat) == len(set(flat))
+    assert any(kind == STOP_LOSS for _, kind in flat) and any(kind == TAKE_PROFIT for _, kind in flat)
+
+
+def test_resync_does_not_refire_alerts_or_closed_positions():
+    monitor = PortfolioMonitor(api_client=None, risk_manager=None)
+    snapshot = [position('a', 'long', stop=90.0, target=120.0), position('b', 'long', stop=80.0, target=101.0)]
+    monitor.sync_positions(snapshot)
+
+    assert sorted(monitor.process_price('BTC/USDT', 94.0)) == [('a', DRAWDOWN_ALERT)]
+    assert sorted(monitor.process_price('BTC/USDT', 102.0)) == [('b', TAKE_PROFIT)]
+
+    # The exchange still reports both positions; neither trigger fires again
+    monitor.sync_positions([position('a', 'long', stop=90.0, target=120.0),
+                            position('b', 'long', stop=80.0, target=101.0)])
+    assert monitor.process_price('BTC/USDT', 94.0) == []
+    assert monitor.process_price('BTC/USDT', 102.0) == []
+    assert monitor.process_price('BTC/USDT', 89.0) == [('a', STOP_LOSS)]
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Kill-Switch Liquidation Benchmark
+
+Runs EmergencyStop.liquidate_positions against a simulated exchange client
+that injects request latency, timeouts and rejected closes, and compares
+time-to-flat with closing the same positions one by one.
+
+With --mock-server the closes go through the real APIClient (signed HTTP
+requests) to a local mock exchange (tools/mock_exchange.py) with the same
+fault settings, and the exchange's remaining open positions are reported.
+
+Usage:
+    python tools/kill_switch_benchmark.py --positions 10 --latency 0.3 --failure-rate 0.2
+    python tools/kill_switch_benchmark.py --positions 10 --latency 0.3 --failure-rate 0.2 --mock-server
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_client import APIClient  # noqa: E402
+from emergency_stop import EmergencyStop  # noqa: E402
+from mock_exchange import MockExchange, MockExchangeServer  # noqa: E402
+
+
+class FlakyExchangeClient:
+    """Exchange client stand-in whose close_position is slow and unreliable"""
+
+    def __init__(self, latency, jitter, failure_rate, hang_rate, seed=7):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def close_position(self, symbol, position_id=None, timeout=10):
+        with self.lock:
+            self.calls += 1
+            roll = self.random.random()
+            latency = self.latency + self.random.uniform(0, self.jitter)
+        if roll < self.hang_rate:
+            # Request hangs until the client-side timeout fires
+            time.sleep(timeout)
+            return False
+        time.sleep(min(latency, timeout))
+        if latency > timeout:
+            return False
+        return roll >= self.hang_rate + self.failure_rate
+
+    def get_positions(self):
+        return []
+
+    def test_connection(self):
+        return True
+
+
+def mock_exchange_client(server, positions):
+    """APIClient pointed at the mock exchange, with the positions opened there"""
+    server.exchange.positions.clear()
+    server.exchange.seed_positions([
+        {'symbol': p['symbol'], 'side': 'BUY', 'quantity': 1.0, 'positionId': p['id']} for p in positions
+    ])
+    client = APIClient()
+    client.base_url = server.api_url
+    client.api_key = server.exchange.api_key
+    client.secret_key = server.exchange.secret_key
+    return client
+
+
+def serial_close(client, positions, timeout):
+    """Baseline: the previous one-at-a-time close loop"""
+    start = time.perf_counter()
+    closed = sum(bool(client.close_position(p['symbol'], p['id'], timeout=timeout)) for p in positions)
+    return {'closed': closed, 'elapsed': time.perf_counter() - start}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kill-switch time-to-flat benchmark")
+    parser.add_argument('--positions', type=int, default=10, help="Open positions to close")
+    parser.add_argument('--latency', type=float, default=0.3, help="Base close latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.4, help="Extra random latency in seconds")
+    parser.add_argument('--failure-rate', type=float, default=0.2, help="Probability a close is rejected")
+    parser.add_argument('--hang-rate', type=float, default=0.1, help="Probability a close hangs until timeout")
+    parser.add_argument('--timeout', type=float, default=2.0, help="Kill-switch per-request timeout")
+    parser.add_argument('--mock-server', action='store_true',
+                        help="Close through APIClient against the local mock exchange")
+    parser.add_argument('--json', help="Write the liquidation report to this file")
+    args = parser.parse_args()
+
+    positions = [{'symbol': f"SYM{i}/USDT", 'id': f"pos-{i}"} for i in range(args.positions)]
+
+    server = None
+    if args.mock_server:
+        server = MockExchangeServer(MockExchange(
+            latency=args.latency, jitter=args.jitter, error_rate=args.failure_rate,
+            hang_rate=args.hang_rate, hang_seconds=30.0)).start()
+        baseline = serial_close(mock_exchange_client(server, positions), positions, timeout=10)
+        client = mock_exchange_client(server, positions)
+    else:
+        client = FlakyExchangeClient(args.latency, args.jitter, args.failure_rate, args.hang_rate)
+        baseline = serial_close(client, positions, timeout=10)
+        client = FlakyExchangeClient(args.latency, args.jitter, args.failure_rate, args.hang_rate)
+
+    sent_before = server.exchange.stats['requests'] if server else 0
+    stop = EmergencyStop(client)
+    stop.close_timeout = args.timeout
+    report = stop.liquidate_positions(positions)
+    requests_sent = server.exchange.stats['requests'] - sent_before if server else client.calls
+
+    print(f"Serial close:   {baseline['closed']}/{len(positions)} closed in {baseline['elapsed']:.3f}s (no retries)")
+    flat = f"{report['time_to_flat']:.3f}s" if report['time_to_flat'] is not None else "not flat"
+    print(f"Kill switch:    {report['closed']}/{len(positions)} closed, time-to-flat {flat}, "
+          f"elapsed {report['elapsed']:.3f}s, {requests_sent} requests")
+    for outcome in report['outcomes']:
+        if not outcome['success']:
+            print(f"  FAILED {outcome['symbol']}: {outcome['error']} after {outcome['attempts']} attempts")
+
+    if server:
+        print(f"Mock exchange:  {len(server.exchange.positions)} positions still open")
+        server.stop()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
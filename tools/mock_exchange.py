@@ -0,0 +1,683 @@
+#!/usr/bin/env python3
+"""
+Mock Bitunix Futures Exchange
+
+Local HTTP server implementing the Bitunix endpoints APIClient uses, so the
+client, portfolio monitor, health monitor and kill switch can be exercised
+and benchmarked without the live exchange.
+
+Endpoints (under /api/v1/futures):
+- GET    /market/trading_pairs   public; carries 'ts' for clock-skew checks
+- GET    /public/ticker/24hr     public; ?symbol=BTCUSDT
+- GET    /klines                 public; ?symbol=&interval=&limit=
+- GET    /account                signed; balance, margin and unrealized P&L
+- POST   /order                  signed; market or limit order
+- GET    /position               signed; open positions
+- DELETE /position               signed; close a position at market
+
+Private endpoints verify the double SHA-256 signature produced by
+APIClient._get_auth_headers (api key, timestamp window and nonce replay).
+
+Fault injection is configurable at start-up or at runtime through
+POST /_mock/config: per-request latency and jitter, rate limiting (token
+bucket per api key / client address, answered with 429), random 5xx errors,
+hung requests and exchange clock skew. Prices follow a geometric random walk
+in wall-clock time; POST /_mock/price moves a symbol, POST /_mock/positions
+seeds open positions and GET /_mock/stats returns request counters.
+
+Usage:
+    python tools/mock_exchange.py --port 8765 --latency 0.05 --error-rate 0.01 --rate-limit 20
+    BITUNIX_BASE_URL=http://127.0.0.1:8765/api/v1/futures python main.py
+"""
+
+import argparse
+import calendar
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+import zlib
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/api/v1/futures'
+
+DEFAULT_PRICES = {
+    'BTCUSDT': 45000.0, 'ETHUSDT': 2500.0, 'BNBUSDT': 300.0, 'SOLUSDT': 100.0, 'ADAUSDT': 0.5,
+    'DOGEUSDT': 0.08, 'UNIUSDT': 7.5, 'AAVEUSDT': 85.0, 'COMPUSDT': 60.0, 'GMXUSDT': 13.965,
+    'MANAUSDT': 0.3169, 'ARBUSDT': 1.1, 'OPUSDT': 2.3,
+}
+
+INTERVAL_SECONDS = {
+    '1m': 60, '3m': 180, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '2h': 7200, '4h': 14400, '6h': 21600, '12h': 43200, '1d': 86400,
+}
+
+# Bitunix-style error codes
+CODE_OK = 0
+CODE_AUTH = 10003
+CODE_RATE_LIMIT = 10006
+CODE_PARAM = 10002
+CODE_NO_POSITION = 20007
+CODE_SYSTEM = 10001
+
+
+class ExchangeError(Exception):
+    """Request rejected with an HTTP status and exchange error code"""
+
+    def __init__(self, status: int, code: int, msg: str):
+        super().__init__(msg)
+        self.status = status
+        self.code = code
+        self.msg = msg
+
+
+def sign_request(api_key: str, secret_key: str, nonce: str, timestamp: str,
+                 query: str = '', body: str = '') -> str:
+    """Bitunix double SHA-256 signature (see APIClient._get_auth_headers)"""
+    digest = hashlib.sha256((nonce + timestamp + api_key + query + body).encode('utf-8')).hexdigest()
+    return hashlib.sha256((digest + secret_key).encode('utf-8')).hexdigest()
+
+
+def format_query(raw_query: str) -> str:
+    """Query parameters as signed: sorted by key, concatenated key+value"""
+    return ''.join(key + value for key, value in sorted(parse_qsl(raw_query, keep_blank_values=True)))
+
+
+class MockExchange:
+    """Exchange state and fault injection, independent of the HTTP layer"""
+
+    def __init__(self, api_key: str = 'demo_api_key', secret_key: str = 'demo_secret_key',
+                 balance: float = 10000.0, prices: Optional[Dict[str, float]] = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 hang_rate: float = 0.0, hang_seconds: float = 30.0,
+                 rate_limit: float = 0.0, burst: int = 10, clock_skew: float = 0.0,
+                 volatility: float = 0.01, slippage_bps: float = 2.0, taker_fee: float = 0.0006,
+                 leverage: float = 2.0, recv_window: float = 60.0, seed: int = 7):
+        """
+        Args:
+            api_key / secret_key: Credentials accepted on signed endpoints
+            balance: Starting USDT wallet balance
+            prices: Initial prices by exchange symbol (e.g. 'BTCUSDT')
+            latency: Base response latency in seconds
+            jitter: Extra uniform random latency in seconds
+            error_rate: Probability a request fails with 503
+            hang_rate: Probability a request stalls for hang_seconds before answering
+            hang_seconds: How long a hung request stalls
+            rate_limit: Sustained requests/s per caller (0 disables limiting)
+            burst: Token bucket size for rate limiting
+            clock_skew: Seconds added to the exchange clock
+            volatility: Price volatility per sqrt(hour) of the random walk
+            slippage_bps: Market order slippage in basis points
+            taker_fee: Fee rate charged on filled notional
+            leverage: Leverage applied to new positions
+            recv_window: Accepted age (s) of a signed request's timestamp
+            seed: Random seed for faults and price dynamics
+        """
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.clock_skew = clock_skew
+        self.volatility = volatility
+        self.slippage_bps = slippage_bps
+        self.taker_fee = taker_fee
+        self.leverage = leverage
+        self.recv_window = recv_window
+        self.seed = seed
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self.balance = balance
+        self._prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self._price_time = {symbol: time.time() for symbol in self._prices}
+        self.positions: Dict[str, Dict] = {}  # symbol -> {positionId, qty (signed), entry, leverage}
+        self.orders: Dict[str, Dict] = {}  # resting limit orders by orderId
+        self._buckets: Dict[str, list] = {}  # caller -> [tokens, last refill]
+        self._nonces = deque()
+        self._seen_nonces = set()
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+
+    CONFIG_FIELDS = ('latency', 'jitter', 'error_rate', 'hang_rate', 'hang_seconds', 'rate_limit',
+                     'burst', 'clock_skew', 'volatility', 'slippage_bps', 'taker_fee', 'leverage')
+
+    def configure(self, **changes) -> Dict:
+        """Update fault injection / market settings at runtime"""
+        unknown = set(changes) - set(self.CONFIG_FIELDS)
+        if unknown:
+            raise ExchangeError(400, CODE_PARAM, f"unknown config fields: {sorted(unknown)}")
+        with self._lock:
+            for name, value in changes.items():
+                setattr(self, name, type(getattr(self, name))(value))
+            return {name: getattr(self, name) for name in self.CONFIG_FIELDS}
+
+    def count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def now(self) -> float:
+        """Exchange clock (epoch seconds)"""
+        return time.time() + self.clock_skew
+
+    # ------------------------------------------------------------------
+    # Fault injection
+    # ------------------------------------------------------------------
+
+    def inject_faults(self, caller: str):
+        """Sleep for the simulated latency and raise for injected failures"""
+        with self._lock:
+            roll = self._random.random()
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            hang = roll < self.hang_rate
+            error = not hang and roll < self.hang_rate + self.error_rate
+            limited = not self._take_token(caller)
+
+        if hang:
+            self.count('hung')
+            time.sleep(self.hang_seconds)
+        elif delay > 0:
+            time.sleep(delay)
+        if limited:
+            self.count('rate_limited')
+            raise ExchangeError(429, CODE_RATE_LIMIT, 'Too many requests')
+        if error:
+            self.count('injected_errors')
+            raise ExchangeError(503, CODE_SYSTEM, 'Service unavailable')
+
+    def _take_token(self, caller: str) -> bool:
+        if self.rate_limit <= 0:
+            return True
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(caller, [float(self.burst), now])
+        bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate_limit)
+        bucket[1] = now
+        if bucket[0] < 1:
+            return False
+        bucket[0] -= 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Authentication
+    # ------------------------------------------------------------------
+
+    def authenticate(self, headers, raw_query: str, body: str):
+        """Verify the signed request headers; raises ExchangeError(401) on failure"""
+        api_key = headers.get('api-key')
+        sign = headers.get('sign')
+        nonce = headers.get('nonce')
+        timestamp = headers.get('timestamp')
+        if not (api_key and sign and nonce and timestamp):
+            raise ExchangeError(401, CODE_AUTH, 'Missing authentication headers')
+        if api_key != self.api_key:
+            raise ExchangeError(401, CODE_AUTH, 'Invalid api-key')
+
+        try:
+            sent = calendar.timegm(time.strptime(timestamp, '%Y%m%d%H%M%S'))
+        except ValueError:
+            raise ExchangeError(401, CODE_AUTH, 'Invalid timestamp') from None
+        if abs(self.now() - sent) > self.recv_window:
+            raise ExchangeError(401, CODE_AUTH, 'Timestamp outside recv window')
+
+        expected = sign_request(self.api_key, self.secret_key, nonce, timestamp, format_query(raw_query), body)
+        if sign != expected:
+            self.count('auth_failures')
+            raise ExchangeError(401, CODE_AUTH, 'Signature verification failed')
+
+        with self._lock:
+            # Replay protection: remember nonces for the length of the recv window
+            cutoff = time.time() - self.recv_window
+            while self._nonces and self._nonces[0][0] < cutoff:
+                self._seen_nonces.discard(self._nonces.popleft()[1])
+            if nonce in self._seen_nonces:
+                raise ExchangeError(401, CODE_AUTH, 'Nonce already used')
+            self._seen_nonces.add(nonce)
+            self._nonces.append((time.time(), nonce))
+
+    # ------------------------------------------------------------------
+    # Market data
+    # ------------------------------------------------------------------
+
+    def _advance_locked(self, symbol: str) -> float:
+        """Advance a symbol's random walk to the current time"""
+        if symbol not in self._prices:
+            self._prices[symbol] = 100.0
+            self._price_time[symbol] = time.time()
+            return 100.0
+        now = time.time()
+        hours = (now - self._price_time[symbol]) / 3600
+        if hours > 0 and self.volatility > 0:
+            sigma = self.volatility * math.sqrt(hours)
+            self._prices[symbol] *= math.exp(sigma * self._random.gauss(0, 1) - 0.5 * sigma * sigma)
+        self._price_time[symbol] = now
+        price = self._prices[symbol]
+        self._match_resting_locked(symbol, price)
+        return price
+
+    def price(self, symbol: str) -> float:
+        with self._lock:
+            return self._advance_locked(symbol)
+
+    def set_price(self, symbol: str, price: float):
+        """Move a symbol to a price (e.g. to trigger stops)"""
+        with self._lock:
+            self._prices[symbol] = float(price)
+            self._price_time[symbol] = time.time()
+            self._match_resting_locked(symbol, float(price))
+
+    def trading_pairs(self):
+        with self._lock:
+            return [{'symbol': symbol, 'base': symbol[:-4], 'quote': 'USDT', 'maxLeverage': 125}
+                    for symbol in self._prices]
+
+    def ticker(self, symbol: str) -> Dict:
+        price = self.price(symbol)
+        return {'symbol': symbol, 'price': f"{price:.10g}", 'lastPrice': f"{price:.10g}",
+                'markPrice': f"{price:.10g}"}
+
+    def klines(self, symbol: str, interval: str = '1h', limit: int = 100):
+        """
+        OHLCV candles ending at the current price
+
+        The path is a seeded random walk per (symbol, interval) anchored so the
+        last close equals the live price.
+        """
+        step = INTERVAL_SECONDS.get(interval)
+        if step is None:
+            raise ExchangeError(400, CODE_PARAM, f"Unsupported interval {interval}")
+        limit = max(1, min(int(limit), 1500))
+        price = self.price(symbol)
+
+        rng = np.random.default_rng([self.seed, zlib.crc32(symbol.encode()), step])
+        sigma = self.volatility * math.sqrt(step / 3600)
+        returns = rng.normal(0, sigma, limit)
+        closes = price * np.exp(np.cumsum(returns) - returns.sum())
+        opens = np.concatenate(([closes[0] * math.exp(-returns[0])], closes[:-1]))
+        spread = np.abs(rng.normal(0, sigma / 2, (2, limit)))
+        highs = np.maximum(opens, closes) * (1 + spread[0])
+        lows = np.minimum(opens, closes) * (1 - spread[1])
+        volumes = rng.uniform(1000, 10000, limit)
+
+        last_open = int(time.time() // step * step)
+        start = last_open - (limit - 1) * step
+        return [[(start + i * step) * 1000, float(opens[i]), float(highs[i]), float(lows[i]),
+                 float(closes[i]), float(volumes[i])] for i in range(limit)]
+
+    # ------------------------------------------------------------------
+    # Trading
+    # ------------------------------------------------------------------
+
+    def place_order(self, order: Dict) -> Dict:
+        try:
+            symbol = order['symbol']
+            side = order['side'].upper()
+            quantity = float(order.get('quantity', order.get('qty')))
+            order_type = order.get('type', order.get('orderType', 'MARKET')).upper()
+            limit_price = float(order['price']) if order.get('price') is not None else None
+        except (KeyError, TypeError, ValueError):
+            raise ExchangeError(400, CODE_PARAM, 'symbol, side and quantity are required') from None
+        if side not in ('BUY', 'SELL') or quantity <= 0:
+            raise ExchangeError(400, CODE_PARAM, 'Invalid side or quantity')
+        if order_type == 'LIMIT' and limit_price is None:
+            raise ExchangeError(400, CODE_PARAM, 'Limit orders require a price')
+
+        order_id = uuid.uuid4().hex[:16]
+        with self._lock:
+            price = self._advance_locked(symbol)
+            record = {'orderId': order_id, 'symbol': symbol, 'side': side, 'type': order_type,
+                      'quantity': quantity, 'price': limit_price, 'status': 'NEW', 'ctime': int(self.now() * 1000)}
+            marketable = order_type == 'MARKET' or (side == 'BUY' and limit_price >= price) or \
+                (side == 'SELL' and limit_price <= price)
+            if marketable:
+                fill = self._fill_price(side, price, limit_price)
+                self._fill_locked(symbol, side, quantity, fill)
+                record.update(status='FILLED', avgPrice=fill)
+            else:
+                self.orders[order_id] = record
+        self.count('orders')
+        return dict(record)
+
+    def _fill_price(self, side: str, price: float, limit_price: Optional[float]) -> float:
+        slip = price * self.slippage_bps / 10000
+        fill = price + slip if side == 'BUY' else price - slip
+        if limit_price is not None:
+            fill = min(fill, limit_price) if side == 'BUY' else max(fill, limit_price)
+        return fill
+
+    def _match_resting_locked(self, symbol: str, price: float):
+        for order_id, order in list(self.orders.items()):
+            if order['symbol'] != symbol:
+                continue
+            if (order['side'] == 'BUY' and price <= order['price']) or \
+                    (order['side'] == 'SELL' and price >= order['price']):
+                self._fill_locked(symbol, order['side'], order['quantity'], order['price'])
+                del self.orders[order_id]
+
+    def _fill_locked(self, symbol: str, side: str, quantity: float, price: float):
+        """Apply a fill to the one-way (netted) position for a symbol"""
+        signed = quantity if side == 'BUY' else -quantity
+        self.balance -= quantity * price * self.taker_fee
+        position = self.positions.get(symbol)
+        if position is None:
+            self.positions[symbol] = {'positionId': uuid.uuid4().hex[:16], 'qty': signed,
+                                      'entry': price, 'leverage': self.leverage, 'realized': 0.0}
+            return
+
+        qty = position['qty']
+        if qty * signed > 0:
+            total = qty + signed
+            position['entry'] = (position['entry'] * qty + price * signed) / total
+            position['qty'] = total
+            return
+
+        closing = min(abs(signed), abs(qty))
+        realized = closing * (price - position['entry']) * (1 if qty > 0 else -1)
+        self.balance += realized
+        position['realized'] += realized
+        remaining = qty + signed
+        if abs(remaining) < 1e-12:
+            del self.positions[symbol]
+        elif remaining * qty > 0:
+            position['qty'] = remaining
+        else:
+            # Flipped through zero: the remainder opens a new position
+            self.positions[symbol] = {'positionId': uuid.uuid4().hex[:16], 'qty': remaining,
+                                      'entry': price, 'leverage': self.leverage, 'realized': 0.0}
+
+    def close_position(self, symbol: str, position_id: Optional[str] = None) -> Dict:
+        with self._lock:
+            position = self.positions.get(symbol)
+            if position is None or (position_id and position_id != position['positionId']):
+                raise ExchangeError(400, CODE_NO_POSITION, 'Position does not exist')
+            price = self._advance_locked(symbol)
+            side = 'SELL' if position['qty'] > 0 else 'BUY'
+            fill = self._fill_price(side, price, None)
+            self._fill_locked(symbol, side, abs(position['qty']), fill)
+        self.count('closes')
+        return {'symbol': symbol, 'positionId': position['positionId'], 'price': fill}
+
+    def seed_positions(self, positions):
+        """
+        Open positions directly (no fees or slippage)
+
+        Args:
+            positions: Iterable of dicts with symbol, side ('BUY'/'SELL' or
+                'long'/'short'), quantity and optional entry price / positionId
+        """
+        with self._lock:
+            for spec in positions:
+                symbol = spec['symbol'].replace('/', '')
+                price = self._advance_locked(symbol)
+                long = spec.get('side', 'BUY').upper() in ('BUY', 'LONG')
+                quantity = float(spec.get('quantity', 1.0))
+                self.positions[symbol] = {
+                    'positionId': spec.get('positionId') or uuid.uuid4().hex[:16],
+                    'qty': quantity if long else -quantity,
+                    'entry': float(spec.get('entry_price', price)),
+                    'leverage': float(spec.get('leverage', self.leverage)),
+                    'realized': 0.0,
+                }
+
+    def position_list(self):
+        with self._lock:
+            result = []
+            for symbol, position in self.positions.items():
+                price = self._advance_locked(symbol)
+                qty = position['qty']
+                result.append({
+                    'positionId': position['positionId'],
+                    'symbol': symbol,
+                    'side': 'LONG' if qty > 0 else 'SHORT',
+                    'qty': abs(qty),
+                    'avgOpenPrice': position['entry'],
+                    'markPrice': price,
+                    'leverage': position['leverage'],
+                    'margin': abs(qty) * position['entry'] / position['leverage'],
+                    'unrealizedPNL': (price - position['entry']) * qty,
+                    'realizedPNL': position['realized'],
+                })
+            return result
+
+    def account(self) -> Dict:
+        positions = self.position_list()
+        margin = sum(p['margin'] for p in positions)
+        unrealized = sum(p['unrealizedPNL'] for p in positions)
+        return {
+            'marginCoin': 'USDT',
+            'available': self.balance - margin,
+            'frozen': 0.0,
+            'margin': margin,
+            'transfer': self.balance - margin,
+            'positionMode': 'ONE_WAY',
+            'crossUnrealizedPNL': unrealized,
+            'isolationUnrealizedPNL': 0.0,
+            'bonus': 0.0,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = 'MockBitunix/1.0'
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def log_message(self, fmt, *args):
+        logger.debug("%s - %s", self.address_string(), fmt % args)
+
+    @property
+    def exchange(self) -> MockExchange:
+        return self.server.exchange
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _dispatch(self, method: str):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        path = parts.path
+        endpoint = path
+        status = 200
+        try:
+            if path.startswith('/_mock/'):
+                payload = self._control(method, path, body)
+            elif path.startswith(API_PREFIX):
+                endpoint = path[len(API_PREFIX):] or '/'
+                caller = self.headers.get('api-key') or self.client_address[0]
+                self.exchange.count('requests')
+                self.exchange.inject_faults(caller)
+                payload = self._api(method, endpoint, parts.query, body)
+            else:
+                raise ExchangeError(404, CODE_PARAM, f"Unknown path {path}")
+        except ExchangeError as e:
+            status = e.status
+            payload = {'code': e.code, 'msg': e.msg}
+        except Exception as e:
+            logger.exception("Mock exchange error handling %s %s", method, path)
+            status = 500
+            payload = {'code': CODE_SYSTEM, 'msg': str(e)}
+
+        self.exchange.count(f"{method} {endpoint} {status}")
+        if isinstance(payload, dict) and 'ts' not in payload:
+            payload['ts'] = int(self.exchange.now() * 1000)
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            if status == 429:
+                self.send_header('Retry-After', '1')
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client gave up (e.g. timed out on a hung request)
+
+    def _api(self, method: str, endpoint: str, raw_query: str, body: str):
+        exchange = self.exchange
+        query = dict(parse_qsl(raw_query))
+
+        # Public market data
+        if method == 'GET' and endpoint == '/market/trading_pairs':
+            return {'code': CODE_OK, 'msg': 'Success', 'data': exchange.trading_pairs()}
+        if method == 'GET' and endpoint == '/public/ticker/24hr':
+            ticker = exchange.ticker(self._symbol(query))
+            return {'code': CODE_OK, 'msg': 'Success', 'data': ticker, **ticker}
+        if method == 'GET' and endpoint == '/klines':
+            return exchange.klines(self._symbol(query), query.get('interval', '1h'), query.get('limit', 100))
+
+        # Signed endpoints
+        if endpoint not in ('/account', '/order', '/position'):
+            raise ExchangeError(404, CODE_PARAM, f"Unknown endpoint {endpoint}")
+        exchange.authenticate(self.headers, raw_query, body)
+
+        if method == 'GET' and endpoint == '/account':
+            return {'code': CODE_OK, 'msg': 'Success', 'data': exchange.account()}
+        if method == 'GET' and endpoint == '/position':
+            return {'code': CODE_OK, 'msg': 'Success', 'data': exchange.position_list()}
+        if method == 'POST' and endpoint == '/order':
+            order = exchange.place_order(self._json(body))
+            return {'code': CODE_OK, 'msg': 'Success', 'data': order, **order}
+        if method == 'DELETE' and endpoint == '/position':
+            request = self._json(body)
+            closed = exchange.close_position(self._symbol(request), request.get('positionId'))
+            return {'code': CODE_OK, 'msg': 'Success', 'data': closed}
+        raise ExchangeError(405, CODE_PARAM, f"{method} not supported on {endpoint}")
+
+    def _control(self, method: str, path: str, body: str):
+        exchange = self.exchange
+        if method == 'GET' and path == '/_mock/stats':
+            return {'stats': dict(exchange.stats), 'open_positions': len(exchange.positions),
+                    'resting_orders': len(exchange.orders), 'balance': exchange.balance}
+        if method == 'POST' and path == '/_mock/config':
+            return {'config': exchange.configure(**self._json(body))}
+        if method == 'POST' and path == '/_mock/price':
+            request = self._json(body)
+            exchange.set_price(self._symbol(request), float(request['price']))
+            return {'code': CODE_OK}
+        if method == 'POST' and path == '/_mock/positions':
+            exchange.seed_positions(self._json(body).get('positions', []))
+            return {'code': CODE_OK, 'open_positions': len(exchange.positions)}
+        raise ExchangeError(404, CODE_PARAM, f"Unknown control endpoint {path}")
+
+    @staticmethod
+    def _json(body: str) -> Dict:
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError:
+            raise ExchangeError(400, CODE_PARAM, 'Malformed JSON body') from None
+        if not isinstance(data, dict):
+            raise ExchangeError(400, CODE_PARAM, 'JSON body must be an object')
+        return data
+
+    @staticmethod
+    def _symbol(params: Dict) -> str:
+        symbol = params.get('symbol')
+        if not symbol:
+            raise ExchangeError(400, CODE_PARAM, 'symbol is required')
+        return symbol.replace('/', '')
+
+
+class MockExchangeServer:
+    """Runs a MockExchange behind a threaded HTTP server"""
+
+    def __init__(self, exchange: Optional[MockExchange] = None, host: str = '127.0.0.1', port: int = 0):
+        """
+        Args:
+            exchange: Exchange state (defaults to MockExchange())
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.exchange = exchange or MockExchange()
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.exchange = self.exchange
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        """Value for APIClient.base_url / BITUNIX_BASE_URL"""
+        return self.url + API_PREFIX
+
+    def start(self) -> 'MockExchangeServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='MockExchange', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Bitunix futures exchange")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--api-key', default='demo_api_key')
+    parser.add_argument('--secret-key', default='demo_secret_key')
+    parser.add_argument('--balance', type=float, default=10000.0, help="Starting USDT balance")
+    parser.add_argument('--latency', type=float, default=0.0, help="Base response latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Extra random latency in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probability of a 503 response")
+    parser.add_argument('--hang-rate', type=float, default=0.0, help="Probability a request hangs")
+    parser.add_argument('--hang-seconds', type=float, default=30.0, help="Duration of a hung request")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="Requests/s per caller (0 = unlimited)")
+    parser.add_argument('--burst', type=int, default=10, help="Rate-limit bucket size")
+    parser.add_argument('--clock-skew', type=float, default=0.0, help="Seconds added to the exchange clock")
+    parser.add_argument('--volatility', type=float, default=0.01, help="Price volatility per sqrt(hour)")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    exchange = MockExchange(
+        api_key=args.api_key, secret_key=args.secret_key, balance=args.balance,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds, rate_limit=args.rate_limit,
+        burst=args.burst, clock_skew=args.clock_skew, volatility=args.volatility, seed=args.seed)
+    server = MockExchangeServer(exchange, args.host, args.port)
+    logger.info("Mock exchange listening on %s", server.url)
+    logger.info("Point the client at it with BITUNIX_BASE_URL=%s", server.api_url)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Paper Trading Engine Benchmark
+
+Drives PaperExchange with a synthetic multi-symbol tick stream and a random
+mix of market, limit and stop orders and cancels, and reports sustained
+event throughput (ticks, order submissions, cancels and fills).
+
+Usage:
+    python tools/paper_trading_benchmark.py --symbols 50 --ticks 200000 --order-rate 0.8
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_feed import synthetic_ticks  # noqa: E402
+from paper_trading import PaperExchange  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paper trading engine throughput benchmark")
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--ticks', type=int, default=200000)
+    parser.add_argument('--order-rate', type=float, default=0.8, help="Order actions per tick")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}/USDT" for i in range(args.symbols)]
+    ticks = synthetic_ticks(symbols, args.ticks)
+    exchange = PaperExchange(balance=1e12)
+    rng = random.Random(args.seed)
+    resting = []
+    submitted = cancelled = 0
+
+    start = time.perf_counter()
+    for tick in ticks:
+        exchange.on_tick(tick.symbol, tick.price, tick.ts)
+        if rng.random() >= args.order_rate:
+            continue
+        roll = rng.random()
+        side = 'buy' if rng.random() < 0.5 else 'sell'
+        if roll < 0.35:
+            exchange.submit_order(tick.symbol, side, 1.0)
+        elif roll < 0.75:
+            offset = 0.999 if side == 'buy' else 1.001
+            resting.append(exchange.submit_order(tick.symbol, side, 2.0, 'limit', price=tick.price * offset).id)
+        elif roll < 0.875:
+            stop = tick.price * (1.005 if side == 'buy' else 0.995)
+            exchange.submit_order(tick.symbol, side, 1.0, 'stop', stop_price=stop)
+        elif resting:
+            exchange.cancel_order(resting.pop(rng.randrange(len(resting))))
+            cancelled += 1
+            continue
+        submitted += 1
+    elapsed = time.perf_counter() - start
+
+    fills = exchange.event_count - len(ticks) - submitted - cancelled
+    print("\n=== Paper Trading Engine Throughput ===")
+    print(f"Symbols: {args.symbols}  Ticks: {len(ticks):,}  Orders: {submitted:,}  Cancels: {cancelled:,}  "
+          f"Fills: {fills:,}")
+    print(f"Elapsed: {elapsed:.3f}s  Events/s: {exchange.event_count / elapsed:,.0f}  "
+          f"Order actions/s: {(submitted + cancelled) / elapsed:,.0f}")
+    print(f"Open orders: {len(exchange.open_orders()):,}  Positions: {len(exchange.positions())}  "
+          f"Fees: {exchange.fees_paid:,.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Streaming Backtest Benchmark
+
+Writes a synthetic 1-minute OHLCV history to a HistoryStore, then runs the
+conservative backtest over it twice, each in a fresh subprocess:
+
+- memory: the whole history loaded into one panel (run_panel)
+- stream: the history read in chunks from disk (run_stream)
+
+Reports wall time and peak RSS of each run and checks that both produce
+identical results, with one daily balance mark per day of 1-minute bars.
+
+Usage:
+    python tools/streaming_backtest_benchmark.py --symbols 50 --days 30 --chunk-bars 1440
+"""
+
+import argparse
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtesting import BacktestEngine  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+
+
+def write_history(path, symbols, days, seed):
+    """Random-walk 1m bars for each symbol, appended to the store one day at a time"""
+    rng = np.random.default_rng(seed)
+    store = HistoryStore.create(path, symbols)
+    prices = rng.uniform(1, 1000, len(symbols))
+    start = pd.Timestamp('2023-01-01')
+    for day in range(days):
+        timestamps = pd.date_range(start + pd.Timedelta(days=day), periods=1440, freq='1min')
+        steps = rng.normal(0, 0.002, (1440, len(symbols)))
+        closes = prices * np.exp(np.cumsum(steps, axis=0))
+        opens = np.vstack((prices, closes[:-1]))
+        spread = closes * rng.uniform(0, 0.002, closes.shape)
+        highs = np.maximum(opens, closes) + spread
+        lows = np.minimum(opens, closes) - spread
+        volumes = rng.uniform(1e3, 1e5, closes.shape)
+        values = np.stack((opens, highs, lows, closes, volumes), axis=2)
+        store.append(timestamps, values, np.ones(closes.shape, dtype=bool))
+        prices = closes[-1]
+    return store
+
+
+def run_mode(path, mode, chunk_bars):
+    """Run one backtest in this process and print a JSON summary"""
+    logging.disable(logging.WARNING)
+    store = HistoryStore(path)
+    engine = BacktestEngine(initial_balance=1000.0)
+    start = time.perf_counter()
+    if mode == 'memory':
+        panel = store.read(0, len(store))
+        results = engine.run_panel(engine.build_panel(panel.to_frames()))
+    else:
+        results = engine.run_stream(store, chunk_bars)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        'results': results,
+        'elapsed': elapsed,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'equity_checksum': float(engine.equity.column('balance').sum()),
+        'daily_marks': len(engine.daily_balances),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory vs streamed backtest benchmark")
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--chunk-bars', type=int, default=1440)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--path', help="Store directory (default: a temporary directory)")
+    parser.add_argument('--mode', choices=['memory', 'stream'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.path, args.mode, args.chunk_bars)
+        return 0
+
+    path = args.path or tempfile.mkdtemp(prefix='history_store_')
+    symbols = [f"SYM{i}/USDT" for i in range(args.symbols)]
+    start = time.perf_counter()
+    store = write_history(path, symbols, args.days, args.seed)
+    print(f"Wrote {len(store):,} rows x {args.symbols} symbols to {path} in {time.perf_counter() - start:.1f}s")
+
+    reports = {}
+    for mode in ('memory', 'stream'):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--mode', mode, '--path', path,
+                                 '--chunk-bars', str(args.chunk_bars)], capture_output=True, text=True, check=True)
+        reports[mode] = json.loads(output.stdout.strip().splitlines()[-1])
+        report = reports[mode]
+        print(f"{mode:>6}: {report['elapsed']:7.1f}s  peak RSS {report['peak_rss_mb']:7.1f} MB  "
+              f"trades {report['results']['total_trades']}  final ${report['results']['final_balance']:,.2f}")
+
+    identical = (reports['memory']['results'] == reports['stream']['results']
+                 and reports['memory']['equity_checksum'] == reports['stream']['equity_checksum'])
+    print(f"Results identical: {identical}")
+    # Daily marks fire on the first bar of each day, not on every minute of hour 0
+    daily = all(report['daily_marks'] == args.days for report in reports.values())
+    print(f"One daily mark per day: {daily} ({reports['stream']['daily_marks']} marks over {args.days} days)")
+    return 0 if identical and daily else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tick Replay Benchmark
+Replays a synthetic tick stream through PortfolioMonitor and reports
+tick-to-decision latency percentiles against the latency budget.
+
+Usage:
+    python tools/tick_replay_benchmark.py [--symbols 50] [--positions 500] [--ticks 200000]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_feed import synthetic_ticks, replay_latency_benchmark  # noqa: E402
+from portfolio import PortfolioMonitor  # noqa: E402
+from risk_manager import RiskManager  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--positions', type=int, default=500)
+    parser.add_argument('--ticks', type=int, default=200000)
+    parser.add_argument('--budget-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+
+    symbols = [f"SYM{i}/USDT" for i in range(args.symbols)]
+    monitor = PortfolioMonitor(api_client=None, risk_manager=RiskManager(), latency_budget=args.budget_ms / 1000)
+
+    for i in range(args.positions):
+        direction = 'long' if i % 2 == 0 else 'short'
+        stop_pct = 0.01 + (i % 7) * 0.005
+        sign = 1 if direction == 'long' else -1
+        monitor.add_position({
+            'symbol': symbols[i % len(symbols)],
+            'direction': direction,
+            'entry_price': 100.0,
+            'size': 1.0,
+            'stop_loss': 100.0 * (1 - sign * stop_pct),
+            'take_profit': 100.0 * (1 + sign * stop_pct * 2),
+        })
+
+    ticks = synthetic_ticks(symbols, args.ticks)
+    summary = replay_latency_benchmark(monitor, ticks)
+
+    print("\n=== Tick-to-Decision Latency ===")
+    print(f"Ticks: {summary['count']}  Symbols: {args.symbols}  Positions: {args.positions}")
+    print(f"Trigger events: {summary['events']}  Positions still open: {len(monitor.positions)}")
+    print(f"p50: {summary['p50_ms']:.4f} ms  p95: {summary['p95_ms']:.4f} ms  "
+          f"p99: {summary['p99_ms']:.4f} ms  max: {summary['max_ms']:.4f} ms")
+    within = summary['p99_ms'] <= args.budget_ms
+    print(f"Budget {args.budget_ms} ms at p99: {'OK' if within else 'EXCEEDED'}")
+    return 0 if within else 1
+
+
+if __name__ == '__main__':
+    exit(main())
@@ -0,0 +1,157 @@
+"""
+Price-Level Trigger Index Module
+
+Keeps every position's stop-loss, take-profit and drawdown-alert levels in
+per-symbol sorted arrays, so a single price tick finds all crossed triggers
+with two bisects. Evaluation cost scales with the number of triggers that
+fire, not with the number of open positions.
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+STOP_LOSS = 'stop_loss'
+TAKE_PROFIT = 'take_profit'
+DRAWDOWN_ALERT = 'drawdown_alert'
+
+# Evaluation order when several triggers of one position cross on the same tick:
+# the conservative outcome (stop) wins over take-profit.
+TRIGGER_PRIORITY = {STOP_LOSS: 0, DRAWDOWN_ALERT: 1, TAKE_PROFIT: 2}
+
+# Drawdown alert fires at this fraction of the entry-to-stop distance
+DRAWDOWN_ALERT_FRACTION = 0.5
+
+
+class _SideIndex:
+    """Sorted trigger levels for one symbol and one crossing direction"""
+
+    __slots__ = ('levels', 'entries')
+
+    def __init__(self):
+        self.levels: List[float] = []
+        self.entries: List[Tuple[float, str, str]] = []  # (level, position_id, kind), same order as levels
+
+    def add(self, level: float, position_id: str, kind: str):
+        entry = (level, position_id, kind)
+        index = bisect_right(self.entries, entry)
+        self.entries.insert(index, entry)
+        self.levels.insert(index, level)
+
+    def remove(self, position_id: str):
+        keep = [entry for entry in self.entries if entry[1] != position_id]
+        if len(keep) != len(self.entries):
+            self.entries = keep
+            self.levels = [entry[0] for entry in keep]
+
+    def __len__(self):
+        return len(self.levels)
+
+
+class TriggerIndex:
+    """
+    Per-symbol index of price triggers.
+
+    "Below" triggers fire when price <= level (long stops, short take-profits,
+    long drawdown alerts); "above" triggers fire when price >= level (short
+    stops, long take-profits, short drawdown alerts).
+    """
+
+    def __init__(self, drawdown_alert_fraction: float = DRAWDOWN_ALERT_FRACTION):
+        self.drawdown_alert_fraction = drawdown_alert_fraction
+        self._below: Dict[str, _SideIndex] = {}
+        self._above: Dict[str, _SideIndex] = {}
+        self._symbols: Dict[str, str] = {}  # position_id -> symbol
+        self._by_symbol: Dict[str, set] = {}  # symbol -> position ids
+
+    def add_position(self, position: Dict):
+        """
+        Index a position's trigger levels (replacing any previous levels)
+
+        Args:
+            position: Position dict with id, symbol, direction, entry_price,
+                stop_loss and take_profit
+        """
+        position_id = position['id']
+        symbol = position['symbol']
+        self.remove_position(position_id)
+
+        below = self._below.setdefault(symbol, _SideIndex())
+        above = self._above.setdefault(symbol, _SideIndex())
+        is_long = position['direction'] == 'long'
+        entry_price = position['entry_price']
+        stop_loss = position.get('stop_loss')
+        take_profit = position.get('take_profit')
+
+        if stop_loss is not None:
+            (below if is_long else above).add(stop_loss, position_id, STOP_LOSS)
+
+            alert_distance = abs(entry_price - stop_loss) * self.drawdown_alert_fraction
+            if alert_distance > 0:
+                if is_long:
+                    below.add(entry_price - alert_distance, position_id, DRAWDOWN_ALERT)
+                else:
+                    above.add(entry_price + alert_distance, position_id, DRAWDOWN_ALERT)
+
+        if take_profit is not None:
+            (above if is_long else below).add(take_profit, position_id, TAKE_PROFIT)
+
+        self._symbols[position_id] = symbol
+        self._by_symbol.setdefault(symbol, set()).add(position_id)
+
+    def remove_position(self, position_id: str):
+        """Remove every trigger of a position"""
+        symbol = self._symbols.pop(position_id, None)
+        if symbol is None:
+            return
+        self._below[symbol].remove(position_id)
+        self._above[symbol].remove(position_id)
+        self._by_symbol[symbol].discard(position_id)
+
+    def remove_trigger(self, position_id: str, kind: str):
+        """Remove one trigger of a position (e.g. a drawdown alert that already fired)"""
+        symbol = self._symbols.get(position_id)
+        if symbol is None:
+            return
+        for side in (self._below[symbol], self._above[symbol]):
+            keep = [entry for entry in side.entries if not (entry[1] == position_id and entry[2] == kind)]
+            if len(keep) != len(side.entries):
+                side.entries = keep
+                side.levels = [entry[0] for entry in keep]
+
+    def crossed(self, symbol: str, price: float) -> List[Tuple[str, str, float]]:
+        """
+        Find every trigger crossed by a price
+
+        Args:
+            symbol: Trading symbol
+            price: Latest price
+
+        Returns:
+            list: (position_id, kind, level) tuples ordered by TRIGGER_PRIORITY
+        """
+        hits = []
+        below = self._below.get(symbol)
+        if below is not None and below.levels:
+            hits.extend(below.entries[bisect_left(below.levels, price):])
+        above = self._above.get(symbol)
+        if above is not None and above.levels:
+            hits.extend(above.entries[:bisect_right(above.levels, price)])
+
+        if not hits:
+            return []
+        hits.sort(key=lambda entry: TRIGGER_PRIORITY[entry[2]])
+        return [(position_id, kind, level) for level, position_id, kind in hits]
+
+    def positions_for(self, symbol: str) -> set:
+        """Ids of indexed positions in a symbol"""
+        return self._by_symbol.get(symbol, set())
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one indexed position"""
+        return [symbol for symbol, ids in self._by_symbol.items() if ids]
+
+    def __len__(self):
+        return len(self._symbols)
@@ -0,0 +1,251 @@
+"""
+Walk-Forward Optimization Module
+
+Out-of-sample validation for the conservative strategy on top of
+BacktestEngine:
+
+1. History is split into rolling (or anchored) train/test folds by time and
+   mapped onto panel step ranges.
+2. On each train fold every parameter combination from the grid is
+   backtested and the best one by the objective is chosen.
+3. The chosen parameters are backtested on the following test fold, with
+   positions still open at the end of the fold closed at the last close.
+4. Test-fold equity curves are chained into one out-of-sample curve.
+
+Folds run in parallel worker processes. The aligned panel, including the
+indicator columns, is built once and shipped to each worker once (pool
+initializer); every fold simulates a cursor range of that shared panel, so
+indicators are never recomputed per fold or per parameter set.
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backtesting import BacktestEngine
+from panel import MarketPanel
+
+logger = logging.getLogger(__name__)
+
+# Settings of the live strategy's ATR stops; every reward_ratio keeps reward:risk >= 2, which
+# RiskManager.validate_trade requires, and the confidences are its 3-of-4 and 4-of-4 levels
+DEFAULT_GRID = {
+    'atr_multiplier': [1.5, 2.0],
+    'reward_ratio': [2.0, 3.0],
+    'min_confidence': [0.85, 0.9],
+}
+
+# Panel shared by the folds running in this process (set by the pool initializer)
+_PANEL: Optional[MarketPanel] = None
+
+
+def _init_worker(panel: MarketPanel):
+    global _PANEL
+    _PANEL = panel
+
+
+def expand_grid(grid: Dict[str, List]) -> List[Dict]:
+    """All parameter combinations of a name -> values grid"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def _score(results: Dict, objective: str) -> float:
+    value = results.get(objective, 0)
+    return float(value) if value is not None and np.isfinite(value) else float('-inf')
+
+
+def _run_fold(fold: Dict, combinations: List[Dict], objective: str, initial_balance: float) -> Dict:
+    """Optimize on one train window and evaluate on its test window (runs in a worker)"""
+    panel = _PANEL
+    engine = BacktestEngine(initial_balance=initial_balance)
+
+    best_params, best_score, best_train = None, float('-inf'), None
+    for params in combinations:
+        engine.set_params(**params)
+        results = engine.run_panel(panel, fold['train_start'], fold['train_end'], close_open=True)
+        score = _score(results, objective)
+        if best_params is None or score > best_score:
+            best_params, best_score, best_train = params, score, results
+
+    engine.set_params(**best_params)
+    test_results = engine.run_panel(panel, fold['test_start'], fold['test_end'], close_open=True)
+
+    # Equity curve of the test window: start balance plus each daily mark
+    equity = [{'timestamp': panel.timestamps[fold['test_start']], 'balance': initial_balance}]
+    equity += engine.get_daily_balances()
+    equity.append({'timestamp': panel.timestamps[fold['test_end'] - 1], 'balance': engine.current_balance})
+
+    return {
+        **fold,
+        'best_params': best_params,
+        'train_score': best_score,
+        'train_results': best_train,
+        'test_results': test_results,
+        'test_trades': engine.get_trade_columns(),
+        'test_equity': equity,
+    }
+
+
+class WalkForwardOptimizer:
+    """Rolling train/test optimization of BacktestEngine parameters"""
+
+    def __init__(self, param_grid: Optional[Dict[str, List]] = None, train_days: float = 21,
+                 test_days: float = 7, step_days: Optional[float] = None, anchored: bool = False,
+                 objective: str = 'sharpe_ratio', initial_balance: float = 1000.0,
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            param_grid: Parameter name -> candidate values (names from BacktestEngine.parameters())
+            train_days: Length of each train window
+            test_days: Length of each test window
+            step_days: Time between fold starts (defaults to test_days, i.e. back-to-back test windows)
+            anchored: Grow the train window from the start of history instead of rolling it
+            objective: Results key maximized on the train window
+            initial_balance: Starting balance of every window
+            max_workers: Worker processes (1 runs folds in-process)
+        """
+        self.param_grid = param_grid or DEFAULT_GRID
+        unknown = set(self.param_grid) - set(BacktestEngine(initial_balance).parameters())
+        if unknown:
+            raise ValueError(f"Unknown parameters in grid: {sorted(unknown)}")
+        self.train = pd.Timedelta(days=train_days)
+        self.test = pd.Timedelta(days=test_days)
+        self.step = pd.Timedelta(days=step_days) if step_days else self.test
+        self.anchored = anchored
+        self.objective = objective
+        self.initial_balance = initial_balance
+        self.max_workers = max_workers or min(os.cpu_count() or 1, 8)
+
+    def folds(self, timestamps: pd.DatetimeIndex) -> List[Dict]:
+        """Train/test step ranges over a panel's time axis"""
+        folds = []
+        if len(timestamps) == 0:
+            return folds
+        first, last = timestamps[0], timestamps[-1]
+        train_start = first
+        while train_start + self.train + self.test <= last + pd.Timedelta(microseconds=1):
+            train_end = train_start + self.train
+            start, split, end = timestamps.searchsorted([first if self.anchored else train_start, train_end,
+                                                         train_end + self.test])
+            folds.append({
+                'fold': len(folds),
+                'train_start': int(start),
+                'train_end': int(split),
+                'test_start': int(split),
+                'test_end': int(end),
+            })
+            train_start += self.step
+        return folds
+
+    def run(self, symbols: List[str], days: int) -> Dict:
+        """Walk-forward over generated history for symbols"""
+        engine = BacktestEngine(initial_balance=self.initial_balance)
+        end = engine.data_end()
+        historical_data = {symbol: engine.generate_historical_data(symbol, days, end) for symbol in symbols}
+        return self.run_panel(engine.build_panel(historical_data))
+
+    def run_panel(self, panel: MarketPanel) -> Dict:
+        """
+        Walk-forward over a prepared panel (BacktestEngine.build_panel)
+
+        Returns:
+            dict: Per-fold results, the stitched out-of-sample equity curve and
+                out-of-sample summary statistics
+        """
+        folds = self.folds(panel.timestamps)
+        if not folds:
+            raise ValueError(f"History is shorter than one train+test window ({self.train} + {self.test})")
+        combinations = expand_grid(self.param_grid)
+        logger.info("Walk-forward: %s folds x %s parameter sets on %s workers",
+                    len(folds), len(combinations), self.max_workers)
+
+        args = (combinations, self.objective, self.initial_balance)
+        if self.max_workers == 1:
+            _init_worker(panel)
+            fold_results = [_run_fold(fold, *args) for fold in folds]
+        else:
+            with ProcessPoolExecutor(max_workers=min(self.max_workers, len(folds)),
+                                     initializer=_init_worker, initargs=(panel,)) as pool:
+                futures = [pool.submit(_run_fold, fold, *args) for fold in folds]
+                fold_results = [future.result() for future in futures]
+
+        equity = self._stitch(fold_results)
+        return {
+            'folds': fold_results,
+            'oos_equity': equity,
+            'oos_results': self._oos_results(fold_results, equity),
+            'param_grid': self.param_grid,
+            'objective': self.objective,
+        }
+
+    def _stitch(self, fold_results: List[Dict]) -> List[Dict]:
+        """Chain test-window equity curves, compounding each fold from the previous fold's end"""
+        stitched = []
+        scale = 1.0
+        for fold in fold_results:
+            curve = fold['test_equity']
+            points = curve if not stitched else curve[1:]  # Fold start repeats the previous end
+            stitched.extend({'timestamp': point['timestamp'], 'balance': point['balance'] * scale}
+                            for point in points)
+            scale *= curve[-1]['balance'] / self.initial_balance
+        return stitched
+
+    def _oos_results(self, fold_results: List[Dict], equity: List[Dict]) -> Dict:
+        balances = np.array([point['balance'] for point in equity])
+        peaks = np.maximum.accumulate(balances)
+        returns = np.diff(balances) / balances[:-1] if len(balances) > 1 else np.array([])
+        pnl = np.array([value for fold in fold_results for value in fold['test_trades']['columns']['pnl']])
+        return {
+            'total_return_pct': round(float(balances[-1] / self.initial_balance - 1) * 100, 2),
+            'max_drawdown_pct': round(float(((peaks - balances) / peaks).max()) * 100, 2),
+            'return_volatility_pct': round(float(returns.std()) * 100, 3) if returns.size else 0.0,
+            'total_trades': int(pnl.size),
+            'win_rate': round(float((pnl > 0).mean()) * 100, 1) if pnl.size else 0,
+            'final_balance': round(float(balances[-1]), 2),
+            'profitable_folds': sum(1 for fold in fold_results if fold['test_results'].get('total_return_pct', 0) > 0),
+            'folds': len(fold_results),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward optimization of the conservative strategy")
+    parser.add_argument('--symbols', nargs='+', default=['BTC/USDT', 'ETH/USDT', 'DOGE/USDT', 'UNI/USDT', 'MANA/USDT'])
+    parser.add_argument('--days', type=int, default=180)
+    parser.add_argument('--train-days', type=float, default=21)
+    parser.add_argument('--test-days', type=float, default=7)
+    parser.add_argument('--anchored', action='store_true')
+    parser.add_argument('--objective', default='sharpe_ratio')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--json', help="Write the full report to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    optimizer = WalkForwardOptimizer(train_days=args.train_days, test_days=args.test_days,
+                                     anchored=args.anchored, objective=args.objective, max_workers=args.workers)
+    report = optimizer.run(args.symbols, args.days)
+
+    print("\n=== Walk-Forward Optimization ===")
+    for fold in report['folds']:
+        test = fold['test_results']
+        print(f"Fold {fold['fold']:>2}: params {fold['best_params']}  train {fold['train_score']:.2f}  "
+              f"test return {test['total_return_pct']:.2f}%  trades {test['total_trades']}")
+    oos = report['oos_results']
+    print(f"Out-of-sample: return {oos['total_return_pct']:.2f}%  max drawdown {oos['max_drawdown_pct']:.2f}%  "
+          f"trades {oos['total_trades']}  profitable folds {oos['profitable_folds']}/{oos['folds']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())